@@ -6,6 +6,7 @@ from .modalidades import insights_modalidades
 from .burnout import insights_burnout
 from .segments import insights_segments
 from .enviroments import insights_enviroments
+from .engine import InsightStats
 
 __all__ = [
     "insights_overview",
@@ -13,4 +14,5 @@ __all__ = [
     "insights_burnout",
     "insights_segments",
     "insights_enviroments",
+    "InsightStats",
 ]
\ No newline at end of file
@@ -1,32 +1,49 @@
 import pandas as pd
 
-def insights_burnout(df):
-    if df is None or df.empty or len(df) < 5:
+from utils.aggregations import proportion_pvalue, wilson_interval
+from utils.metrics import timed
+
+from .engine import format_interval, format_pvalue, insight_stats, significance_text
+
+@timed()
+def insights_burnout(df, uncertainty=False):
+    stats = insight_stats(df)
+    if stats.n < 5:
         return ["Dados insuficientes para gerar insights sobre burnout."]
 
     insights = []
+    totals = stats.totals
 
-    if "burnout_level" in df.columns:
-        high_pct = (df["burnout_level"] == "high").mean() * 100
+    if "burnout_level" in stats.columns:
+        high_pct = totals["high_burnout_rate"]
+        ci = format_interval(*stats.rate_intervals().iloc[0][["rate_lo", "rate_hi"]]) if uncertainty else ""
         insights.append(
-            f"O burnout alto atinge **{high_pct:.1f}%** do grupo atual."
+            f"O burnout alto atinge **{high_pct:.1f}%**{ci} do grupo atual."
         )
 
     # Carga horária > 50h
-    if "hours_per_week" in df.columns and "burnout_level" in df.columns:
-        over = df[df["hours_per_week"] > 50]
-        if len(over) >= 5:
-            pct = (over["burnout_level"] == "high").mean() * 100
+    if "hours_per_week" in stats.columns and "burnout_level" in stats.columns:
+        over = stats.above("hours_per_week", 50)
+        if over["n"] >= 5:
+            pct = over["high_burnout_rate"]
+            ci = format_interval(*wilson_interval(over["n_high"], over["n"])) if uncertainty else ""
             insights.append(
-                f"Entre trabalhadores com mais de 50h semanais, o burnout alto aparece em **{pct:.1f}%** deste grupo."
+                f"Entre trabalhadores com mais de 50h semanais, o burnout alto aparece em **{pct:.1f}%**{ci} deste grupo."
             )
+            if uncertainty:
+                p = float(proportion_pvalue(over["n_high"], over["n"],
+                                            totals["n_high"] - over["n_high"], totals["n"] - over["n"]))
+                note = significance_text("mais de 50h", "os demais trabalhadores", p)
+                if note:
+                    insights.append(note)
 
     # Correlação estresse × burnout
-    if "stress_score" in df.columns and "burnout_level" in df.columns:
-        corr = df["stress_score"].corr(df["burnout_level"].eq("high").astype(int))
+    if "stress_score" in stats.columns and "burnout_level" in stats.columns:
+        corr, p = stats.correlation_test()
         if not pd.isna(corr) and corr > 0.25:
+            test = f", {format_pvalue(p)}" if uncertainty and not pd.isna(p) else ""
             insights.append(
-                f"Há uma **correlação positiva ({corr:.2f})** entre estresse e burnout neste conjunto de dados, indicando associação entre essas variáveis."
+                f"Há uma **correlação positiva ({corr:.2f}{test})** entre estresse e burnout neste conjunto de dados, indicando associação entre essas variáveis."
             )
 
     return insights if insights else ["Dados insuficientes para gerar insights sobre burnout."]
@@ -0,0 +1,196 @@
+"""
+Estatísticas compartilhadas pelos geradores de insights.
+
+Os geradores não varrem mais o DataFrame cada um por conta própria: todos leem
+de um `InsightStats`, que responde contagens, participações, taxas de burnout
+alto, médias e a correlação estresse × burnout a partir de somas aditivas.
+Com o DataView da sidebar as somas vêm dos rollups do cubo de agregados (sem
+tocar nas linhas); com um DataFrame, de um cubo construído numa única passada
+de groupby sobre as linhas. Cada agrupamento é calculado uma vez e reaproveitado
+por todos os geradores que recebem o mesmo `InsightStats`.
+
+No modo com incerteza (`uncertainty=True` nos geradores) as afirmações levam
+intervalos de confiança de 95% e testes de significância em forma fechada
+(Wilson para taxas, aproximação normal para médias, teste z de proporções e
+Fisher para a correlação), todos a partir das mesmas somas. A estabilidade do
+"grupo com maior taxa" vem de um bootstrap vetorizado sobre as contagens por
+grupo, memorizado pelas contagens (ou seja, por estado dos filtros).
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregations import (
+    correlation_pvalue, frame_stats, mean_interval, proportion_pvalue, wilson_interval,
+)
+from utils.cube import AggregateCube
+from utils.view import DataView, as_frame
+
+# Nível de significância e número de reamostragens do modo com incerteza
+ALPHA = 0.05
+BOOTSTRAP_DRAWS = 2000
+
+
+class InsightStats:
+    """Estatísticas de um recorte dos dados para os geradores de insights.
+
+    Args:
+        data: Dados filtrados (DataView da sidebar ou DataFrame; None = sem dados)
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.columns = set(data.columns) if data is not None else set()
+        self.n = len(data) if data is not None else 0
+        self._cube: Optional[AggregateCube] = None
+        self._rollups: Dict[Tuple[str, ...], pd.DataFrame] = {}
+
+    def by(self, *dims: str) -> pd.DataFrame:
+        """Somas e indicadores por `dims` (mesmas colunas de `group_stats`), calculados uma vez."""
+        stats = self._rollups.get(dims)
+        if stats is None:
+            stats = self._rollups[dims] = self._rollup(list(dims))
+        return stats
+
+    def _rollup(self, by) -> pd.DataFrame:
+        if isinstance(self.data, DataView):
+            stats = self.data.rollup(by)
+            if stats is not None:
+                return stats
+        if self._cube is None:
+            self._cube = AggregateCube.from_frame(as_frame(self.data))  # única passada sobre as linhas
+        if self._cube.supports(by):
+            return self._cube.rollup(by)
+        return frame_stats(as_frame(self.data), by)
+
+    @property
+    def totals(self) -> pd.Series:
+        """Indicadores do recorte inteiro."""
+        return self.by().iloc[0]
+
+    def shares(self, dim: str) -> pd.Series:
+        """% de linhas por valor não nulo de `dim`, do mais frequente ao menos (como `value_counts`)."""
+        counts = self.by(dim)['n']
+        return (counts / counts.sum() * 100).sort_values(ascending=False, kind='stable')
+
+    def high_rate(self, dim: str) -> pd.Series:
+        """% de burnout alto por valor de `dim` (grupos com chave nula descartados)."""
+        return self.by(dim)['high_burnout_rate']
+
+    def above(self, dim: str, threshold: float) -> pd.Series:
+        """Contagens e taxa de burnout alto das linhas com `dim` > `threshold`."""
+        stats = self.by(dim)
+        sums = stats.loc[stats.index > threshold, ['n', 'n_high']].sum()
+        rate = sums['n_high'] / sums['n'] * 100 if sums['n'] > 0 else np.nan
+        return pd.Series({'n': int(sums['n']), 'n_high': int(sums['n_high']), 'high_burnout_rate': rate})
+
+    def rate_intervals(self, *dims: str) -> pd.DataFrame:
+        """`n`, `n_high` e taxa de burnout alto por `dims` com IC de Wilson (`rate_lo`, `rate_hi`)."""
+        stats = self.by(*dims)[['n', 'n_high', 'high_burnout_rate']].copy()
+        stats['rate_lo'], stats['rate_hi'] = wilson_interval(stats['n_high'], stats['n'])
+        return stats
+
+    def share_intervals(self, dim: str) -> pd.DataFrame:
+        """Participação (%) de cada valor de `dim` com IC de Wilson, na ordem de `shares`."""
+        counts = self.by(dim)['n']
+        out = pd.DataFrame({'share': self.shares(dim)})
+        out['share_lo'], out['share_hi'] = wilson_interval(counts[out.index], counts.sum())
+        return out
+
+    def mean_intervals(self, *dims: str, prefix: str = 'stress') -> pd.DataFrame:
+        """Média de `prefix` por `dims` com IC de 95% (`mean_lo`, `mean_hi`)."""
+        stats = self.by(*dims)
+        out = pd.DataFrame({'mean': stats[f'{prefix}_mean']})
+        out['mean_lo'], out['mean_hi'] = mean_interval(stats, prefix)
+        return out
+
+    def versus_rest(self, dim: str, value) -> float:
+        """p-valor da taxa de burnout alto de `dim == value` contra o restante do recorte."""
+        group, totals = self.by(dim).loc[value], self.totals
+        return float(proportion_pvalue(group['n_high'], group['n'],
+                                       totals['n_high'] - group['n_high'], totals['n'] - group['n']))
+
+    def top_probability(self, dim: str, draws: int = BOOTSTRAP_DRAWS) -> pd.Series:
+        """Fração das reamostragens bootstrap em que cada valor de `dim` tem a maior taxa de burnout alto."""
+        stats = self.by(dim)
+        share = _bootstrap_top(tuple(int(v) for v in stats['n']), tuple(int(v) for v in stats['n_high']), draws)
+        return pd.Series(share, index=stats.index)
+
+    def correlation_test(self) -> Tuple[float, float]:
+        """(r, p-valor) da correlação estresse × burnout alto."""
+        r = self.stress_burnout_corr()
+        return r, float(correlation_pvalue(r, self.totals['stress_n']))
+
+    def stress_burnout_corr(self) -> float:
+        """Correlação de Pearson entre `stress_score` e o indicador de burnout alto.
+
+        Sai das somas do total e do grupo `high`: com y ∈ {0, 1}, Σy = Σy² é o
+        número de linhas com estresse e burnout alto e Σxy é a soma do estresse
+        nesse grupo. NaN quando uma das variáveis não varia.
+        """
+        totals = self.totals
+        n, sx, sxx = totals['stress_n'], totals['stress_sum'], totals['stress_sumsq']
+        levels = self.by('burnout_level')
+        if 'high' in levels.index:
+            sy, sxy = levels.loc['high', 'stress_n'], levels.loc['high', 'stress_sum']
+        else:
+            sy, sxy = 0, 0.0
+        if n < 2:
+            return np.nan
+        var_x = sxx - sx * sx / n
+        var_y = sy - sy * sy / n
+        if var_x <= sxx * 1e-12 or var_y <= 0:  # x constante (a menos de arredondamento) ou y constante
+            return np.nan
+        return float((sxy - sx * sy / n) / np.sqrt(var_x * var_y))
+
+
+@lru_cache(maxsize=256)
+def _bootstrap_top(n: Tuple[int, ...], high: Tuple[int, ...], draws: int, seed: int = 0) -> Tuple[float, ...]:
+    """Fração de `draws` reamostragens em que cada grupo tem a maior taxa.
+
+    Reamostrar com reposição as linhas de um grupo só muda quantas têm burnout
+    alto, e essa contagem segue Binomial(n, taxa observada): todas as
+    reamostragens de todos os grupos saem de uma única chamada (draws × grupos),
+    sem tocar nas linhas. Empates são desfeitos ao acaso.
+    """
+    counts = np.asarray(n, dtype=np.int64)
+    if len(counts) == 0:
+        return ()
+    rng = np.random.default_rng(seed)
+    p = np.asarray(high, dtype=np.float64) / np.maximum(counts, 1)
+    rates = rng.binomial(counts, p, size=(draws, len(counts))) / np.maximum(counts, 1)
+    rates += rng.random(rates.shape) * 1e-9
+    return tuple(np.bincount(rates.argmax(axis=1), minlength=len(counts)) / draws)
+
+
+def format_interval(lo, hi, unit: str = '%', nested: bool = False) -> str:
+    """Texto do IC para anexar a um número do insight (vazio se indefinido).
+
+    `nested` para números que já estão entre parênteses: ", IC 95%: …" em vez de " (IC 95%: …)".
+    """
+    if pd.isna(lo) or pd.isna(hi):
+        return ""
+    text = f"IC 95%: {lo:.1f}–{hi:.1f}{unit}"
+    return f", {text}" if nested else f" ({text})"
+
+
+def format_pvalue(p: float) -> str:
+    return "p < 0.001" if p < 0.001 else f"p = {p:.3f}"
+
+
+def significance_text(label: str, rest: str, p: float, top_share: Optional[float] = None) -> Optional[str]:
+    """Frase sobre a significância de `label` contra `rest` (e a estabilidade no bootstrap)."""
+    if pd.isna(p):
+        return None
+    verdict = "é estatisticamente significativa" if p < ALPHA else "**não** é estatisticamente significativa"
+    text = f"A diferença entre **{label}** e {rest} {verdict} ({format_pvalue(p)})"
+    if top_share is not None:
+        text += f"; **{label}** fica em primeiro em **{top_share * 100:.0f}%** das reamostragens bootstrap"
+    return text + "."
+
+
+def insight_stats(data) -> InsightStats:
+    """`InsightStats` dos dados (ou o próprio, se já for um)."""
+    return data if isinstance(data, InsightStats) else InsightStats(data)
@@ -1,32 +1,43 @@
-import pandas as pd
+from utils.aggregations import proportion_pvalue
+from utils.metrics import timed
 
-def insights_enviroments(df, policy_col="policy"):
-    if df is None or df.empty or len(df) < 5 or policy_col not in df.columns:
+from .engine import format_interval, insight_stats, significance_text
+
+@timed()
+def insights_enviroments(df, policy_col="policy", uncertainty=False):
+    stats = insight_stats(df)
+    if stats.n < 5 or policy_col not in stats.columns:
         return ["Dados insuficientes para gerar insights sobre políticas."]
 
     insights = []
 
     # Burnout por política
-    if "burnout_level" in df.columns:
-        grouped = (
-            df["burnout_level"].eq("high")
-            .groupby(df[policy_col])
-            .mean() * 100
-        ).sort_values()
+    if "burnout_level" in stats.columns:
+        rates = stats.rate_intervals(policy_col)
+        grouped = rates["high_burnout_rate"].sort_values()
 
         if len(grouped) > 1:
             best = grouped.index[0]
             worst = grouped.index[-1]
+            best_ci = format_interval(rates.at[best, "rate_lo"], rates.at[best, "rate_hi"], nested=True) if uncertainty else ""
+            worst_ci = format_interval(rates.at[worst, "rate_lo"], rates.at[worst, "rate_hi"], nested=True) if uncertainty else ""
             insights.append(
-                f"A política **{best}** aparece associada ao **menor burnout** (**{grouped.iloc[0]:.1f}%**), enquanto **{worst}** apresenta o **maior risco** (**{grouped.iloc[-1]:.1f}%**) neste conjunto de dados."
+                f"A política **{best}** aparece associada ao **menor burnout** (**{grouped.iloc[0]:.1f}%**{best_ci}), enquanto **{worst}** apresenta o **maior risco** (**{grouped.iloc[-1]:.1f}%**{worst_ci}) neste conjunto de dados."
             )
+            if uncertainty:
+                p = float(proportion_pvalue(rates.at[worst, "n_high"], rates.at[worst, "n"],
+                                            rates.at[best, "n_high"], rates.at[best, "n"]))
+                note = significance_text(worst, f"**{best}**", p, stats.top_probability(policy_col)[worst])
+                if note:
+                    insights.append(note)
 
     # Se uma política domina os dados (>70%)
-    if policy_col in df.columns:
-        dist = df[policy_col].value_counts(normalize=True) * 100
-        if len(dist) > 0 and dist.iloc[0] > 70:
-            insights.append(
-                f"A categoria **{dist.index[0]}** domina os dados (**{dist.iloc[0]:.1f}%**), o que pode afetar a interpretação dos padrões."
-            )
+    dist = stats.share_intervals(policy_col)
+    if len(dist) > 0 and dist["share"].iloc[0] > 70:
+        top = dist.iloc[0]
+        ci = format_interval(top["share_lo"], top["share_hi"], nested=True) if uncertainty else ""
+        insights.append(
+            f"A categoria **{dist.index[0]}** domina os dados (**{top['share']:.1f}%**{ci}), o que pode afetar a interpretação dos padrões."
+        )
 
     return insights if insights else ["Dados insuficientes para gerar insights sobre políticas."]
@@ -1,28 +1,34 @@
-import pandas as pd
+from utils.metrics import timed
 
-def insights_modalidades(df):
-    if df is None or df.empty or len(df) < 5 or "work_mode" not in df.columns:
+from .engine import format_interval, insight_stats, significance_text
+
+@timed()
+def insights_modalidades(df, uncertainty=False):
+    stats = insight_stats(df)
+    if stats.n < 5 or "work_mode" not in stats.columns:
         return ["Dados insuficientes para gerar insights sobre modalidades."]
 
     insights = []
 
-    if "work_mode" in df.columns:
-        dist = df["work_mode"].value_counts(normalize=True) * 100
-        for mode, pct in dist.items():
-            insights.append(f"A modalidade **{mode}** representa **{pct:.1f}%** do grupo analisado.")
+    for mode, row in stats.share_intervals("work_mode").iterrows():
+        ci = format_interval(row["share_lo"], row["share_hi"]) if uncertainty else ""
+        insights.append(f"A modalidade **{mode}** representa **{row['share']:.1f}%**{ci} do grupo analisado.")
 
-    # Burnout por modalidade
-    if "burnout_level" in df.columns and "work_mode" in df.columns:
-        pct_burn = (
-            df[df["burnout_level"] == "high"].groupby("work_mode").size()
-            / df.groupby("work_mode").size()
-            * 100
-        ).dropna()
+    # Burnout por modalidade (só modalidades com algum caso de burnout alto)
+    if "burnout_level" in stats.columns:
+        rates = stats.rate_intervals("work_mode")
+        pct_burn = rates.loc[rates["n_high"] > 0, "high_burnout_rate"]
 
         if len(pct_burn) > 0:
             worst = pct_burn.idxmax()
+            ci = format_interval(rates.at[worst, "rate_lo"], rates.at[worst, "rate_hi"], nested=True) if uncertainty else ""
             insights.append(
-                f"A maior taxa de burnout alto aparece em **{worst}** (**{pct_burn.max():.1f}%**) neste conjunto de dados."
+                f"A maior taxa de burnout alto aparece em **{worst}** (**{pct_burn.max():.1f}%**{ci}) neste conjunto de dados."
             )
+            if uncertainty and len(rates) > 1:
+                note = significance_text(worst, "as demais modalidades", stats.versus_rest("work_mode", worst),
+                                         stats.top_probability("work_mode")[worst])
+                if note:
+                    insights.append(note)
 
     return insights if insights else ["Dados insuficientes para gerar insights sobre modalidades."]
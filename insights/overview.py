@@ -1,35 +1,45 @@
 import pandas as pd
 
-def insights_overview(df):
-    if df is None or df.empty or len(df) < 5:
+from utils.metrics import timed
+
+from .engine import format_interval, insight_stats
+
+@timed()
+def insights_overview(df, uncertainty=False):
+    stats = insight_stats(df)
+    if stats.n < 5:
         return ["Dados insuficientes para gerar insights na visão geral."]
 
     insights = []
+    totals = stats.totals
 
     # ESTRESSE
-    if "stress_score" in df.columns:
-        mean_s = df["stress_score"].mean()
+    if "stress_score" in stats.columns:
+        mean_s = totals["stress_mean"]
         if not pd.isna(mean_s):
             risk = "alto" if mean_s >= 6 else "moderado" if mean_s >= 4 else "baixo"
+            ci = format_interval(*stats.mean_intervals().iloc[0][["mean_lo", "mean_hi"]], unit="") if uncertainty else ""
             insights.append(
-                f"O estresse médio está em **{mean_s:.1f}**, indicando risco **{risk}** para o grupo analisado."
+                f"O estresse médio está em **{mean_s:.1f}**{ci}, indicando risco **{risk}** para o grupo analisado."
             )
 
     # BURNOUT
-    if "burnout_level" in df.columns:
-        pct_high = (df["burnout_level"] == "high").mean() * 100
+    if "burnout_level" in stats.columns:
+        pct_high = totals["high_burnout_rate"]
         if not pd.isna(pct_high):
+            ci = format_interval(*stats.rate_intervals().iloc[0][["rate_lo", "rate_hi"]]) if uncertainty else ""
             insights.append(
-                f"O burnout alto aparece em **{pct_high:.1f}%** das pessoas filtradas, um indicador relevante para monitoramento."
+                f"O burnout alto aparece em **{pct_high:.1f}%**{ci} das pessoas filtradas, um indicador relevante para monitoramento."
             )
 
     # HORAS
-    if "hours_per_week" in df.columns:
-        avg_h = df["hours_per_week"].mean()
+    if "hours_per_week" in stats.columns:
+        avg_h = totals["hours_mean"]
         if not pd.isna(avg_h):
             nivel = 'acima' if avg_h > 40 else 'dentro'
+            ci = format_interval(*stats.mean_intervals(prefix="hours").iloc[0][["mean_lo", "mean_hi"]], unit="h") if uncertainty else ""
             insights.append(
-                f"A carga média de trabalho está em **{avg_h:.1f}h/semana**, nível {nivel} do recomendado."
+                f"A carga média de trabalho está em **{avg_h:.1f}h/semana**{ci}, nível {nivel} do recomendado."
             )
 
     return insights if insights else ["Dados insuficientes para gerar insights na visão geral."]
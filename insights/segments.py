@@ -1,39 +1,57 @@
-import pandas as pd
+from utils.metrics import timed
 
-def insights_segments(df):
-    if df is None or df.empty or len(df) < 5 or "segment" not in df.columns:
+from .engine import format_interval, insight_stats, significance_text
+
+@timed()
+def insights_segments(df, uncertainty=False):
+    stats = insight_stats(df)
+    if stats.n < 5 or "segment" not in stats.columns:
         return ["Dados insuficientes para gerar insights sobre segmentos."]
 
     insights = []
+    rates = stats.rate_intervals("segment")
 
     # Estresse por segmento
-    if "segment" in df.columns and "stress_score" in df.columns:
-        stress = df.groupby("segment")["stress_score"].mean().sort_values()
+    if "stress_score" in stats.columns:
+        means = stats.mean_intervals("segment")
+        stress = means["mean"].sort_values()
         if len(stress) > 0:
+            top = stress.index[-1]
+            ci = format_interval(means.at[top, "mean_lo"], means.at[top, "mean_hi"], unit="", nested=True) if uncertainty else ""
             insights.append(
-                f"O segmento com maior estresse médio é **{stress.index[-1]}** (**{stress.iloc[-1]:.1f}**) neste conjunto de dados."
+                f"O segmento com maior estresse médio é **{top}** (**{stress.iloc[-1]:.1f}**{ci}) neste conjunto de dados."
             )
 
     # Burnout por segmento
-    if "burnout_level" in df.columns and "segment" in df.columns:
-        burn = (
-            df["burnout_level"].eq("high")
-            .groupby(df["segment"])
-            .mean() * 100
-        ).sort_values()
+    if "burnout_level" in stats.columns:
+        burn = rates["high_burnout_rate"].sort_values()
 
         if len(burn) > 0:
+            top = burn.index[-1]
+            ci = format_interval(rates.at[top, "rate_lo"], rates.at[top, "rate_hi"], nested=True) if uncertainty else ""
             insights.append(
-                f"O maior burnout alto aparece em **{burn.index[-1]}** (**{burn.iloc[-1]:.1f}%**) neste conjunto de dados."
+                f"O maior burnout alto aparece em **{top}** (**{burn.iloc[-1]:.1f}%**{ci}) neste conjunto de dados."
             )
+            if uncertainty and len(burn) > 1:
+                note = significance_text(top, "os demais segmentos", stats.versus_rest("segment", top),
+                                         stats.top_probability("segment")[top])
+                if note:
+                    insights.append(note)
 
     # Aviso de amostra pequena
-    if "segment" in df.columns:
-        n_seg = df["segment"].value_counts()
-        small = n_seg[n_seg < 15]
-        if len(small) > 0:
-            insights.append(
-                f"Alguns segmentos têm **amostra reduzida** (ex.: {', '.join(small.index[:3])}), o que pode afetar a precisão da análise."
+    n_seg = rates["n"].sort_values(ascending=False, kind="stable")
+    small = n_seg[n_seg < 15]
+    if len(small) > 0:
+        if uncertainty:
+            # Largura do IC do burnout alto mostra o quanto a taxa desses segmentos é incerta
+            examples = ', '.join(
+                f"{seg} (n={n}, burnout alto entre {rates.at[seg, 'rate_lo']:.0f}% e {rates.at[seg, 'rate_hi']:.0f}%)"
+                for seg, n in small.iloc[:3].items()
             )
+        else:
+            examples = ', '.join(small.index[:3])
+        insights.append(
+            f"Alguns segmentos têm **amostra reduzida** (ex.: {examples}), o que pode afetar a precisão da análise."
+        )
 
     return insights if insights else ["Dados insuficientes para gerar insights sobre segmentos."]
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from utils.data_io import load_data
 from utils.theming import set_page_theme
+from utils.metrics import page_rerun
 
 st.set_page_config(
     page_title="Sobre & Métodos",
@@ -9,30 +10,30 @@ st.set_page_config(
     layout="wide"
 )
 set_page_theme()
+with page_rerun(__file__):
+    # ====================================
+    # HERO SECTION
+    # ====================================
+    st.title("Sobre & métodos")
+    # ====================================
+    # RESUMO AUTOMÁTICO
+    # ====================================
 
-# ====================================
-# HERO SECTION
-# ====================================
-st.title("Sobre & métodos")
-# ====================================
-# RESUMO AUTOMÁTICO
-# ====================================
-
-df = load_data()
-
-if df is None or df.empty:
-    st.warning("Não foi possível gerar o resumo automático. O dataset está vazio.")
-else:
-    total = len(df)
-    stress_mean = df["stress_score"].mean()
-    hours_mean = df["hours_per_week"].mean()
-    
-    if "burnout_level" in df.columns:
-        pct_high = (df["burnout_level"].eq("high").mean() * 100)
+    df = load_data()
+
+    if df is None or df.empty:
+        st.warning("Não foi possível gerar o resumo automático. O dataset está vazio.")
     else:
-        pct_high = None
-    
-    st.info(f"""
+        total = len(df)
+        stress_mean = df["stress_score"].mean()
+        hours_mean = df["hours_per_week"].mean()
+
+        if "burnout_level" in df.columns:
+            pct_high = (df["burnout_level"].eq("high").mean() * 100)
+        else:
+            pct_high = None
+
+        st.info(f"""
     ### 📝 Resumo da Base de Dados Utilizada
     
     - Total de respondentes integrados: **{total:,}**
@@ -41,23 +42,23 @@ else:
     - % de burnout alto: **{pct_high:.1f}%**  
     """)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
 
-# ====================================
-# PROBLEM & QUESTIONS
-# ====================================
-with st.container():
-    st.subheader("🎯 Problema e Perguntas de Pesquisa")
-    
-    st.markdown("""
+    # ====================================
+    # PROBLEM & QUESTIONS
+    # ====================================
+    with st.container():
+        st.subheader("🎯 Problema e Perguntas de Pesquisa")
+
+        st.markdown("""
     **Problema central**
     
     Organizações enfrentam aumento de estresse e burnout no trabalho, mas carecem de visão integrada sobre *quem são os grupos de risco* e *quais fatores organizacionais mais influenciam esse cenário*.
     
     **Perguntas que guiam o projeto:**
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     1. Quais segmentos apresentam maior risco de burnout?
     2. A carga horária semanal influencia diretamente o estresse?
     3. Modalidade de trabalho (remoto/híbrido/presencial) impacta o bem-estar?
@@ -65,29 +66,29 @@ with st.container():
     5. Como diferentes dimensões (cargo, horas, departamento, política) interagem?
     """)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
 
-# ====================================
-# DATA & PREPARATION
-# ====================================
-with st.container():
-    st.subheader("📊 Dados & Preparação")
-    
-    st.markdown("""
+    # ====================================
+    # DATA & PREPARATION
+    # ====================================
+    with st.container():
+        st.subheader("📊 Dados & Preparação")
+
+        st.markdown("""
     **Fontes integradas no projeto:**
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     - `dataset_principal.csv` — saúde mental, hábitos e características individuais
     - `dataset_burnout.csv` — níveis de estresse e burnout
     - `dataset_workplace.csv` — modalidades de trabalho, satisfação, políticas
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     **Principais etapas de preparação:**
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     - Normalização de `work_mode` → remoto / híbrido / presencial
     - Padronização de cargos e segmentos
     - Conversão de estresse para escala 0–10
@@ -95,31 +96,31 @@ with st.container():
     - Unificação dos 3 datasets com chaves compatíveis
     - Remoção de entradas inválidas e excesso de nulos
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     **Limitações da base:**
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     - Dados auto-reportados → viés de percepção
     - Diferenças de estrutura entre datasets
     - Amostras pequenas em alguns segmentos
     - Não há dados longitudinais (não medimos mudança no tempo)
     """)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
 
-# ====================================
-# METHOD STEPS
-# ====================================
-with st.container():
-    st.subheader("🔬 Metodologias Utilizadas")
-    
-    st.markdown("""
+    # ====================================
+    # METHOD STEPS
+    # ====================================
+    with st.container():
+        st.subheader("🔬 Metodologias Utilizadas")
+
+        st.markdown("""
     #### ✔ CRISP-DM (Adaptado)
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     1. Entendimento do negócio
     2. Entendimento dos dados
     3. Preparação da base integrada
@@ -127,23 +128,23 @@ with st.container():
     5. Avaliação de hipóteses
     6. Deploy (Streamlit Cloud)
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     #### ✔ Storytelling com Dados
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     - Títulos que comunicam a "mensagem" do gráfico
     - Comparações diretas entre grupos
     - Destaque a riscos e tendências
     - Priorização de KPIs no topo
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     #### ✔ Boas práticas de design de dashboards
     """)
-    
-    st.markdown("""
+
+        st.markdown("""
     - Layout horizontal (wide)
     - Gráficos interativos com Plotly Express
     - Uso consistente de cores semânticas
@@ -151,18 +152,18 @@ with st.container():
     - Visualizações minimalistas (texto reduzido)
     """)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
 
-# ====================================
-# TEAM / TOOLS / LINKS
-# ====================================
-with st.container():
-    st.subheader("👥 Time & Artefatos do Projeto")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
+    # ====================================
+    # TEAM / TOOLS / LINKS
+    # ====================================
+    with st.container():
+        st.subheader("👥 Time & Artefatos do Projeto")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("""
         **Equipe:**
         
         - Bruno Maciel (Dev)
@@ -177,24 +178,24 @@ with st.container():
         - GitHub: [mental-health-dashboard](https://github.com/Bruno-fmaciel/mental-health-dashboard)
         - README: [README.md](https://github.com/Bruno-fmaciel/mental-health-dashboard/blob/main/README.md)
         """)
-    
-    with col2:
-        st.markdown("""
+
+        with col2:
+            st.markdown("""
         **Artefatos:**
         
         - Dashboard Online: *Adicionar link do Streamlit Cloud*
         - Google Site: [GTI 2025-2 Projetos 5 - Grupo 6](https://sites.google.com/cesar.school/gti-2025-2-projetos-5-grupo-6/in%C3%ADcio)
         """)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
 
-# ====================================
-# REFERENCES
-# ====================================
-with st.container():
-    st.subheader("📖 Referências Bibliográficas")
-    
-    st.markdown("""
+    # ====================================
+    # REFERENCES
+    # ====================================
+    with st.container():
+        st.subheader("📖 Referências Bibliográficas")
+
+        st.markdown("""
     - Davenport, T. (2022). *Workforce Well-being and Burnout Research.*
     - WHO – World Health Organization. *Burn-out an "occupational phenomenon".*
     - Few, S. (2013). *Information Dashboard Design.*
@@ -202,8 +203,8 @@ with st.container():
     - Disciplina Projeto 5 — Material de Aula (CESAR School – GTI)
     """)
 
-# ====================================
-# FOOTER
-# ====================================
-st.markdown("<br><hr><center style='color:gray'>Dashboard • Projetos 5 — GTI • 2025</center>",
-            unsafe_allow_html=True)
+    # ====================================
+    # FOOTER
+    # ====================================
+    st.markdown("<br><hr><center style='color:gray'>Dashboard • Projetos 5 — GTI • 2025</center>",
+                unsafe_allow_html=True)
@@ -1,76 +1,74 @@
 """
 Utilitários para o Dashboard de Saúde Mental.
-"""
 
-from .data_io import load_data, render_sidebar
-from .charts import (
-    # Overview functions
-    make_overview_kpi_cards,
-    plot_stress_distribution_histogram,
-    plot_burnout_level_composition,
-    plot_core_correlation_heatmap,
-    # Burnout functions
-    make_burnout_kpi_cards,
-    plot_hours_vs_stress_scatter,
-    plot_stress_by_hours_band,
-    plot_roles_burnout_ranking,
-    # Environment functions
-    make_environment_kpi_cards,
-    plot_burnout_distribution_by_policy,
-    plot_policy_burnout_ranking,
-    make_policy_summary_table,
-    # Work mode functions
-    make_workmode_kpi_cards,
-    plot_stress_by_workmode,
-    plot_burnout_by_workmode,
-    plot_workmode_delta_heatmap,
-    # Segments functions
-    make_segments_kpi_cards,
-    plot_segment_burnout_ranking,
-    plot_segment_stress_mean,
-    make_segment_summary_table,
-    # Legacy functions (for backward compatibility)
-    kpi_cards,
-    scatter_hours_burnout,
-    box_burnout_by_role,
-    stacked_env_policies,
-    violin_by_workmode,
-    plot_delta_heatmap,
-)
+Os nomes abaixo são carregados sob demanda (PEP 562): `from utils import
+load_data` importa só utils/data_io.py, e utils/charts.py (com Plotly) só é
+importado quando uma função de gráfico é pedida.
+"""
+import importlib
 
-__all__ = [
-    'load_data',
-    'render_sidebar',
+# nome exportado -> submódulo que o define
+_EXPORTS = {
+    'load_data': 'data_io',
+    'load_cube': 'data_io',
+    'load_correlation': 'data_io',
+    'render_sidebar': 'data_io',
+    # Aggregates / filtered views
+    'AggregateCube': 'cube',
+    'CorrelationStats': 'correlation',
+    'FilterIndex': 'filters',
+    'FIGURE_CACHE': 'figure_cache',
+    'cached_figure': 'figure_cache',
+    'begin_rerun': 'metrics',
+    'end_rerun': 'metrics',
+    'plotly_chart': 'metrics',
+    'DataView': 'view',
+    'as_frame': 'view',
     # Overview
-    'make_overview_kpi_cards',
-    'plot_stress_distribution_histogram',
-    'plot_burnout_level_composition',
-    'plot_core_correlation_heatmap',
+    'make_overview_kpi_cards': 'charts',
+    'plot_stress_distribution_histogram': 'charts',
+    'plot_burnout_level_composition': 'charts',
+    'plot_core_correlation_heatmap': 'charts',
     # Burnout
-    'make_burnout_kpi_cards',
-    'plot_hours_vs_stress_scatter',
-    'plot_stress_by_hours_band',
-    'plot_roles_burnout_ranking',
+    'make_burnout_kpi_cards': 'charts',
+    'plot_hours_vs_stress_scatter': 'charts',
+    'plot_stress_by_hours_band': 'charts',
+    'plot_roles_burnout_ranking': 'charts',
     # Environment
-    'make_environment_kpi_cards',
-    'plot_burnout_distribution_by_policy',
-    'plot_policy_burnout_ranking',
-    'make_policy_summary_table',
+    'make_environment_kpi_cards': 'charts',
+    'plot_burnout_distribution_by_policy': 'charts',
+    'plot_policy_burnout_ranking': 'charts',
+    'make_policy_summary_table': 'charts',
     # Work mode
-    'make_workmode_kpi_cards',
-    'plot_stress_by_workmode',
-    'plot_burnout_by_workmode',
-    'plot_workmode_delta_heatmap',
+    'make_workmode_kpi_cards': 'charts',
+    'plot_stress_by_workmode': 'charts',
+    'plot_burnout_by_workmode': 'charts',
+    'plot_workmode_delta_heatmap': 'charts',
     # Segments
-    'make_segments_kpi_cards',
-    'plot_segment_burnout_ranking',
-    'plot_segment_stress_mean',
-    'make_segment_summary_table',
+    'make_segments_kpi_cards': 'charts',
+    'plot_segment_burnout_ranking': 'charts',
+    'plot_segment_stress_mean': 'charts',
+    'make_segment_summary_table': 'charts',
     # Legacy
-    'kpi_cards',
-    'scatter_hours_burnout',
-    'box_burnout_by_role',
-    'stacked_env_policies',
-    'violin_by_workmode',
-    'plot_delta_heatmap',
-]
+    'kpi_cards': 'charts',
+    'scatter_hours_burnout': 'charts',
+    'box_burnout_by_role': 'charts',
+    'stacked_env_policies': 'charts',
+    'violin_by_workmode': 'charts',
+    'plot_delta_heatmap': 'charts',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # próximos acessos não passam por aqui
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
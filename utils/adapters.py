@@ -0,0 +1,359 @@
+"""
+Adaptadores de fontes: como cada CSV vira o dataset normalizado.
+
+Cada pesquisa tem um `SourceAdapter` declarativo (registrado em ADAPTERS) que
+descreve, para cada coluna normalizada, de qual coluna bruta ela vem, valor
+padrão quando a coluna não existe, recodificação de valores, faixas (`pd.cut`)
+e limpeza de texto. Regras comuns a todas as fontes (idade, gênero, padronização
+de `work_mode`) e colunas derivadas (`hours_band`, `burnout_numeric`,
+`is_high_burnout`) são acrescentadas ao compilar o plano do adaptador.
+
+A execução é vetorizada e faz uma passada por coluna: valores de texto são
+fatorados uma vez (por coluna bruta) e recodificação/limpeza rodam só sobre os
+valores distintos, voltando às linhas por indexação dos códigos. Adicionar uma
+pesquisa nova é registrar mais um adaptador.
+
+Uso (benchmark por adaptador):
+    python -m utils.adapters [arquivo.csv ...]
+"""
+import dataclasses
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+class _Marker:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+# Comportamento quando nenhuma coluna bruta de um Field existe na fonte
+REQUIRED = _Marker('REQUIRED')  # erro (KeyError), a fonte é reportada como inválida
+OPTIONAL = _Marker('OPTIONAL')  # a coluna normalizada é omitida
+
+
+@dataclasses.dataclass(frozen=True)
+class Field:
+    """Regra de uma coluna normalizada.
+
+    Args:
+        source: Coluna bruta (ou colunas, em ordem de preferência)
+        default: Valor quando nenhuma coluna de `source` existe (REQUIRED / OPTIONAL / valor)
+        recode: Mapa de valores; valores fora do mapa viram nulo (como `Series.map`)
+        fill: Valor para nulos depois do `recode`
+        bins: (limites, rótulos) para discretizar valores numéricos (como `pd.cut`)
+        as_text: Converte para texto (nulos viram 'nan', como `astype(str)`)
+        strip: Remove espaços nas pontas
+        lower: Converte para minúsculas
+        aliases: Substituições finais de valores (valores fora do mapa são mantidos)
+        cast: Tipo final dos valores
+        dtype: Tipo de leitura da coluna bruta no `read_csv`
+    """
+    source: Union[str, Tuple[str, ...]]
+    default: Any = REQUIRED
+    recode: Optional[Dict] = None
+    fill: Any = None
+    bins: Optional[Tuple[Sequence[float], Sequence[str]]] = None
+    as_text: bool = False
+    strip: bool = False
+    lower: bool = False
+    aliases: Optional[Dict] = None
+    cast: Any = None
+    dtype: Optional[str] = None
+
+    @property
+    def sources(self) -> Tuple[str, ...]:
+        # source=() → coluna constante (sempre `default`)
+        return (self.source,) if isinstance(self.source, str) else tuple(self.source)
+
+    @property
+    def passthrough(self) -> bool:
+        """True quando a coluna bruta é usada como está."""
+        return not (self.recode or self.fill is not None or self.bins is not None or self.as_text
+                    or self.strip or self.lower or self.aliases or self.cast is not None)
+
+
+def constant(value: Any) -> Field:
+    """Coluna normalizada com valor fixo (a fonte não a informa)."""
+    return Field((), default=value)
+
+
+# ============================================================================
+# Regras comuns a todas as fontes
+# ============================================================================
+AGE_BANDS = ([0, 30, 40, 50, 100], ['18-30', '31-40', '41-50', '50+'])
+HOURS_BANDS = ([0, 35, 45, 100], ['<35h', '35–45h', '>45h'])
+
+WORK_MODE_ALIASES = {
+    # Remoto
+    "remote": "remote",
+    "remoto": "remote",
+    "work from home": "remote",
+    "home office": "remote",
+    "wfh": "remote",
+    "yes": "remote",     # usado no dataset_workplace
+
+    # Híbrido
+    "hibrido": "hybrid",
+    "híbrido": "hybrid",
+    "hybrid": "hybrid",
+
+    # Presencial / Onsite
+    "office": "onsite",
+    "onsite": "onsite",
+    "on-site": "onsite",
+    "presencial": "onsite",
+    "no": "onsite",      # usado no dataset_workplace
+    "unknown": "onsite"  # melhor assumir que é presencial
+}
+
+# Colunas extraídas de qualquer fonte que as tenha
+COMMON_FIELDS = {
+    'age_group': Field('Age', default=OPTIONAL, bins=AGE_BANDS, as_text=True, dtype='float32'),
+    'gender': Field('Gender', default=OPTIONAL, lower=True),
+}
+
+# Regras aplicadas por cima do Field de cada fonte para a coluna normalizada
+TARGET_RULES = {
+    'work_mode': dict(as_text=True, strip=True, lower=True, aliases=WORK_MODE_ALIASES),
+}
+
+# Derivadas das colunas normalizadas (calculadas depois delas)
+DERIVED_FIELDS = {
+    'hours_band': Field('hours_per_week', default=OPTIONAL, bins=HOURS_BANDS),
+    'burnout_numeric': Field('burnout_level', default=OPTIONAL, recode={'low': 1, 'medium': 2, 'high': 3}, fill=2),
+    # Indicador pré-calculado usado pelas agregações (utils/aggregations.py)
+    'is_high_burnout': Field('burnout_level', default=OPTIONAL, recode={'high': True}, fill=False, cast=bool),
+}
+
+
+# ============================================================================
+# Execução
+# ============================================================================
+def _factorize(col: pd.Series, cache: Dict, key: Any) -> Tuple[np.ndarray, pd.Series]:
+    """Códigos + valores distintos (nulo incluído como valor), reaproveitados por coluna bruta."""
+    if key not in cache:
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            # Já fatorada: códigos da categoria, nulo (-1) vira um valor extra no fim
+            categories = list(col.cat.categories)
+            codes = col.cat.codes.to_numpy().astype(np.intp)
+            if (codes < 0).any():
+                codes[codes < 0] = len(categories)
+                categories.append(np.nan)
+            cache[key] = (codes, pd.Series(categories, dtype=object))
+        else:
+            codes, uniques = pd.factorize(col, use_na_sentinel=False)
+            cache[key] = (codes, pd.Series(uniques))
+    return cache[key]
+
+
+def _take(values: pd.Series, codes: np.ndarray, index: pd.Index):
+    """Valores por linha a partir dos valores distintos transformados."""
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return pd.Series(values.to_numpy()[codes], index=index)
+    value_codes, categories = pd.factorize(values)
+    return pd.Series(pd.Categorical.from_codes(value_codes[codes], categories), index=index)
+
+
+def _binned(col: pd.Series, field: Field) -> pd.Series:
+    edges, labels = field.bins
+    binned = pd.cut(pd.to_numeric(col, errors='coerce'), bins=edges, labels=labels)
+    if not field.as_text:
+        return binned
+    # Como `astype(str)` do pandas em uso, inclusive para nulos (último valor)
+    codes = binned.cat.codes.to_numpy().astype(np.intp)
+    codes[codes < 0] = len(labels)
+    values = pd.Series(pd.Categorical(list(labels) + [np.nan], categories=labels)).astype(str)
+    return _take(values, codes, col.index)
+
+
+def _apply_field(col: pd.Series, field: Field, cache: Dict, key: Any) -> pd.Series:
+    if field.passthrough:
+        return col
+    if field.bins is not None:
+        return _binned(col, field)
+
+    codes, values = _factorize(col, cache, key)
+    if field.recode:
+        values = values.map(field.recode)
+    if field.fill is not None:
+        values = values.fillna(field.fill)
+    if field.cast is not None:
+        values = values.astype(field.cast)
+    if field.as_text:
+        values = values.astype(str)
+    if field.strip:
+        values = values.str.strip()
+    if field.lower:
+        values = values.str.lower()
+    if field.aliases:
+        values = values.replace(field.aliases)
+    return _take(values, codes, col.index)
+
+
+class SourceAdapter:
+    """Mapeamento declarativo de uma pesquisa para o dataset normalizado.
+
+    Args:
+        name: Nome do adaptador
+        match: Trecho do caminho do arquivo que identifica a fonte
+        fields: {coluna normalizada: Field}
+        key: Coluna bruta com o ID do respondente; não entra no dataset normalizado, mas
+            identifica a coluna que precisa de valores únicos nos dados sintéticos do
+            benchmark (`utils.benchmark.synthesize`)
+    """
+
+    def __init__(self, name: str, match: Optional[str], fields: Dict[str, Field], key: Optional[str] = None):
+        self.name = name
+        self.match = match
+        self.fields = dict(fields)
+        self.key = key
+        self.plan = self._compile()
+
+    def _compile(self) -> List[Tuple[str, Field, bool]]:
+        """Plano de execução: (coluna, Field, lê das colunas normalizadas?) na ordem de cálculo."""
+        plan = []
+        for target, field in {**COMMON_FIELDS, **self.fields}.items():
+            rules = TARGET_RULES.get(target)
+            plan.append((target, dataclasses.replace(field, **rules) if rules else field, False))
+        plan.extend((target, field, True) for target, field in DERIVED_FIELDS.items())
+        return plan
+
+    @property
+    def raw_columns(self) -> List[str]:
+        """Colunas brutas lidas da fonte."""
+        names = []
+        for _, field, derived in self.plan:
+            if not derived:
+                names.extend(s for s in field.sources if s not in names)
+        return names
+
+    def read_options(self) -> Dict:
+        """Argumentos de `pd.read_csv` para ler só as colunas usadas, com tipos explícitos."""
+        wanted = set(self.raw_columns)
+        dtypes = {}
+        for _, field, derived in self.plan:
+            if field.dtype and not derived:
+                dtypes.update({s: field.dtype for s in field.sources})
+        return {'usecols': lambda c: c in wanted, 'dtype': dtypes}
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Colunas normalizadas de um frame bruto desta fonte (mesmo índice)."""
+        out: Dict[str, pd.Series] = {}
+        cache: Dict = {}
+        for target, field, derived in self.plan:
+            frame = out if derived else df
+            name = next((s for s in field.sources if s in frame), None)
+            if name is not None:
+                col = frame[name]
+                key = (derived, name)
+            elif field.default is OPTIONAL:
+                continue
+            elif field.default is REQUIRED:
+                raise KeyError(field.sources[0])
+            else:
+                col = pd.Series(field.default, index=df.index)
+                key = (target, 'default')
+            out[target] = _apply_field(col, field, cache, key)
+        return pd.DataFrame(out, index=df.index)
+
+    def __repr__(self) -> str:
+        return f"SourceAdapter({self.name!r}, match={self.match!r}, fields={list(self.fields)})"
+
+
+ADAPTERS: List[SourceAdapter] = []
+
+# Fontes sem adaptador: só as regras comuns e derivadas
+GENERIC_ADAPTER = SourceAdapter('generic', None, {})
+
+
+def register_adapter(adapter: SourceAdapter) -> SourceAdapter:
+    """Registra um adaptador (o primeiro cujo `match` aparece no caminho é usado)."""
+    ADAPTERS.append(adapter)
+    return adapter
+
+
+def adapter_for(path: str) -> SourceAdapter:
+    """Adaptador da fonte em `path` (GENERIC_ADAPTER se nenhum combina)."""
+    for adapter in ADAPTERS:
+        if adapter.match and adapter.match in path:
+            return adapter
+    return GENERIC_ADAPTER
+
+
+# ============================================================================
+# Fontes conhecidas
+# ============================================================================
+register_adapter(SourceAdapter('principal', 'dataset_principal', {
+    # Dataset principal: foco em saúde mental geral
+    'role': Field('Occupation', default='Unknown'),
+    'work_mode': Field(('RemoteWork', 'Work_Location'), default='unknown'),  # Assumir presencial se não especificado
+    'stress_score': Field('Growing_Stress', recode={'Yes': 8, 'No': 3}, fill=5),
+    'burnout_level': Field('Mood_Swings', recode={'High': 'high', 'Medium': 'medium', 'Low': 'low'}, fill='medium'),
+    'hours_per_week': constant(40),  # Padrão se não especificado
+    'policy': Field('care_options', fill='Unknown'),
+}))
+
+register_adapter(SourceAdapter('burnout', 'dataset_burnout', {
+    # Dataset burnout: dados mais completos
+    'role': Field('Job_Role', default='Unknown'),
+    'work_mode': Field('Work_Location', default='Unknown'),
+    'hours_per_week': Field('Hours_Worked_Per_Week', default=40, dtype='float32'),
+    'stress_score': Field('Stress_Level', recode={'High': 8, 'Medium': 5, 'Low': 2}, fill=5),
+    'burnout_level': Field('Stress_Level', recode={'High': 'high', 'Medium': 'medium', 'Low': 'low'}, fill='medium'),
+    'policy': Field('Access_to_Mental_Health_Resources', default='Unknown'),
+    'segment': Field('Region', default='Unknown'),
+    'virtual_meetings': Field('Number_of_Virtual_Meetings', default=OPTIONAL, dtype='float32'),
+}, key='Employee_ID'))
+
+register_adapter(SourceAdapter('workplace', 'dataset_workplace', {
+    # Dataset workplace: burnout e trabalho remoto
+    'role': Field('JobRole', default='Unknown'),
+    'work_mode': Field('RemoteWork', default='Unknown'),
+    'hours_per_week': Field('WorkHoursPerWeek', default=40, dtype='float32'),
+    'stress_score': Field('StressLevel', default=5, dtype='float64'),
+    'burnout_level': Field('BurnoutLevel', default=5, bins=([0, 3, 6, 10], ['low', 'medium', 'high']),
+                           as_text=True, dtype='float64'),
+    'policy': Field('HasMentalHealthSupport', recode={'Yes': 'With Support', 'No': 'Without Support'},
+                    fill='Unknown'),
+    'segment': Field('Department', default='Unknown'),
+    'sleep_hours': Field('SleepHours', default=OPTIONAL, dtype='float32'),
+    'job_satisfaction': Field('JobSatisfaction', default=OPTIONAL, dtype='float32'),
+    'productivity_score': Field('ProductivityScore', default=OPTIONAL, dtype='float32'),
+}, key='EmployeeID'))
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+def benchmark(path: str, repeat: int = 3) -> Dict:
+    """Tempo de `normalize` do adaptador de `path` (melhor de `repeat`), sem contar a leitura."""
+    adapter = adapter_for(path)
+    raw = pd.read_csv(path, **adapter.read_options())
+    best = min(_timed(adapter, raw) for _ in range(repeat))
+    return {'file': path, 'adapter': adapter.name, 'rows': len(raw),
+            'seconds': round(best, 4), 'rows_per_s': int(len(raw) / best) if best else None}
+
+
+def _timed(adapter: SourceAdapter, raw: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    adapter.normalize(raw)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    from .data_io import DEFAULT_PATHS
+
+    rows = []
+    for p in sys.argv[1:] or DEFAULT_PATHS:
+        try:
+            rows.append(benchmark(p))
+        except (OSError, KeyError, ValueError) as e:
+            rows.append({'file': p, 'adapter': adapter_for(p).name, 'error': str(e)})
+    print(pd.DataFrame(rows).convert_dtypes().to_string(index=False, na_rep=""))
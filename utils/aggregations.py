@@ -0,0 +1,250 @@
+"""
+Agregações vetorizadas compartilhadas pelos gráficos.
+
+Todas as taxas, médias e contagens por grupo saem de `group_stats`, que soma
+medidas aditivas por linha (contagem, burnout alto, soma e soma dos quadrados
+de `stress_score` / `hours_per_week` e somas cruzadas do par horas × estresse)
+e deriva os indicadores no final:
+- DataView da sidebar com cubo → células do cubo (utils/cube.py);
+- uma chave categórica → um único `np.bincount` sobre os códigos da categoria;
+- demais casos → `groupby(...).sum()` com agregações nativas do pandas.
+Nenhum caminho usa callbacks Python por grupo (`lambda`). A regressão linear
+(OLS) das linhas de tendência também sai dessas somas (`ols_fit`), assim como
+os intervalos de confiança e testes dos insights (`wilson_interval`,
+`mean_interval`, `proportion_pvalue`, `correlation_pvalue`).
+"""
+import math
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .view import DataView
+
+# Métricas com contagem / soma / soma dos quadrados
+STAT_METRICS = {'stress_score': 'stress', 'hours_per_week': 'hours'}
+
+# Pares (x, y) com somas cruzadas, só sobre linhas com x e y válidos
+PAIR_METRICS = {'hs': ('hours_per_week', 'stress_score')}
+PAIR_SUFFIXES = ('n', 'x', 'y', 'xx', 'yy', 'xy')
+
+MEASURES = ['n', 'n_high'] + [
+    f"{prefix}_{suffix}" for prefix in STAT_METRICS.values() for suffix in ('n', 'sum', 'sumsq')
+] + [f"{prefix}_{suffix}" for prefix in PAIR_METRICS for suffix in PAIR_SUFFIXES]
+
+# Medidas que são contagens (voltam a int64 depois do bincount)
+COUNT_MEASURES = ['n', 'n_high'] + [f"{prefix}_n" for prefix in STAT_METRICS.values()] + [
+    f"{prefix}_n" for prefix in PAIR_METRICS
+]
+
+
+def high_burnout_flag(df: pd.DataFrame) -> np.ndarray:
+    """Indicador 0/1 de burnout alto (usa a coluna pré-calculada `is_high_burnout` se existir)."""
+    if 'is_high_burnout' in df.columns:
+        return df['is_high_burnout'].to_numpy(dtype=np.int64)
+    if 'burnout_level' in df.columns:
+        return (df['burnout_level'] == 'high').to_numpy(dtype=np.int64)
+    return np.zeros(len(df), dtype=np.int64)
+
+
+def _metric_values(df: pd.DataFrame, metric: str) -> np.ndarray:
+    """Coluna numérica como float64 (NaN onde falta; tudo NaN se a coluna não existe)."""
+    if metric in df.columns:
+        return df[metric].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.full(len(df), np.nan)
+
+
+def _measure_arrays(df: pd.DataFrame) -> dict:
+    """Medidas aditivas por linha como arrays NumPy (chaves = MEASURES, exceto `n`)."""
+    arrays = {'n_high': high_burnout_flag(df)}
+    for metric, prefix in STAT_METRICS.items():
+        values = _metric_values(df, metric)
+        valid = ~np.isnan(values)
+        clean = np.where(valid, values, 0.0)
+        arrays[f'{prefix}_n'] = valid
+        arrays[f'{prefix}_sum'] = clean
+        arrays[f'{prefix}_sumsq'] = clean * clean
+    for prefix, (x_col, y_col) in PAIR_METRICS.items():
+        x, y = _metric_values(df, x_col), _metric_values(df, y_col)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+        arrays[f'{prefix}_n'] = valid
+        arrays[f'{prefix}_x'] = x
+        arrays[f'{prefix}_y'] = y
+        arrays[f'{prefix}_xx'] = x * x
+        arrays[f'{prefix}_yy'] = y * y
+        arrays[f'{prefix}_xy'] = x * y
+    return arrays
+
+
+def measure_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Medidas aditivas por linha (MEASURES), alinhadas ao índice de `df`."""
+    data = {'n': np.ones(len(df), dtype=np.int64)}
+    data.update(_measure_arrays(df))
+    out = pd.DataFrame(data, index=df.index)
+    out[COUNT_MEASURES] = out[COUNT_MEASURES].astype(np.int64)
+    return out
+
+
+def derive_stats(totals: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta `high_burnout_rate` (%), médias e desvios-padrão amostrais às somas."""
+    n = totals['n'].to_numpy(dtype=np.float64)
+    derived = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        derived['high_burnout_rate'] = np.where(n > 0, totals['n_high'].to_numpy() / n * 100, np.nan)
+        for prefix in STAT_METRICS.values():
+            cnt = totals[f'{prefix}_n'].to_numpy(dtype=np.float64)
+            s = totals[f'{prefix}_sum'].to_numpy(dtype=np.float64)
+            ss = totals[f'{prefix}_sumsq'].to_numpy(dtype=np.float64)
+            mean = s / cnt
+            var = (ss - cnt * mean * mean) / (cnt - 1)
+            derived[f'{prefix}_mean'] = np.where(cnt > 0, mean, np.nan)
+            derived[f'{prefix}_std'] = np.where(cnt > 1, np.sqrt(np.clip(var, 0, None)), np.nan)
+    return pd.concat([totals, pd.DataFrame(derived, index=totals.index)], axis=1)
+
+
+def ols_fit(totals: pd.DataFrame, prefix: str = 'hs') -> pd.DataFrame:
+    """Regressão linear y ~ x por linha de `totals`, em forma fechada a partir das somas do par.
+
+    Returns:
+        DataFrame (mesmo índice) com `n`, `slope`, `intercept`, `r2`, `resid_std`
+        (erro-padrão dos resíduos), `x_mean` e `sxx`; NaN onde o ajuste não é definido.
+    """
+    n = totals[f'{prefix}_n'].to_numpy(dtype=np.float64)
+    sx, sy = totals[f'{prefix}_x'].to_numpy(dtype=np.float64), totals[f'{prefix}_y'].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean, y_mean = sx / n, sy / n
+        sxx = totals[f'{prefix}_xx'].to_numpy(dtype=np.float64) - sx * x_mean
+        syy = totals[f'{prefix}_yy'].to_numpy(dtype=np.float64) - sy * y_mean
+        sxy = totals[f'{prefix}_xy'].to_numpy(dtype=np.float64) - sx * y_mean
+        defined = (n >= 2) & (sxx > 0)
+        slope = np.where(defined, sxy / sxx, np.nan)
+        sse = np.clip(syy - slope * sxy, 0, None)
+        fit = {
+            'n': n,
+            'slope': slope,
+            'intercept': y_mean - slope * x_mean,
+            'r2': np.where(defined & (syy > 0), sxy * sxy / (sxx * syy), np.nan),
+            'resid_std': np.where(defined & (n > 2), np.sqrt(sse / (n - 2)), np.nan),
+            'x_mean': x_mean,
+            'sxx': sxx,
+        }
+    return pd.DataFrame(fit, index=totals.index)
+
+
+def ols_band(fit: pd.Series, x: np.ndarray, z: float = 1.96) -> tuple:
+    """Reta ajustada e banda de confiança da média em `x` (aproximação normal, 95% por padrão).
+
+    Returns:
+        (y, inferior, superior)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = fit['intercept'] + fit['slope'] * x
+    se = fit['resid_std'] * np.sqrt(1.0 / fit['n'] + (x - fit['x_mean']) ** 2 / fit['sxx'])
+    return y, y - z * se, y + z * se
+
+
+def _two_sided_pvalue(z) -> np.ndarray:
+    """P(|Z| >= |z|) da normal padrão (NaN onde `z` é NaN; poucos valores, um por grupo)."""
+    z = np.abs(np.asarray(z, dtype=np.float64))
+    erfc = np.vectorize(math.erfc, otypes=[np.float64])
+    return np.where(np.isnan(z), np.nan, erfc(np.nan_to_num(z) / math.sqrt(2)))
+
+
+def wilson_interval(successes, n, z: float = 1.96) -> tuple:
+    """Intervalo de Wilson (em %) para a taxa `successes / n`, 95% por padrão.
+
+    Returns:
+        (inferior, superior), arrays com NaN onde `n` é 0.
+    """
+    k = np.asarray(successes, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = k / n
+        denom = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    lo = np.where(n > 0, np.clip(center - half, 0, 1) * 100, np.nan)
+    hi = np.where(n > 0, np.clip(center + half, 0, 1) * 100, np.nan)
+    return lo, hi
+
+
+def mean_interval(totals: pd.DataFrame, prefix: str = 'stress', z: float = 1.96) -> tuple:
+    """Intervalo de confiança (aproximação normal) da média de `prefix` por linha de `totals`.
+
+    Returns:
+        (inferior, superior), NaN onde há menos de 2 valores.
+    """
+    stats = derive_stats(totals) if f'{prefix}_std' not in totals.columns else totals
+    cnt = stats[f'{prefix}_n'].to_numpy(dtype=np.float64)
+    mean = stats[f'{prefix}_mean'].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se = stats[f'{prefix}_std'].to_numpy(dtype=np.float64) / np.sqrt(cnt)
+    return mean - z * se, mean + z * se
+
+
+def proportion_pvalue(k1, n1, k2, n2) -> np.ndarray:
+    """p-valor bilateral do teste z de duas proporções (variância combinada); NaN se indefinido."""
+    k1, n1, k2, n2 = (np.asarray(v, dtype=np.float64) for v in (k1, n1, k2, n2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled = (k1 + k2) / (n1 + n2)
+        se = np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+        z = np.where(se > 0, (k1 / n1 - k2 / n2) / se, np.nan)
+    return _two_sided_pvalue(z)
+
+
+def correlation_pvalue(r, n) -> np.ndarray:
+    """p-valor bilateral de H0: correlação zero (transformação de Fisher, aproximação normal)."""
+    r = np.asarray(r, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(n > 3, np.arctanh(np.clip(r, -0.999999, 0.999999)) * np.sqrt(n - 3), np.nan)
+    return _two_sided_pvalue(z)
+
+
+def _bincount_stats(key: pd.Series, arrays: dict) -> pd.DataFrame:
+    """Somas por categoria com um `np.bincount` por medida sobre os códigos."""
+    categories = key.cat.categories
+    codes = key.cat.codes.to_numpy()
+    valid = codes >= 0  # código -1 = nulo, descartado como no groupby
+    if not valid.all():
+        codes = codes[valid]
+        arrays = {m: v[valid] for m, v in arrays.items()}
+    size = len(categories)
+    sums = {'n': np.bincount(codes, minlength=size)}
+    for m in MEASURES[1:]:
+        sums[m] = np.bincount(codes, weights=arrays[m], minlength=size)
+    totals = pd.DataFrame(sums, index=pd.CategoricalIndex(categories, dtype=key.dtype, name=key.name))
+    totals[COUNT_MEASURES] = totals[COUNT_MEASURES].astype(np.int64)
+    return totals[totals['n'] > 0]
+
+
+def frame_stats(df: pd.DataFrame, by: Sequence[str] = ()) -> pd.DataFrame:
+    """Somas + indicadores derivados por `by` calculados a partir das linhas."""
+    by = list(by)
+    if not by:
+        arrays = _measure_arrays(df)
+        sums = {'n': len(df)}
+        sums.update({m: arrays[m].sum() for m in MEASURES[1:]})
+        totals = pd.DataFrame([sums])
+    elif len(by) == 1 and isinstance(df[by[0]].dtype, pd.CategoricalDtype):
+        totals = _bincount_stats(df[by[0]], _measure_arrays(df))
+    else:
+        totals = measure_frame(df).groupby([df[b] for b in by], observed=True, sort=True).sum()
+    return derive_stats(totals)
+
+
+def group_stats(data, by: Sequence[str] = ()) -> pd.DataFrame:
+    """Indicadores por grupo para um DataFrame ou DataView.
+
+    Returns:
+        DataFrame indexado por `by` (uma linha quando `by` é vazio) com MEASURES e
+        `high_burnout_rate`, `stress_mean`, `stress_std`, `hours_mean`, `hours_std`.
+        Grupos com chave nula são descartados.
+    """
+    if isinstance(data, DataView):
+        stats = data.rollup(by)
+        if stats is not None:
+            return stats
+        data = data.frame
+    return frame_stats(data, by)
@@ -0,0 +1,361 @@
+"""
+Benchmark do pipeline do dashboard em datasets sintéticos.
+
+Gera pesquisas sintéticas com o esquema de `dataset_burnout.csv` e
+`dataset_workplace.csv` (cada coluna amostrada da distribuição observada no
+arquivo original, IDs únicos) em 10k, 100k, 1M e 10M linhas e mede, sem
+servidor Streamlit, cada etapa do que um rerun faz: leitura e normalização de
+cada fonte (`_normalize_columns`), montagem do dataset (`load_data` sem cache),
+escrita/leitura do cache em disco, índices da sidebar, filtros de
+`render_sidebar` e todas as funções de `utils/charts.py` (sem o cache de
+figuras). Para cada etapa: tempo (melhor de `repeat`), pico de memória
+alocada (tracemalloc, numa execução à parte) e tamanho do payload enviado ao
+navegador (JSON da figura ou Arrow da tabela).
+
+Os CSVs sintéticos ficam em `BENCH_DIR/data` e são reaproveitados entre
+execuções; os resultados podem ser gravados em JSON e comparados com uma
+execução anterior para detectar regressões.
+
+Uso:
+    python -m utils.benchmark [--rows 10k,100k,1M,10M] [--repeat N] [--save arquivo.json] [--compare base.json]
+"""
+import argparse
+import gc
+import importlib
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .adapters import adapter_for
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+TEMPLATES = ["data/dataset_burnout.csv", "data/dataset_workplace.csv"]
+BENCH_DIR = Path(os.environ.get("MHD_BENCH_DIR", ".cache/benchmarks"))
+
+# Linhas por bloco na geração dos CSVs sintéticos
+SYNTH_CHUNK_ROWS = 1_000_000
+
+# Argumentos das funções de gráfico além do frame (por nome de parâmetro)
+CHART_ARGS = {
+    'segmentation': 'segment',
+    'segment_dim': 'segment',
+    'delta_type': 'Remoto − Híbrido',
+    'rows_col': 'role',
+    'cols_col': 'segment',
+}
+# Funções que desenham direto com st.* (não há o que medir fora do servidor)
+RENDER_ONLY = {'kpi_cards'}
+
+# Etapa mais lenta que a base por mais que este fator (e por mais que
+# MIN_DELTA_S segundos) conta como regressão em `compare`
+REGRESSION_THRESHOLD = 1.25
+MIN_DELTA_S = 0.005
+
+
+# ============================================================================
+# Dados sintéticos
+# ============================================================================
+def _synthetic_ids(sample: str, start: int, stop: int) -> np.ndarray:
+    """IDs únicos no formato dos do arquivo original (`EMP0001` → `EMP0000001`, `1001` → `1001`)."""
+    numbers = np.arange(start, stop)
+    if sample.isdigit():
+        return (numbers + int(sample)).astype(str)
+    prefix = sample.rstrip('0123456789')
+    return np.char.add(prefix, np.char.zfill(numbers.astype(str), 7))
+
+
+def synthesize(template: str, rows: int, path: Path, seed: int = 0) -> Path:
+    """Grava em `path` um CSV com o cabeçalho de `template` e `rows` linhas sintéticas.
+
+    Cada coluna é amostrada (com reposição, de forma independente) dos valores
+    textuais do arquivo original, então tipos, formatos e categorias são os
+    mesmos; a coluna de ID do adaptador recebe valores únicos.
+    """
+    source = pd.read_csv(template, dtype=str, keep_default_na=False)
+    key = adapter_for(template).key
+    columns = {col: pd.factorize(source[col]) for col in source.columns if col != key}
+    rng = np.random.default_rng(seed)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', newline='') as f:
+        for start in range(0, rows, SYNTH_CHUNK_ROWS):
+            size = min(SYNTH_CHUNK_ROWS, rows - start)
+            chunk = {}
+            for col in source.columns:
+                if col == key:
+                    chunk[col] = _synthetic_ids(source[col].iloc[0], start, start + size)
+                else:
+                    codes, uniques = columns[col]
+                    chunk[col] = np.asarray(uniques, dtype=object)[codes[rng.integers(0, len(codes), size)]]
+            pd.DataFrame(chunk, columns=source.columns).to_csv(f, index=False, header=start == 0)
+    tmp.replace(path)
+    return path
+
+
+def synthetic_sources(rows: int, seed: int = 0, templates: Optional[List[str]] = None) -> List[str]:
+    """CSVs sintéticos (um por template, `rows` no total na proporção dos originais), gerados uma vez."""
+    templates = templates or TEMPLATES
+    sizes = np.array([sum(1 for _ in open(t, 'rb')) - 1 for t in templates], dtype=np.float64)
+    split = np.floor(rows * sizes / sizes.sum()).astype(int)
+    split[-1] = rows - split[:-1].sum()
+
+    paths = []
+    for template, n in zip(templates, split):
+        path = BENCH_DIR / 'data' / f"{Path(template).stem}_{n}_s{seed}.csv"
+        if not path.exists():
+            synthesize(template, int(n), path, seed)
+        paths.append(str(path))
+    return paths
+
+
+# ============================================================================
+# Medição
+# ============================================================================
+def payload_bytes(result: Any) -> Optional[int]:
+    """Bytes que o Streamlit enviaria ao navegador: JSON da figura Plotly ou Arrow da tabela."""
+    if hasattr(result, 'to_plotly_json'):
+        return len(result.to_json())
+    if isinstance(result, pd.DataFrame):
+        import pyarrow as pa
+
+        sink = pa.BufferOutputStream()
+        table = pa.Table.from_pandas(result)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().size
+    return None
+
+
+def measure(fn: Callable, repeat: int = 3, setup: Optional[Callable[[], Tuple]] = None,
+            memory: bool = True) -> Tuple[Any, Dict]:
+    """Executa `fn(*setup())` `repeat` vezes (+ uma com tracemalloc, se `memory`).
+
+    Returns:
+        (resultado da última execução, {'seconds': melhor tempo, 'peak_mb': pico alocado})
+    """
+    times = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        args = setup() if setup else ()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn(*args)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result, {'seconds': min(times), 'peak_mb': peak_mb}
+
+
+def _selections(index) -> Dict[str, Dict]:
+    """Seleções típicas da sidebar: padrão (tudo marcado), um cargo a menos e um recorte estreito."""
+    roles, modes = index.options('role'), index.options('work_mode')
+    bounds = index.range_bounds()
+    default = {'role': roles, 'work_mode': modes}
+    if bounds is not None:
+        default['hours_per_week'] = bounds
+    return {
+        'padrao': default,
+        'um_cargo_a_menos': {**default, 'role': roles[1:]},
+        'restrito': {**default, 'role': roles[:1], 'work_mode': modes[:1],
+                     'hours_per_week': (40, 50) if bounds is not None else None},
+    }
+
+
+def chart_functions() -> Dict[str, Tuple[Callable, Dict]]:
+    """Funções públicas de utils/charts.py com os argumentos extras de cada uma."""
+    from . import charts
+
+    functions = {}
+    for name, func in inspect.getmembers(charts, inspect.isfunction):
+        if func.__module__ != charts.__name__ or name.startswith('_') or name in RENDER_ONLY:
+            continue
+        params = list(inspect.signature(func).parameters.values())[1:]
+        required = [p.name for p in params if p.default is p.empty and p.kind is p.POSITIONAL_OR_KEYWORD]
+        if any(r not in CHART_ARGS for r in required):
+            continue
+        functions[name] = (func, {r: CHART_ARGS[r] for r in required})
+    return functions
+
+
+def run_stages(paths: List[str], repeat: int = 3, memory: bool = True) -> List[Dict]:
+    """Mede todas as etapas do pipeline sobre as fontes `paths`."""
+    from .data_cache import read_mapped, write_arrow
+    from .data_io import _build_dataset, _build_indexes, _normalize_columns
+    from .figure_cache import FIGURE_CACHE
+    from .view import DataView
+
+    results = []
+
+    def stage(name: str, fn: Callable, setup: Optional[Callable[[], Tuple]] = None, payload: bool = False) -> Any:
+        result, stats = measure(fn, repeat, setup, memory)
+        size = payload_bytes(result) if payload else None
+        results.append({'stage': name, **stats, 'payload_kb': size / 1024 if size is not None else None})
+        return result
+
+    for path in paths:
+        name = Path(path).stem.split('_')[1]
+        adapter = adapter_for(path)
+        raw = stage(f"read_csv:{name}", lambda: pd.read_csv(path, **adapter.read_options()))
+        stage(f"_normalize_columns:{name}", lambda df, path=path: _normalize_columns(df, path),
+              setup=lambda raw=raw: (raw.copy(),))
+        del raw  # libera o frame bruto antes da próxima fonte
+
+    df, _ = stage("load_data:build", lambda: _build_dataset(paths))
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / 'dataset.arrow'
+        stage("load_data:cache_write", lambda: write_arrow(df, target))
+        # Só o mapeamento: as páginas são lidas sob demanda pelos gráficos
+        stage("load_data:cache_read_mmap", lambda: read_mapped(target))
+
+    cube, index = stage("load_indexes", lambda: _build_indexes(df))
+    selections = _selections(index)
+    for label, selection in selections.items():
+        positions = stage(f"render_sidebar:select[{label}]", lambda: index.select(selection))
+        if positions is not None:
+            stage(f"render_sidebar:frame[{label}]", lambda: DataView(df, selection, cube, positions=positions).frame)
+
+    view = DataView(df, selections['padrao'], cube, positions=index.select(selections['padrao']))
+    importlib.import_module("plotly.express")  # import do Plotly fora das medições
+    max_entries, FIGURE_CACHE.max_entries = FIGURE_CACHE.max_entries, 0  # mede a construção, não o cache
+    try:
+        for name, (func, kwargs) in chart_functions().items():
+            stage(f"charts:{name}", lambda: func(view, **kwargs), payload=True)
+    finally:
+        FIGURE_CACHE.max_entries = max_entries
+    return results
+
+
+def run(sizes: List[str], repeat: int = 3, seed: int = 0, memory: bool = True) -> pd.DataFrame:
+    """Roda `run_stages` para cada tamanho de `SIZES`.
+
+    Returns:
+        DataFrame [rows, stage, seconds, peak_mb, payload_kb], uma linha por etapa e tamanho.
+    """
+    frames = []
+    for label in sizes:
+        rows = SIZES[label] if label in SIZES else int(label)
+        start = time.perf_counter()
+        paths = synthetic_sources(rows, seed)
+        print(f"[{label}] dados sintéticos prontos em {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        results = pd.DataFrame(run_stages(paths, repeat, memory))
+        results.insert(0, 'rows', rows)
+        frames.append(results)
+        gc.collect()
+    return pd.concat(frames, ignore_index=True)
+
+
+# ============================================================================
+# Resultados
+# ============================================================================
+def _metadata(repeat: int, seed: int) -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=False).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+        'seed': seed,
+    }
+
+
+def save_results(results: pd.DataFrame, path: Path, meta: Dict) -> Path:
+    """Grava resultados + metadados (commit, versões, máquina) em JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    records = json.loads(results.to_json(orient='records'))
+    path.write_text(json.dumps({'meta': meta, 'results': records}, indent=2, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def load_results(path: Path) -> pd.DataFrame:
+    return pd.DataFrame(json.loads(Path(path).read_text(encoding='utf-8'))['results'])
+
+
+def compare(results: pd.DataFrame, baseline: pd.DataFrame,
+            threshold: float = REGRESSION_THRESHOLD) -> pd.DataFrame:
+    """Tempo e memória de cada etapa contra a base (`ratio` = tempo atual / tempo da base).
+
+    `status` é "regressão" quando a etapa ficou mais de `threshold` vezes (e mais
+    de MIN_DELTA_S segundos) mais lenta, "melhora" no caso simétrico.
+    """
+    merged = results.merge(baseline[['rows', 'stage', 'seconds', 'peak_mb']], on=['rows', 'stage'],
+                           how='left', suffixes=('', '_base'))
+    merged['ratio'] = merged['seconds'] / merged['seconds_base']
+    delta = merged['seconds'] - merged['seconds_base']
+    merged['status'] = np.select(
+        [merged['seconds_base'].isna(),
+         (merged['ratio'] > threshold) & (delta > MIN_DELTA_S),
+         (merged['ratio'] < 1 / threshold) & (-delta > MIN_DELTA_S)],
+        ['nova', 'regressão', 'melhora'], default='',
+    )
+    return merged[['rows', 'stage', 'seconds_base', 'seconds', 'ratio', 'peak_mb_base', 'peak_mb', 'status']]
+
+
+def report(results: pd.DataFrame) -> str:
+    """Tabela em texto por tamanho de dataset."""
+    table = results.copy()
+    table['ms'] = (table.pop('seconds') * 1000).round(1)
+    for col in ('peak_mb', 'payload_kb'):  # colunas só com None (ex.: --no-memory) viram float
+        table[col] = pd.to_numeric(table[col]).astype(float).round(1)
+    return "\n\n".join(
+        f"{rows:,} linhas:\n" + group.drop(columns='rows').convert_dtypes().to_string(index=False, na_rep="")
+        for rows, group in table.groupby('rows', sort=False)
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline do dashboard em dados sintéticos")
+    parser.add_argument("--rows", default=",".join(SIZES),
+                        help="Tamanhos separados por vírgula (%(default)s ou números)")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por etapa (padrão: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente dos dados sintéticos")
+    parser.add_argument("--no-memory", action="store_true", help="Não medir pico de memória (mais rápido)")
+    parser.add_argument("--save", nargs="?", const="", default=None,
+                        help="Grava os resultados em JSON (padrão: BENCH_DIR/results-<data>.json)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Fator de tempo que conta como regressão (padrão: %(default)s)")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.rows.split(",") if s.strip()]
+    results = run(sizes, args.repeat, args.seed, memory=not args.no_memory)
+    print(report(results))
+
+    if args.save is not None:
+        target = args.save or BENCH_DIR / f"results-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        print(f"\nResultados gravados em {save_results(results, target, _metadata(args.repeat, args.seed))}")
+
+    if args.compare:
+        comparison = compare(results, load_results(args.compare), args.threshold)
+        print("\nComparação com", args.compare)
+        print(comparison.round(4).convert_dtypes().to_string(index=False, na_rep=""))
+        if (comparison['status'] == 'regressão').any():
+            sys.exit(1)
@@ -1,14 +1,27 @@
 """
 Chart functions using Plotly Express for the mental health dashboard.
 All functions return Plotly Figure objects for use with st.plotly_chart().
+Page-level plot_* functions are memoized per filter selection (see utils/figure_cache.py).
 """
+import os
+
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
 import streamlit as st
 import textwrap
 
+from .lazy import lazy_module
+from .aggregations import group_stats, ols_band, ols_fit
+from .correlation import CorrelationStats
+from .data_io import load_correlation
+from .distributions import distribution_summary, histogram_summary, summarize
+from .figure_cache import cached_figure
+from .view import DataView, as_frame
+
+# Plotly is imported on first use (first chart drawn), not when the pages import this module
+px = lazy_module('plotly.express')
+go = lazy_module('plotly.graph_objects')
+
 # ============================================================================
 # COLOR SEMANTICS: Higher risk → red-ish, Lower risk → green-ish
 # ============================================================================
@@ -23,6 +36,115 @@ BURNOUT_COLOR_MAP = {
     'low': COLOR_LOW_RISK
 }
 
+# ============================================================================
+# SCALABLE RENDERING: point-level charts above this many rows are drawn from a
+# stratified sample (scatter switches to WebGL); statistics use the full data.
+# ============================================================================
+MAX_PLOT_POINTS = int(os.environ.get("MHD_MAX_PLOT_POINTS", "20000"))
+
+# Violins and box plots are drawn from per-group summaries (utils/distributions.py)
+VIOLIN_HALF_WIDTH = 0.4
+
+
+def _stratified_sample(df, by, max_rows, seed=0):
+    """Deterministic sample of about max_rows rows keeping each group's share of `by`.
+
+    Returns df itself when it is already small enough. Row order is preserved.
+    """
+    n = len(df)
+    if n <= max_rows:
+        return df
+    rng = np.random.default_rng(seed)
+    keys = df[by] if by is not None and by in df.columns else pd.Series(0, index=df.index)
+    codes, _ = pd.factorize(keys, use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    quota = np.maximum(np.floor(sizes * (max_rows / n)), 1).astype(np.int64)
+    # Random rank of each row within its group; keep the first `quota` of each group
+    perm = rng.permutation(n)
+    rank = np.empty(n, dtype=np.int64)
+    rank[perm] = pd.Series(codes[perm]).groupby(codes[perm]).cumcount().to_numpy()
+    return df[rank < quota[codes]]
+
+
+def _sample_note(shown, total):
+    """Title suffix shown when a chart is drawn from a sample."""
+    return f" (amostra de {shown:,} de {total:,})" if shown < total else ""
+
+
+def _add_ols_trendlines(fig, data, x, y, color_col, show_confidence_band=False):
+    """Closed-form OLS line (and optional 95% band) per colour group, fitted on all rows.
+
+    The fit comes from the additive sums of group_stats (served by the aggregate
+    cube for sidebar views), so it costs O(groups) once the sums exist.
+    """
+    df = as_frame(data)
+    by = [color_col] if color_col else []
+    fits = ols_fit(group_stats(data, by))
+    valid = df[[x, y]].notna().all(axis=1)
+    keys = df.loc[valid, color_col].astype(str) if color_col else pd.Series('', index=df.index[valid])
+    x_range = df.loc[valid, x].groupby(keys.to_numpy()).agg(['min', 'max'])
+    fit_by_name = {str(k) if color_col else '': row for k, row in fits.iterrows()}
+
+    for trace in list(fig.data):
+        name = trace.name if color_col else ''
+        fit = fit_by_name.get(name)
+        if fit is None or np.isnan(fit['slope']) or name not in x_range.index:
+            continue
+        color = trace.marker.color
+        xs = np.linspace(x_range.at[name, 'min'], x_range.at[name, 'max'], 50 if show_confidence_band else 2)
+        ys, lower, upper = ols_band(fit, xs)
+        if show_confidence_band and not np.isnan(fit['resid_std']):
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([xs, xs[::-1]]), y=np.concatenate([upper, lower[::-1]]),
+                fill='toself', fillcolor=color, opacity=0.2, line=dict(width=0),
+                legendgroup=trace.legendgroup, showlegend=False, hoverinfo='skip',
+            ))
+        fig.add_trace(go.Scatter(
+            x=xs, y=ys, mode='lines', name=trace.name,
+            legendgroup=trace.legendgroup, showlegend=False,
+            line=dict(color=color),
+            hovertemplate=(
+                f"<b>OLS trendline</b><br>y = {fit['slope']:.4f}x + {fit['intercept']:.4f}"
+                f"<br>R² = {fit['r2']:.4f}<extra>{trace.name}</extra>"
+            ),
+        ))
+
+
+def _distribution_figure(summary, title, x_title, y_title, order=None, colors=None, violin=True):
+    """Violins (precomputed KDE polygons) and boxes (precomputed quartiles/fences) per group.
+
+    Groups sit at integer x positions labelled with the group names; each violin
+    is scaled to the same maximum width, like Plotly's default scalemode='width'.
+    """
+    stats = summary.stats if order is None else summary.stats.loc[order]
+    colors = colors or [COLOR_NEUTRAL]
+    fig = go.Figure()
+    for pos, (group, row) in enumerate(stats.iterrows()):
+        color = colors[pos % len(colors)]
+        if violin and group in summary.kde:
+            grid, density = summary.kde[group]
+            half = density / density.max() * VIOLIN_HALF_WIDTH
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([pos - half, (pos + half)[::-1]]),
+                y=np.concatenate([grid, grid[::-1]]),
+                mode='lines', fill='toself', line=dict(color=color, width=1),
+                opacity=0.6, hoverinfo='skip', name=str(group),
+            ))
+        fig.add_trace(go.Box(
+            x=[pos], q1=[row['q1']], median=[row['median']], q3=[row['q3']],
+            lowerfence=[row['lowerfence']], upperfence=[row['upperfence']], mean=[row['mean']],
+            width=0.12 if violin else 0.6, marker_color=color, name=str(group),
+            hovertext=f"n = {int(row['n']):,}", boxpoints=False,
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis=dict(title=x_title, tickmode='array', tickvals=list(range(len(stats))),
+                   ticktext=[str(g) for g in stats.index]),
+        yaxis_title=y_title,
+        showlegend=False
+    )
+    return fig
+
 
 # ============================================================================
 # OVERVIEW PAGE FUNCTIONS (1_Visao_Geral.py)
@@ -33,42 +155,66 @@ def make_overview_kpi_cards(df):
     if df.empty:
         return None, None, None, None
     
-    n = len(df)
-    stress_mean = df["stress_score"].mean() if "stress_score" in df.columns else 0
-    burnout_high_pct = (df["burnout_level"] == "high").mean() * 100 if "burnout_level" in df.columns else 0
-    hours_mean = df["hours_per_week"].mean() if "hours_per_week" in df.columns else 0
+    totals = group_stats(df).iloc[0]
+    n = int(totals['n'])
+    stress_mean = totals['stress_mean'] if "stress_score" in df.columns else 0
+    burnout_high_pct = totals['high_burnout_rate'] if "burnout_level" in df.columns else 0
+    hours_mean = totals['hours_mean'] if "hours_per_week" in df.columns else 0
     
     return n, stress_mean, burnout_high_pct, hours_mean
 
 
+@cached_figure
 def plot_stress_distribution_histogram(df):
-    """Uses px.histogram with x=stress_score, appropriate bins, optional marginal."""
+    """Histogram of stress_score (about 20 bins) with a box marginal, drawn from server-side counts.
+
+    Bin totals come from one bincount (utils/distributions.py); the figure carries
+    only the bins and the five-number summary, not the rows.
+    """
     if df.empty or 'stress_score' not in df.columns:
         return go.Figure()
-    
-    fig = px.histogram(
-        df,
-        x='stress_score',
-        nbins=20,
-        marginal='box',
-        title="Distribuição de estresse",
-        labels={'stress_score': 'Score de Estresse', 'count': 'Frequência'},
-        color_discrete_sequence=[COLOR_NEUTRAL]
-    )
+
+    summary = histogram_summary(df, 'stress_score', nbins=20)
+    if summary is None:
+        return go.Figure()
+    edges, stats = summary.edges, summary.stats
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=summary.counts,
+        width=edges[1] - edges[0],
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate="Score de Estresse: %{customdata[0]:.4g}–%{customdata[1]:.4g}"
+                      "<br>Frequência: %{y}<extra></extra>",
+        marker_color=COLOR_NEUTRAL,
+    ))
+    # Box marginal (as px.histogram(marginal='box')), from the precomputed quartiles
+    fig.add_trace(go.Box(
+        y=[0], orientation='h', q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+        lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']], mean=[stats['mean']],
+        marker_color=COLOR_NEUTRAL, boxpoints=False, name='stress_score',
+        xaxis='x2', yaxis='y2',
+    ))
     fig.update_layout(
-        xaxis_title="Score de Estresse",
-        yaxis_title="Número de Respondentes",
+        title="Distribuição de estresse",
+        xaxis=dict(title="Score de Estresse", anchor='y', domain=[0.0, 1.0]),
+        yaxis=dict(title="Número de Respondentes", anchor='x', domain=[0.0, 0.8316]),
+        xaxis2=dict(anchor='y2', domain=[0.0, 1.0], matches='x', showticklabels=False),
+        yaxis2=dict(anchor='x2', domain=[0.8416, 1.0], showticklabels=False, showgrid=False, ticks=''),
+        bargap=0,
         showlegend=False
     )
     return fig
 
 
+@cached_figure
 def plot_burnout_level_composition(df):
     """Uses px.bar or px.pie/donut to show proportion of burnout levels."""
     if df.empty or 'burnout_level' not in df.columns:
         return go.Figure()
     
-    burnout_counts = df['burnout_level'].value_counts()
+    burnout_counts = group_stats(df, ['burnout_level'])['n'].sort_values(ascending=False, kind='stable')
     burnout_df = pd.DataFrame({
         'burnout_level': burnout_counts.index,
         'count': burnout_counts.values
@@ -88,35 +234,47 @@ def plot_burnout_level_composition(df):
     return fig
 
 
-def plot_core_correlation_heatmap(df):
-    """Compute correlation matrix for numeric variables and use px.imshow."""
+@cached_figure
+def plot_core_correlation_heatmap(df, method='pearson'):
+    """Pairwise correlation matrix of the numeric variables of every source, drawn with px.imshow.
+
+    Each pair uses the rows where both variables exist (sources only report some
+    of them). For the sidebar DataView the matrix comes from the shared additive
+    statistics of utils/correlation.py instead of scanning the filtered rows.
+
+    Args:
+        df: Filtered data (DataView or DataFrame)
+        method: 'pearson' or 'spearman'
+    """
     if df.empty:
         return go.Figure()
-    
-    # Select only numeric columns relevant for correlation
-    numeric_cols = []
-    if 'stress_score' in df.columns:
-        numeric_cols.append('stress_score')
-    if 'hours_per_week' in df.columns:
-        numeric_cols.append('hours_per_week')
-    
-    # Add burnout_numeric if available, or create it
-    if 'burnout_level' in df.columns:
-        df = df.copy()
-        df['burnout_numeric'] = df['burnout_level'].map({'low': 1, 'medium': 2, 'high': 3}).fillna(2)
-        numeric_cols.append('burnout_numeric')
-    
-    if len(numeric_cols) < 2:
+
+    if isinstance(df, DataView) and 'burnout_numeric' in df.columns:
+        corr_df = load_correlation(df.source).matrix(method, df.selection, df.positions)
+    else:
+        df = as_frame(df)
+        # Add burnout_numeric if missing
+        if 'burnout_numeric' not in df.columns and 'burnout_level' in df.columns:
+            df = df.copy()
+            df['burnout_numeric'] = df['burnout_level'].astype(str).map({'low': 1, 'medium': 2, 'high': 3}).fillna(2)
+        corr_df = CorrelationStats(df, dimensions=()).matrix(method)
+
+    # Variables with no data (or no variation) in the selection are left out
+    defined = ~np.isnan(np.diag(corr_df.to_numpy()))
+    corr_df = corr_df.loc[defined, defined]
+    if len(corr_df) < 2:
         return go.Figure()
-    
-    corr_df = df[numeric_cols].corr()
-    
+
+    title = "Correlação entre variáveis-chave"
+    if method == 'spearman':
+        title += " (Spearman)"
     fig = px.imshow(
         corr_df,
-        text_auto=True,
+        text_auto='.2f',
         color_continuous_scale='RdBu_r',
+        range_color=[-1, 1],
         aspect='auto',
-        title="Correlação entre variáveis-chave",
+        title=title,
         labels=dict(color="Correlação")
     )
     fig.update_layout(
@@ -135,32 +293,46 @@ def make_burnout_kpi_cards(df):
     if df.empty:
         return None, None, None
     
-    burnout_high_pct = (df["burnout_level"] == "high").mean() * 100 if "burnout_level" in df.columns else 0
-    stress_mean = df["stress_score"].mean() if "stress_score" in df.columns else 0
-    hours_mean = df["hours_per_week"].mean() if "hours_per_week" in df.columns else 0
+    totals = group_stats(df).iloc[0]
+    burnout_high_pct = totals['high_burnout_rate'] if "burnout_level" in df.columns else 0
+    stress_mean = totals['stress_mean'] if "stress_score" in df.columns else 0
+    hours_mean = totals['hours_mean'] if "hours_per_week" in df.columns else 0
     
     return burnout_high_pct, stress_mean, hours_mean
 
 
-def plot_hours_vs_stress_scatter(df):
-    """Uses px.scatter with x=hours_per_week, y=stress_score, trendline='ols', optional color by work_mode."""
+@cached_figure
+def plot_hours_vs_stress_scatter(df, max_points=None, show_confidence_band=False):
+    """Uses px.scatter with x=hours_per_week, y=stress_score, OLS trendline, optional color by work_mode.
+
+    Trendlines are fitted in closed form from sufficient statistics on every row,
+    optionally with a 95% confidence band. Above `max_points` rows (default
+    MAX_PLOT_POINTS) the markers are a stratified sample per work_mode drawn
+    with WebGL.
+    """
+    data = df
+    df = as_frame(df)
     if df.empty or not all(col in df.columns for col in ['hours_per_week', 'stress_score']):
         return go.Figure()
     
     color_col = 'work_mode' if 'work_mode' in df.columns else None
+    max_points = MAX_PLOT_POINTS if max_points is None else max_points
+    sampled = len(df) > max_points
+    points = _stratified_sample(df, color_col, max_points) if sampled else df
     
     fig = px.scatter(
-        df,
+        points,
         x='hours_per_week',
         y='stress_score',
         color=color_col,
-        trendline='ols',
-        title="Horas de trabalho × Estresse",
+        render_mode='webgl' if sampled else 'auto',
+        title="Horas de trabalho × Estresse" + _sample_note(len(points), len(df)),
         labels={
             'hours_per_week': 'Horas por Semana',
             'stress_score': 'Score de Estresse'
         }
     )
+    _add_ols_trendlines(fig, data, 'hours_per_week', 'stress_score', color_col, show_confidence_band)
     fig.update_layout(
         xaxis_title="Horas por Semana",
         yaxis_title="Score de Estresse"
@@ -168,50 +340,41 @@ def plot_hours_vs_stress_scatter(df):
     return fig
 
 
+@cached_figure
 def plot_stress_by_hours_band(df):
-    """Uses px.violin or px.box with x=hours_band, y=stress_score."""
+    """Violin + box of stress_score per hours_band, drawn from server-side summaries.
+
+    Densities and quartiles are computed per band (utils/distributions.py), so the
+    payload does not grow with the number of respondents.
+    """
     if df.empty or 'hours_per_week' not in df.columns or 'stress_score' not in df.columns:
         return go.Figure()
-    
-    df = df.copy()
-    # Create hours_band if not exists
-    if 'hours_band' not in df.columns:
-        df['hours_band'] = pd.cut(
-            df['hours_per_week'],
-            bins=[0, 35, 45, 100],
-            labels=['<35h', '35–45h', '>45h']
-        )
-    
-    fig = px.violin(
-        df,
-        x='hours_band',
-        y='stress_score',
-        box=True,
-        points='all',
+
+    if 'hours_band' in df.columns:
+        summary = distribution_summary(df, 'hours_band', 'stress_score')
+    else:
+        # Create hours_band if not exists
+        df = as_frame(df)
+        bands = pd.cut(df['hours_per_week'], bins=[0, 35, 45, 100], labels=['<35h', '35–45h', '>45h'])
+        summary = summarize(bands.rename('hours_band'), df['stress_score'])
+
+    return _distribution_figure(
+        summary,
+        colors=[COLOR_NEUTRAL],
         title="Estresse por faixa de horas",
-        labels={
-            'hours_band': 'Faixa de Horas',
-            'stress_score': 'Score de Estresse'
-        },
-        color_discrete_sequence=[COLOR_NEUTRAL]
-    )
-    fig.update_layout(
-        xaxis_title="Faixa de Horas",
-        yaxis_title="Score de Estresse"
+        x_title="Faixa de Horas",
+        y_title="Score de Estresse",
     )
-    return fig
 
 
+@cached_figure
 def plot_roles_burnout_ranking(df):
     """Aggregate by role, compute % high burnout, use px.bar horizontal sorted descending."""
     if df.empty or 'role' not in df.columns or 'burnout_level' not in df.columns:
         return go.Figure()
     
     # Calculate high burnout rate per role
-    role_stats = df.groupby('role').agg({
-        'burnout_level': lambda x: (x == 'high').mean() * 100,
-        'role': 'count'
-    }).rename(columns={'burnout_level': 'high_burnout_rate', 'role': 'n'})
+    role_stats = group_stats(df, ['role'])[['high_burnout_rate', 'n']]
     
     # Filter out roles with tiny N (less than 5)
     role_stats = role_stats[role_stats['n'] >= 5]
@@ -251,21 +414,23 @@ def make_environment_kpi_cards(df):
     if df.empty:
         return None, None, None
     
-    n_policies = df['policy'].nunique() if 'policy' in df.columns else 0
-    burnout_high_pct = (df["burnout_level"] == "high").mean() * 100 if "burnout_level" in df.columns else 0
-    stress_mean = df["stress_score"].mean() if "stress_score" in df.columns else 0
+    totals = group_stats(df).iloc[0]
+    n_policies = len(group_stats(df, ['policy'])) if 'policy' in df.columns else 0
+    burnout_high_pct = totals['high_burnout_rate'] if "burnout_level" in df.columns else 0
+    stress_mean = totals['stress_mean'] if "stress_score" in df.columns else 0
     
     return n_policies, burnout_high_pct, stress_mean
 
 
+@cached_figure
 def plot_burnout_distribution_by_policy(df):
     """For each policy, compute proportion of burnout levels. Use px.bar with barmode='stack'."""
     if df.empty or 'policy' not in df.columns or 'burnout_level' not in df.columns:
         return go.Figure()
     
     # Group by policy and burnout_level
-    policy_burnout = df.groupby(['policy', 'burnout_level']).size().reset_index(name='count')
-    policy_totals = df.groupby('policy').size().reset_index(name='total')
+    policy_burnout = group_stats(df, ['policy', 'burnout_level'])['n'].reset_index(name='count')
+    policy_totals = group_stats(df, ['policy'])['n'].reset_index(name='total')
     policy_burnout = policy_burnout.merge(policy_totals, on='policy')
     policy_burnout['proportion'] = (policy_burnout['count'] / policy_burnout['total'] * 100).round(1)
     
@@ -317,15 +482,13 @@ def plot_burnout_distribution_by_policy(df):
     return fig
 
 
+@cached_figure
 def plot_policy_burnout_ranking(df):
     """Aggregate by policy, compute high_burnout_rate, use px.bar horizontal sorted descending."""
     if df.empty or 'policy' not in df.columns or 'burnout_level' not in df.columns:
         return go.Figure()
     
-    policy_stats = df.groupby('policy').agg({
-        'burnout_level': lambda x: (x == 'high').mean() * 100,
-        'policy': 'count'
-    }).rename(columns={'burnout_level': 'high_burnout_rate', 'policy': 'n'})
+    policy_stats = group_stats(df, ['policy'])[['high_burnout_rate', 'n']]
     
     # Filter out policies with tiny N
     policy_stats = policy_stats[policy_stats['n'] >= 5]
@@ -361,15 +524,7 @@ def make_policy_summary_table(df):
     if df.empty or 'policy' not in df.columns:
         return pd.DataFrame()
     
-    summary = df.groupby('policy').agg({
-        'policy': 'count',
-        'stress_score': 'mean',
-        'burnout_level': lambda x: (x == 'high').mean() * 100
-    }).rename(columns={
-        'policy': 'N',
-        'stress_score': 'average_stress',
-        'burnout_level': 'high_burnout_rate'
-    }).reset_index()
+    summary = group_stats(df, ['policy'])[['n', 'stress_mean', 'high_burnout_rate']].reset_index()
     
     summary.columns = ['policy_name', 'N', 'average_stress', 'high_burnout_rate']
     # Sort by high_burnout_rate in ascending order (same as ranking chart)
@@ -387,16 +542,11 @@ def make_workmode_kpi_cards(df):
     if df.empty or 'work_mode' not in df.columns:
         return {}
     
-    workmode_stats = df.groupby('work_mode').agg({
-        'burnout_level': lambda x: (x == 'high').mean() * 100,
-        'stress_score': 'mean',
-        'hours_per_week': 'mean',
-        'work_mode': 'count'
-    }).rename(columns={
-        'burnout_level': 'high_burnout_pct',
-        'stress_score': 'avg_stress',
-        'hours_per_week': 'avg_hours',
-        'work_mode': 'n'
+    workmode_stats = group_stats(df, ['work_mode'])
+    workmode_stats = workmode_stats[['high_burnout_rate', 'stress_mean', 'hours_mean', 'n']].rename(columns={
+        'high_burnout_rate': 'high_burnout_pct',
+        'stress_mean': 'avg_stress',
+        'hours_mean': 'avg_hours'
     })
     
     # Order: onsite → hybrid → remote
@@ -414,45 +564,35 @@ def make_workmode_kpi_cards(df):
     return result
 
 
+@cached_figure
 def plot_stress_by_workmode(df):
-    """Uses px.violin or px.box with x=work_mode, y=stress_score."""
+    """Violin + box of stress_score per work_mode, drawn from server-side summaries."""
     if df.empty or 'work_mode' not in df.columns or 'stress_score' not in df.columns:
         return go.Figure()
-    
+
+    summary = distribution_summary(df, 'work_mode', 'stress_score')
     # Order: onsite → hybrid → remote
     workmode_order = ['onsite', 'hybrid', 'remote']
-    
-    fig = px.violin(
-        df,
-        x='work_mode',
-        y='stress_score',
-        box=True,
-        points='all',
+    order = [m for m in workmode_order if m in summary.stats.index]
+    order += [m for m in summary.stats.index if m not in order]
+
+    return _distribution_figure(
+        summary,
+        order=order,
+        colors=[COLOR_NEUTRAL, '#4ECDC4', '#FFE66D'],
         title="Estresse por modalidade de trabalho",
-        labels={
-            'work_mode': 'Modalidade',
-            'stress_score': 'Score de Estresse'
-        },
-        color='work_mode',
-        color_discrete_sequence=[COLOR_NEUTRAL, '#4ECDC4', '#FFE66D'],
-        category_orders={'work_mode': workmode_order}
+        x_title="Modalidade de Trabalho",
+        y_title="Score de Estresse",
     )
-    fig.update_layout(
-        xaxis_title="Modalidade de Trabalho",
-        yaxis_title="Score de Estresse",
-        showlegend=False
-    )
-    return fig
 
 
+@cached_figure
 def plot_burnout_by_workmode(df):
     """Aggregate by work_mode, compute high_burnout_rate, use px.bar."""
     if df.empty or 'work_mode' not in df.columns or 'burnout_level' not in df.columns:
         return go.Figure()
     
-    workmode_stats = df.groupby('work_mode').agg({
-        'burnout_level': lambda x: (x == 'high').mean() * 100
-    }).rename(columns={'burnout_level': 'high_burnout_rate'}).reset_index()
+    workmode_stats = group_stats(df, ['work_mode'])[['high_burnout_rate']].reset_index()
     
     # Order: onsite → hybrid → remote (only include modes that exist in data)
     workmode_order = ['onsite', 'hybrid', 'remote']
@@ -486,6 +626,7 @@ def plot_burnout_by_workmode(df):
     return fig
 
 
+@cached_figure
 def plot_workmode_delta_heatmap(df, segment_dim, delta_type):
     """
     Compute deltas in high_burnout_rate between work modes for each segment.
@@ -516,22 +657,18 @@ def plot_workmode_delta_heatmap(df, segment_dim, delta_type):
     mode1 = mode_map.get(modes[0].lower().strip(), modes[0].lower().strip())
     mode2 = mode_map.get(modes[1].lower().strip(), modes[1].lower().strip())
     
-    # Normalize work_mode to lowercase for comparison
-    df = df.copy()
-    df['work_mode_lower'] = df['work_mode'].str.lower().str.strip()
+    # Calculate high burnout rate per segment and work mode; work_mode keys are
+    # normalized per group instead of per row
+    segment_mode_stats = group_stats(df, [segment_dim, 'work_mode'])[['high_burnout_rate', 'n']].reset_index()
+    segment_mode_stats['work_mode_lower'] = segment_mode_stats['work_mode'].astype(str).str.lower().str.strip()
+    segment_mode_stats = segment_mode_stats.rename(columns={'high_burnout_rate': 'burnout_level'})
     
     # Filter to only the two modes we're comparing
-    df_filtered = df[df['work_mode_lower'].isin([mode1, mode2])]
+    segment_mode_stats = segment_mode_stats[segment_mode_stats['work_mode_lower'].isin([mode1, mode2])]
     
-    if df_filtered.empty:
+    if segment_mode_stats.empty:
         return go.Figure()
     
-    # Calculate high burnout rate per segment and work mode
-    segment_mode_stats = df_filtered.groupby([segment_dim, 'work_mode_lower']).agg({
-        'burnout_level': lambda x: (x == 'high').mean() * 100,
-        segment_dim: 'count'
-    }).rename(columns={segment_dim: 'n'}).reset_index()
-    
     # Filter segments with minimum sample size
     segment_mode_stats = segment_mode_stats[segment_mode_stats['n'] >= 5]
     
@@ -591,36 +728,28 @@ def make_segments_kpi_cards(df, segmentation):
     if df.empty or segmentation not in df.columns:
         return None, None, None
     
-    n_segments = df[segmentation].nunique()
-    
     # Calculate high burnout rate per segment
-    segment_stats = df.groupby(segmentation).agg({
-        'burnout_level': lambda x: (x == 'high').mean() * 100
-    }).reset_index()
-    segment_stats = segment_stats.sort_values('burnout_level', ascending=False)
+    segment_stats = group_stats(df, [segmentation])
+    n_segments = len(segment_stats)
+    segment_stats = segment_stats.sort_values('high_burnout_rate', ascending=False)
+    totals = group_stats(df).iloc[0]
     
     # Top 3 critical segments
-    top3 = segment_stats.head(3)
-    if not top3.empty:
-        top3_total = df[df[segmentation].isin(top3[segmentation])].shape[0]
-        pct_critical = (top3_total / len(df)) * 100 if len(df) > 0 else 0
-    else:
-        pct_critical = 0
+    top3_total = segment_stats['n'].head(3).sum()
+    pct_critical = (top3_total / totals['n']) * 100 if totals['n'] > 0 else 0
     
-    overall_high_burnout = (df['burnout_level'] == 'high').mean() * 100 if 'burnout_level' in df.columns else 0
+    overall_high_burnout = totals['high_burnout_rate'] if 'burnout_level' in df.columns else 0
     
     return n_segments, pct_critical, overall_high_burnout
 
 
+@cached_figure
 def plot_segment_burnout_ranking(df, segmentation):
     """Aggregate by segmentation, compute high_burnout_rate, use px.bar horizontal sorted descending."""
     if df.empty or segmentation not in df.columns or 'burnout_level' not in df.columns:
         return go.Figure()
     
-    segment_stats = df.groupby(segmentation).agg({
-        'burnout_level': lambda x: (x == 'high').mean() * 100,
-        segmentation: 'count'
-    }).rename(columns={'burnout_level': 'high_burnout_rate', segmentation: 'n'})
+    segment_stats = group_stats(df, [segmentation])[['high_burnout_rate', 'n']]
     
     # Filter out segments with tiny N
     segment_stats = segment_stats[segment_stats['n'] >= 5]
@@ -656,15 +785,13 @@ def plot_segment_burnout_ranking(df, segmentation):
     return fig
 
 
+@cached_figure
 def plot_segment_stress_mean(df, segmentation):
     """Similar aggregation but for average stress_score. px.bar horizontal."""
     if df.empty or segmentation not in df.columns or 'stress_score' not in df.columns:
         return go.Figure()
     
-    segment_stats = df.groupby(segmentation).agg({
-        'stress_score': 'mean',
-        segmentation: 'count'
-    }).rename(columns={'stress_score': 'stress_mean', segmentation: 'n'})
+    segment_stats = group_stats(df, [segmentation])[['stress_mean', 'n']]
     
     # Filter out segments with tiny N
     segment_stats = segment_stats[segment_stats['n'] >= 5]
@@ -705,17 +832,7 @@ def make_segment_summary_table(df, segmentation):
     if df.empty or segmentation not in df.columns:
         return pd.DataFrame()
     
-    summary = df.groupby(segmentation).agg({
-        segmentation: 'count',
-        'stress_score': 'mean',
-        'hours_per_week': 'mean',
-        'burnout_level': lambda x: (x == 'high').mean() * 100
-    }).rename(columns={
-        segmentation: 'N',
-        'stress_score': 'stress_mean',
-        'hours_per_week': 'hours_mean',
-        'burnout_level': 'high_burnout_rate'
-    }).reset_index()
+    summary = group_stats(df, [segmentation])[['n', 'stress_mean', 'hours_mean', 'high_burnout_rate']].reset_index()
     
     summary.columns = ['segment', 'N', 'stress_mean', 'hours_mean', 'high_burnout_rate']
     summary = summary.sort_values('high_burnout_rate', ascending=False)
@@ -729,6 +846,8 @@ def make_segment_summary_table(df, segmentation):
 
 def kpi_cards(df_filtered, df_total):
     """Legacy KPI cards function - kept for backward compatibility."""
+    df_filtered = as_frame(df_filtered)
+    df_total = as_frame(df_total)
     if df_filtered.empty:
         st.info("Nenhum dado disponível para KPIs.")
         return
@@ -802,9 +921,9 @@ def box_burnout_by_role(df):
     """Legacy function - kept for backward compatibility."""
     if df.empty or 'role' not in df.columns or 'stress_score' not in df.columns:
         return go.Figure()
-    fig = px.box(df, x='role', y='stress_score', points='all')
-    fig.update_layout(title="Estresse por Cargo/Modalidade", xaxis_title="Cargo", yaxis_title="Estresse")
-    return fig
+    summary = distribution_summary(df, 'role', 'stress_score')
+    return _distribution_figure(summary, title="Estresse por Cargo/Modalidade", x_title="Cargo",
+                                y_title="Estresse", violin=False)
 
 
 def stacked_env_policies(df, policy_col='policy', min_pct=5.0, show_percentages=True):
@@ -824,6 +943,7 @@ def violin_by_workmode(df):
 
 def plot_delta_heatmap(df, rows_col, cols_col, mode_col="work_mode", **kwargs):
     """Legacy function - simplified version."""
+    df = as_frame(df)
     # This is a simplified version - the new plot_workmode_delta_heatmap is more focused
     if df.empty or rows_col not in df.columns or cols_col not in df.columns:
         return go.Figure()
@@ -834,7 +954,7 @@ def plot_delta_heatmap(df, rows_col, cols_col, mode_col="work_mode", **kwargs):
         (df.get("burnout_level", "").astype(str).str.lower() == "high")
     )
     
-    g = df.groupby([rows_col, cols_col, mode_col]).agg(
+    g = df.groupby([rows_col, cols_col, mode_col], observed=True).agg(
         risk=("_risk_flag", "mean"), n=("_risk_flag", "size")
     ).reset_index()
     
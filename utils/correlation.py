@@ -0,0 +1,229 @@
+"""
+Correlações entre as variáveis numéricas a partir de estatísticas suficientes.
+
+O frame combinado tem uma linha por respondente de cada fonte, e cada fonte só
+informa parte das variáveis (sono, satisfação e produtividade só no workplace,
+reuniões só no burnout): a correlação de cada par é calculada sobre as linhas
+em que as duas variáveis existem, como em `DataFrame.corr`.
+
+`CorrelationStats` reduz o dataset uma vez por carga a somas aditivas por
+célula dos filtros da sidebar (role × work_mode × segment × hours_per_week) e
+por padrão de disponibilidade (quais variáveis são não nulas na linha):
+contagem, soma e soma dos quadrados de cada variável e produtos cruzados de
+cada par. A matriz de Pearson de uma seleção sai de somar as células que passam
+nos filtros e combinar os padrões com produtos de matrizes (contagens e somas
+de cada par sob a máscara de disponibilidade), sem voltar às linhas.
+
+Spearman é Pearson sobre os postos, que dependem do recorte: os postos densos
+de cada variável no dataset inteiro ficam em cache e os postos médios dentro do
+recorte saem de uma contagem por posto, sem ordenar de novo.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .filters import FILTER_DIMENSIONS, RANGE_COLUMN, FilterIndex
+from .ingest import CHUNK_ROWS
+from .schema import SOURCE_SCORE_COLUMNS
+
+# Variáveis do heatmap de correlação (as ausentes do frame são ignoradas)
+CORRELATION_COLUMNS = ['stress_score', 'hours_per_week', 'burnout_numeric'] + SOURCE_SCORE_COLUMNS
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+
+class CorrelationStats:
+    """Somas aditivas por célula de filtro e padrão de disponibilidade das variáveis.
+
+    Args:
+        df: Frame normalizado (dataset completo; guardado para Spearman)
+        columns: Variáveis (padrão: CORRELATION_COLUMNS presentes em `df`)
+        dimensions: Dimensões das células (padrão: as dos filtros da sidebar presentes em `df`)
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                 dimensions: Optional[Sequence[str]] = None):
+        if columns is None:
+            columns = [c for c in CORRELATION_COLUMNS if c in df.columns]
+        if dimensions is None:
+            dimensions = [d for d in FILTER_DIMENSIONS + [RANGE_COLUMN] if d in df.columns]
+        self.df = df
+        self.columns = list(columns)
+        self.dimensions = list(dimensions)
+        p = len(self.columns)
+
+        # Deslocamento pela média de cada variável: a correlação não muda e as somas ficam estáveis
+        self._shift = np.array([np.nanmean(df[c].to_numpy(dtype=np.float64)) if len(df) else 0.0
+                                for c in self.columns])
+        self._shift[np.isnan(self._shift)] = 0.0
+
+        # Padrão de disponibilidade de cada linha (bit j = coluna j não nula)
+        present = np.zeros(len(df), dtype=np.int64)
+        for j, c in enumerate(self.columns):
+            present |= df[c].notna().to_numpy().astype(np.int64) << j
+        patterns, self._row_patterns = np.unique(present, return_inverse=True)
+        self._available = (patterns[:, None] >> np.arange(p)) & 1 == 1  # padrões × variáveis
+
+        if self.dimensions:
+            keys = df[self.dimensions].assign(_pattern=self._row_patterns)
+            grouped = keys.groupby(list(keys.columns), observed=True, dropna=False, sort=False)
+            codes = grouped.ngroup().to_numpy(dtype=np.int64)
+            cells = grouped.size().reset_index().drop(columns=0)  # mesma ordem dos códigos (1ª ocorrência)
+            size = len(cells)
+        else:
+            codes = self._row_patterns
+            size = len(patterns)
+            cells = pd.DataFrame({'_pattern': np.arange(size)})
+        self.cells = cells.drop(columns='_pattern')
+        self._cell_patterns = cells['_pattern'].to_numpy(dtype=np.int64)
+        self._sums = self._accumulate(None, codes, size)
+        self._cell_index: Optional[FilterIndex] = None
+        self._ranks: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def supports(self, selection: Optional[Dict]) -> bool:
+        """True se todos os filtros ativos de `selection` são dimensões das células."""
+        return all(d in self.dimensions for d, v in (selection or {}).items() if v is not None and len(v))
+
+    def matrix(self, method: str = 'pearson', selection: Optional[Dict] = None,
+               positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Matriz de correlação par a par da seleção.
+
+        Args:
+            method: 'pearson' ou 'spearman'
+            selection: Filtros da sidebar (Pearson responde pelas células quando os cobrem)
+            positions: Posições das linhas da seleção (None = todas)
+        """
+        if method == 'spearman':
+            return self.spearman(positions)
+        if method != 'pearson':
+            raise ValueError(f"método desconhecido: {method!r} (use {CORRELATION_METHODS})")
+        return self.pearson(selection, positions)
+
+    def pearson(self, selection: Optional[Dict] = None, positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Pearson da seleção a partir das somas das células (ou das linhas, se os filtros não são cobertos)."""
+        if self.supports(selection):
+            cells = self.cell_index.select(selection or {})
+            sums, patterns = self._sums, self._cell_patterns
+            if cells is not None:
+                sums, patterns = sums[cells], patterns[cells]
+        else:
+            patterns = self._row_patterns if positions is None else self._row_patterns[positions]
+            sums = self._accumulate(positions, patterns, len(self._available))
+            patterns = np.arange(len(self._available))
+        by_pattern = np.stack([np.bincount(patterns, weights=sums[:, k], minlength=len(self._available))
+                               for k in range(sums.shape[1])], axis=1)
+        return self._frame(_correlation(by_pattern, self._available))
+
+    def spearman(self, positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Spearman das linhas em `positions`, com os postos de cada par nas linhas em que ambos existem."""
+        rows = np.arange(len(self.df)) if positions is None else np.asarray(positions)
+        row_patterns = self._row_patterns[rows]
+        present = np.flatnonzero(np.bincount(row_patterns, minlength=len(self._available)))
+        p = len(self.columns)
+
+        # Pares que usam o mesmo conjunto de linhas (mesmos padrões) são calculados juntos
+        groups: Dict[tuple, List[tuple]] = {}
+        for i in range(p):
+            for j in range(i, p):
+                both = tuple(present[self._available[present, i] & self._available[present, j]])
+                if both:
+                    groups.setdefault(both, []).append((i, j))
+
+        out = np.full((p, p), np.nan)
+        for both, pairs in groups.items():
+            sub = rows[np.isin(row_patterns, both)]
+            cols = sorted({c for pair in pairs for c in pair})
+            ranks = np.column_stack([self._ranks_within(self.columns[c], sub) for c in cols])
+            sums = _block_sums(ranks - (len(sub) + 1) / 2)
+            corr = _correlation(sums[None, :], np.ones((1, len(cols)), dtype=bool))
+            for i, j in pairs:
+                out[i, j] = out[j, i] = corr[cols.index(i), cols.index(j)]
+        return self._frame(out)
+
+    @property
+    def cell_index(self) -> FilterIndex:
+        """Índice de filtros sobre as células (construído no primeiro uso)."""
+        if self._cell_index is None:
+            self._cell_index = FilterIndex(self.cells)
+        return self._cell_index
+
+    def _accumulate(self, positions: Optional[np.ndarray], codes: np.ndarray, size: int) -> np.ndarray:
+        """Somas (ver `_block_sums`) das linhas em `positions` (None = todas) por código, em blocos de linhas."""
+        n = len(self.df) if positions is None else len(positions)
+        sums = np.zeros((size, _n_sums(len(self.columns))))
+        for start in range(0, n, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, n)
+            rows = slice(start, stop) if positions is None else positions[start:stop]
+            values = np.column_stack([self.df[c].to_numpy()[rows] for c in self.columns]).astype(np.float64)
+            values -= self._shift
+            sums += _block_sums(np.where(np.isnan(values), 0.0, values), codes[start:stop], size)
+        return sums
+
+    def _ranks_within(self, column: str, rows: np.ndarray) -> np.ndarray:
+        """Postos médios (empates = média, como `rank()`) dos valores de `column` nas linhas `rows`."""
+        dense = self._ranks.get(column)
+        if dense is None:
+            dense = self._ranks[column] = pd.factorize(self.df[column], sort=True)[0].astype(np.int32)
+        codes = dense[rows]
+        counts = np.bincount(codes, minlength=int(dense.max()) + 1)
+        return (np.cumsum(counts) - (counts - 1) / 2)[codes]
+
+    def _frame(self, values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+
+def _n_sums(p: int) -> int:
+    """Somas por grupo: contagem, p somas, p somas dos quadrados e p(p+1)/2 produtos cruzados."""
+    return 1 + 2 * p + p * (p + 1) // 2
+
+
+def _block_sums(values: np.ndarray, codes: Optional[np.ndarray] = None, size: int = 1) -> np.ndarray:
+    """Somas de um bloco de linhas por código (uma linha só quando `codes` é None).
+
+    `values` tem zero onde a variável é nula, então somas e produtos cruzados só
+    recebem as linhas em que a variável (ou o par) existe.
+    """
+    p = values.shape[1]
+    upper_i, upper_j = np.triu_indices(p)
+    if codes is None:
+        cross = values.T @ values
+        return np.concatenate([[len(values)], values.sum(axis=0), np.diag(cross), cross[upper_i, upper_j]])
+    columns = [np.ones(len(values))] + [values[:, j] for j in range(p)] \
+        + [values[:, j] ** 2 for j in range(p)] + [values[:, i] * values[:, j] for i, j in zip(upper_i, upper_j)]
+    return np.stack([np.bincount(codes, weights=c, minlength=size) for c in columns], axis=1)
+
+
+def _correlation(sums: np.ndarray, available: np.ndarray) -> np.ndarray:
+    """Matriz de Pearson par a par a partir das somas por padrão de disponibilidade.
+
+    Para o par (i, j) contam só os padrões em que as duas variáveis existem:
+    contagens, somas e somas dos quadrados do par saem de produtos de matrizes
+    com a máscara de disponibilidade (padrões × variáveis). NaN quando o par tem
+    menos de duas linhas ou uma das variáveis não varia nelas.
+    """
+    p = available.shape[1]
+    mask = available.astype(np.float64)
+    n, s, q, cross = sums[:, 0], sums[:, 1:1 + p], sums[:, 1 + p:1 + 2 * p], sums[:, 1 + 2 * p:]
+    count = (mask * n[:, None]).T @ mask   # [i, j] = linhas com i e j
+    sx = s.T @ mask                         # [i, j] = Σ x_i nas linhas com i e j
+    sxx = q.T @ mask
+    sxy = np.zeros((p, p))
+    sxy[np.triu_indices(p)] = cross.sum(axis=0)
+    sxy = np.triu(sxy) + np.triu(sxy, 1).T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_x = count * sxx - sx * sx        # variância de i nas linhas do par (× count²)
+        var_y = var_x.T
+        cov = count * sxy - sx * sx.T
+        r = cov / np.sqrt(var_x * var_y)
+        # Variável constante no par (a menos de arredondamento) ou menos de duas linhas
+        flat = (var_x <= count * sxx * 1e-12) | (var_y <= count.T * sxx.T * 1e-12) | (count < 2)
+    r[flat] = np.nan
+    r = np.clip(r, -1.0, 1.0)
+    diagonal = np.diag_indices(p)
+    r[diagonal] = np.where(np.isnan(r[diagonal]), np.nan, 1.0)
+    return r
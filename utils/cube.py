@@ -0,0 +1,281 @@
+"""
+Cubo de agregados pré-calculados sobre as dimensões dos filtros.
+
+Uma vez por carga do dataset o frame linha-a-linha é reduzido a uma célula por
+combinação observada de (role × work_mode × segment × policy × hours_per_week ×
+burnout_level), com medidas aditivas: contagem, soma e soma dos quadrados de
+`stress_score` e `hours_per_week` e somas cruzadas do par horas × estresse.
+KPIs, rankings e linhas de tendência da seleção atual da sidebar são
+respondidos somando as células que passam nos filtros, então o custo por
+interação é proporcional ao número de grupos e não ao número de respondentes.
+
+`hours_per_week` entra como dimensão (em vez de só `hours_band`) para que o
+intervalo do slider seja respondido de forma exata; `hours_band` é derivada
+dela e vem junto sem aumentar o número de células.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregations import MEASURES, derive_stats, measure_frame
+from .filters import FILTER_DIMENSIONS, RANGE_COLUMN, FilterIndex
+
+CUBE_DIMENSIONS = ['role', 'work_mode', 'segment', 'policy', 'hours_per_week', 'hours_band', 'burnout_level']
+
+
+class AggregateCube:
+    """Células agregadas + consultas por seleção e dimensão.
+
+    Args:
+        cells: DataFrame com uma linha por célula (colunas de dimensão + MEASURES)
+        dimensions: Dimensões presentes nas células
+    """
+
+    def __init__(self, cells: pd.DataFrame, dimensions: List[str]):
+        self.cells = cells
+        self.dimensions = list(dimensions)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'AggregateCube':
+        """Constrói o cubo a partir do frame normalizado (uma única passada de groupby)."""
+        dims = [d for d in CUBE_DIMENSIONS if d in df.columns]
+        rows = measure_frame(df)
+        keys = [df[d] for d in dims]
+
+        if dims:
+            cells = rows.groupby(keys, observed=True, dropna=False, sort=False).sum().reset_index()
+        else:
+            cells = rows.sum().to_frame().T
+        return cls(cells, dims)
+
+    def merge(self, other: 'AggregateCube', dtypes: Optional[pd.Series] = None) -> 'AggregateCube':
+        """Soma as células de `other` às deste cubo (atualização por delta).
+
+        O resultado é o mesmo de `from_frame` sobre as linhas dos dois cubos juntas,
+        sem voltar às linhas: o custo é proporcional ao número de células.
+
+        Args:
+            other: Cubo das linhas novas (mesmas dimensões)
+            dtypes: Tipos das colunas do frame completo; as dimensões são convertidas
+                para eles (ex.: categorias unificadas depois do append)
+        """
+        if other.dimensions != self.dimensions:
+            raise ValueError(f"dimensões diferentes: {self.dimensions} != {other.dimensions}")
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        if dtypes is not None:
+            for dim in self.dimensions:
+                if dim in dtypes.index and cells[dim].dtype != dtypes[dim]:
+                    cells[dim] = cells[dim].astype(dtypes[dim])
+        if self.dimensions:
+            cells = cells.groupby(self.dimensions, observed=True, dropna=False, sort=False)[MEASURES].sum().reset_index()
+        else:
+            cells = cells[MEASURES].sum().to_frame().T
+        return AggregateCube(cells, self.dimensions)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def supports(self, by: Sequence[str]) -> bool:
+        """True se todas as dimensões de `by` estão no cubo."""
+        return all(b in self.dimensions for b in by)
+
+    def select(self, selection: Optional[Dict] = None) -> pd.DataFrame:
+        """Células que passam na seleção da sidebar.
+
+        A semântica é a mesma de `render_sidebar`: lista vazia não filtra, valores
+        nulos nunca passam num filtro ativo e `hours_per_week` é um intervalo fechado.
+        """
+        cells = self.cells
+        if not selection:
+            return cells
+        mask = np.ones(len(cells), dtype=bool)
+        for dim, allowed in selection.items():
+            if dim not in self.dimensions:
+                continue
+            if dim == 'hours_per_week':
+                if allowed is None:
+                    continue
+                lo, hi = allowed
+                col = cells[dim]
+                mask &= ((col >= lo) & (col <= hi)).to_numpy()
+            elif allowed:
+                mask &= cells[dim].isin(list(allowed)).to_numpy()
+        return cells[mask]
+
+    def rollup(self, by: Sequence[str] = (), selection: Optional[Dict] = None) -> pd.DataFrame:
+        """Soma as células da seleção por `by` e deriva taxas, médias e desvios.
+
+        Returns:
+            DataFrame indexado por `by` (uma linha só quando `by` é vazio) com as
+            medidas aditivas e as colunas derivadas `high_burnout_rate` (%),
+            `stress_mean`, `stress_std`, `hours_mean` e `hours_std`. Chaves nulas
+            são descartadas, como no `groupby` padrão do pandas.
+        """
+        return derive_stats(_sum_cells(self.select(selection), list(by)))
+
+    def totals(self, selection: Optional[Dict] = None) -> pd.Series:
+        """Agregado geral da seleção (uma linha de `rollup` sem dimensões)."""
+        return self.rollup((), selection).iloc[0]
+
+    @property
+    def cell_index(self) -> FilterIndex:
+        """Índice de filtros sobre as células (construído no primeiro uso)."""
+        index = self.__dict__.get('_cell_index')
+        if index is None:
+            index = self._cell_index = FilterIndex(self.cells)
+        return index
+
+
+def _sum_cells(cells: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """MEASURES somadas por `by` (uma linha só quando `by` é vazio)."""
+    if by:
+        return cells.groupby(by, observed=True, sort=True)[MEASURES].sum()
+    return cells[MEASURES].sum().to_frame().T
+
+
+def _normalized(selection: Dict, dims: Sequence[str]) -> Dict:
+    """Seleção só com as dimensões do cubo; filtros que não restringem viram None."""
+    out = {}
+    for dim in dims:
+        allowed = selection.get(dim)
+        if dim == RANGE_COLUMN:
+            out[dim] = tuple(allowed) if allowed is not None else None
+        else:
+            out[dim] = frozenset(allowed) if allowed else None
+    return out
+
+
+
+def _as_selection(normalized: Dict) -> Dict:
+    """Volta de `_normalized` para o formato de seleção da sidebar (sem os filtros inativos)."""
+    return {d: (sorted(v) if isinstance(v, frozenset) else v) for d, v in normalized.items() if v is not None}
+
+
+class IncrementalRollup:
+    """Rollups de uma sessão atualizados por delta entre interações da sidebar.
+
+    Guarda, para cada `by`, as somas da última seleção consultada (um array
+    grupos × MEASURES, com os grupos de `by` sobre o cubo inteiro). Quando a nova
+    seleção difere da anterior em uma única dimensão de filtro (valores marcados
+    ou desmarcados num multiselect, ou o intervalo de horas), só as células da
+    fatia alterada são somadas e acrescentadas/subtraídas das somas anteriores.
+    Contagens e somas são aditivas, então o resultado é o de
+    `AggregateCube.rollup` (a menos de arredondamento); as somas de ponto
+    flutuante são recalculadas do cubo a cada `MAX_DELTA_STEPS` deltas seguidos
+    para não acumular erro.
+
+    Args:
+        cube: Cubo do dataset
+    """
+
+    MAX_DELTA_STEPS = 16
+
+    def __init__(self, cube: AggregateCube):
+        self.cube = cube
+        self._filters = [d for d in FILTER_DIMENSIONS + [RANGE_COLUMN] if d in cube.dimensions]
+        self._values = cube.cells[MEASURES].to_numpy(dtype=np.float64)
+        self._groups: Dict[Tuple[str, ...], Tuple[np.ndarray, pd.Index, pd.Series]] = {}
+        self._last: Dict[Tuple[str, ...], Tuple[Dict, np.ndarray, int]] = {}
+        self.deltas = 0
+        self.full = 0
+
+    def rollup(self, by: Sequence[str] = (), selection: Optional[Dict] = None) -> pd.DataFrame:
+        """Mesmo resultado de `AggregateCube.rollup(by, selection)`."""
+        selection = selection or {}
+        if any(d not in self._filters for d in selection if d in self.cube.dimensions):
+            return self.cube.rollup(by, selection)  # filtro fora da sidebar: sem estado
+        key = tuple(by)
+        current = _normalized(selection, self._filters)
+        previous = self._last.get(key)
+
+        if previous is not None and previous[0] == current:
+            return self._frame(key, previous[1])
+
+        totals = None
+        if previous is not None and previous[2] < self.MAX_DELTA_STEPS:
+            totals = self._delta(key, previous[0], current, previous[1])
+        if totals is None:
+            totals = self._sums(key, self.cube.cell_index.select(_as_selection(current)))
+            self._last[key] = (current, totals, 0)
+            self.full += 1
+        else:
+            self._last[key] = (current, totals, previous[2] + 1)
+            self.deltas += 1
+        return self._frame(key, totals)
+
+    def _group(self, key: Tuple[str, ...]) -> Tuple[np.ndarray, pd.Index, pd.Series]:
+        """Código do grupo de `key` de cada célula (chave nula = último), índice e tipos do rollup."""
+        group = self._groups.get(key)
+        if group is None:
+            cells = self.cube.cells
+            reference = _sum_cells(cells, list(key))
+            if key:
+                codes = cells.groupby(list(key), observed=True, sort=True).ngroup()
+                codes = codes.fillna(len(reference)).to_numpy(dtype=np.int64)
+            else:
+                codes = np.zeros(len(cells), dtype=np.int64)
+            group = self._groups[key] = (codes, reference.index, reference.dtypes)
+        return group
+
+    def _sums(self, key: Tuple[str, ...], positions: Optional[np.ndarray]) -> np.ndarray:
+        """Somas das células em `positions` (None = todas) por grupo de `key`."""
+        codes, index, _ = self._group(key)
+        values = self._values
+        if positions is not None:
+            codes, values = codes[positions], values[positions]
+        size = len(index) + 1
+        sums = np.stack([np.bincount(codes, weights=values[:, j], minlength=size)
+                         for j in range(values.shape[1])], axis=1)
+        return sums[:-1]
+
+    def _frame(self, key: Tuple[str, ...], totals: np.ndarray) -> pd.DataFrame:
+        _, index, dtypes = self._group(key)
+        if key:
+            keep = totals[:, MEASURES.index('n')] > 0
+            totals, index = totals[keep], index[keep]
+        columns = {m: totals[:, j].astype(dtypes[m]) for j, m in enumerate(MEASURES)}
+        return derive_stats(pd.DataFrame(columns, index=index))
+
+    def _delta(self, key: Tuple[str, ...], old: Dict, new: Dict, totals: np.ndarray) -> Optional[np.ndarray]:
+        """Somas de `new` a partir das de `old`, ou None se a mudança não é uma fatia de uma dimensão."""
+        changed = [d for d in new if new[d] != old.get(d)]
+        if len(changed) != 1:
+            return None
+        dim = changed[0]
+        if old[dim] is None or new[dim] is None:
+            return None  # "todos" ↔ lista: a fatia é o complemento, recalcula
+        others = _as_selection({d: v for d, v in new.items() if d != dim})
+
+        added = self._slice(dim, new[dim], old[dim], others)
+        removed = self._slice(dim, old[dim], new[dim], others)
+        if len(added) + len(removed) > len(self.cube) // 2:
+            return None  # fatia grande: somar tudo de novo sai mais barato
+
+        totals = totals + self._sums(key, added) - self._sums(key, removed)
+        totals[totals[:, MEASURES.index('n')] == 0] = 0  # grupo vazio: descarta resíduo de arredondamento
+        return totals
+
+    def _slice(self, dim: str, inside, outside, others: Dict) -> np.ndarray:
+        """Posições das células que passam em `others`, estão em `inside` e não em `outside` (na dimensão `dim`)."""
+        index = self.cube.cell_index
+        if dim != RANGE_COLUMN:
+            values = sorted(inside - outside)
+            if not values:
+                return np.empty(0, dtype=np.int32)
+            positions = index.select({**others, dim: values})
+            return np.arange(len(self.cube), dtype=np.int32) if positions is None else positions
+
+        (lo, hi), (out_lo, out_hi) = inside, outside
+        pieces = [(lo, min(hi, out_lo)), (max(lo, out_hi), hi)]  # [lo, hi] fora de [out_lo, out_hi]
+        parts = []
+        for piece_lo, piece_hi in pieces:
+            if piece_lo > piece_hi:
+                continue
+            positions = index.select({**others, dim: (piece_lo, piece_hi)})
+            parts.append(np.arange(len(self.cube), dtype=np.int32) if positions is None else positions)
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        positions = np.unique(np.concatenate(parts))
+        hours = self.cube.cells[dim].to_numpy(dtype=np.float64)[positions]
+        return positions[(hours < out_lo) | (hours > out_hi)]
@@ -0,0 +1,201 @@
+"""
+Cache persistente em disco do dataset já normalizado.
+
+O resultado de `load_data` (CSV lido + `_normalize_columns` + concatenação) é
+gravado em formato colunar (Feather/Arrow) junto de um manifesto JSON com a
+"impressão digital" de cada CSV de origem (tamanho, mtime e SHA-256). Num cold
+start do processo o frame preparado é lido direto do disco, e a normalização só
+roda de novo quando algum CSV realmente muda.
+
+O arquivo é Arrow IPC sem compressão e num único lote (`write_arrow`) e é
+aberto com memory map (`read_mapped`): as colunas do DataFrame apontam direto
+para as páginas do arquivo no page cache do sistema operacional, então vários
+processos do Streamlit no mesmo host compartilham a mesma memória física e um
+worker novo fica pronto sem parse nem cópia.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Diretório do cache (pode ser sobrescrito, ex.: volume compartilhado entre pods)
+CACHE_DIR = Path(os.environ.get("MHD_CACHE_DIR", ".cache"))
+
+# Incrementar sempre que a normalização mudar, para invalidar caches antigos
+CACHE_VERSION = 6
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def write_arrow(df: pd.DataFrame, path) -> None:
+    """Grava `df` como Arrow IPC (Feather v2) pronto para `read_mapped` (sem compressão, um lote)."""
+    df.reset_index(drop=True).to_feather(path, compression="uncompressed", chunksize=max(len(df), 1))
+
+
+def read_mapped(path) -> pd.DataFrame:
+    """Abre um arquivo Arrow IPC/Feather com memory map.
+
+    Colunas numéricas e códigos de categorias sem nulos viram arrays somente
+    leitura sobre as páginas do arquivo (sem cópia); colunas booleanas (bits no
+    Arrow) e arquivos comprimidos ou em vários lotes são copiados para a memória.
+    Trocar o arquivo com `os.replace` não afeta frames já abertos.
+    """
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _file_sha256(path: str) -> str:
+    """Calcula o SHA-256 do arquivo em blocos (não carrega tudo em memória)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(path: str, with_hash: bool = True) -> Optional[dict]:
+    """Retorna tamanho/mtime (e opcionalmente o hash) do arquivo, ou None se não existir."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    fp = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fp["sha256"] = _file_sha256(path)
+    return fp
+
+
+def _cache_stem(paths: List[str]) -> Path:
+    """Nome base dos arquivos de cache para um conjunto de fontes."""
+    key = json.dumps({"paths": list(paths), "version": CACHE_VERSION})
+    return CACHE_DIR / f"prepared-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+
+def _sources_match(paths: List[str], manifest: dict) -> Tuple[bool, bool]:
+    """Compara as fontes atuais com o manifesto.
+
+    Returns:
+        (válido, manifesto_desatualizado). O hash só é recalculado quando
+        tamanho/mtime divergem, e um arquivo apenas "tocado" continua válido.
+    """
+    stale = False
+    recorded = manifest.get("sources", {})
+    for p in paths:
+        old = recorded.get(p)
+        current = _fingerprint(p, with_hash=False)
+        if old is None or current is None:
+            if old is not current:
+                return False, False
+            continue
+        if current["size"] != old["size"]:
+            return False, False
+        if current["mtime_ns"] != old["mtime_ns"]:
+            if _file_sha256(p) != old.get("sha256"):
+                return False, False
+            old["mtime_ns"] = current["mtime_ns"]
+            stale = True
+    return True, stale
+
+
+def _write_manifest(manifest_path: Path, manifest: dict) -> None:
+    tmp = manifest_path.with_suffix(f".json.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+
+
+def load_cached(paths: List[str]) -> Optional[Tuple[pd.DataFrame, Dict[str, str]]]:
+    """Lê o dataset preparado do cache, se ainda for válido para as fontes.
+
+    Returns:
+        (df, erros_por_fonte) ou None quando não há cache válido.
+    """
+    stem = _cache_stem(paths)
+    manifest_path = stem.with_suffix(".json")
+    data_path = stem.with_suffix(".feather")
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("version") != CACHE_VERSION or not data_path.exists():
+            return None
+        valid, stale = _sources_match(paths, manifest)
+        if not valid:
+            return None
+        df = read_mapped(data_path)
+        if stale:
+            _write_manifest(manifest_path, manifest)
+    except (OSError, ValueError, KeyError, ImportError):
+        # Cache ausente/corrompido ou pyarrow indisponível: reconstrói a partir dos CSVs
+        return None
+    return df, manifest.get("errors", {})
+
+
+def read_prepared(paths: List[str]) -> Optional[Tuple[pd.DataFrame, dict]]:
+    """Lê o dataset preparado e o manifesto sem validar as fontes (usado na atualização incremental).
+
+    Returns:
+        (df, manifesto) ou None quando não há cache legível desta versão.
+    """
+    stem = _cache_stem(paths)
+    data_path = stem.with_suffix(".feather")
+    try:
+        manifest = json.loads(stem.with_suffix(".json").read_text(encoding="utf-8"))
+        if manifest.get("version") != CACHE_VERSION or not data_path.exists():
+            return None
+        df = read_mapped(data_path)
+    except (OSError, ValueError, KeyError, ImportError):
+        return None
+    return df, manifest
+
+
+def save_cached(paths: List[str], df: pd.DataFrame, errors: Optional[Dict[str, str]] = None,
+                extra: Optional[dict] = None, tables: Optional[Dict[str, pd.DataFrame]] = None) -> bool:
+    """Grava o dataset preparado e o manifesto das fontes (escrita atômica).
+
+    Args:
+        extra: Campos adicionais do manifesto (ex.: estado da atualização incremental)
+        tables: Tabelas auxiliares gravadas ao lado do dataset (`load_table(paths, nome)`)
+
+    Returns:
+        True se o cache foi gravado; falhas de escrita não interrompem o dashboard.
+    """
+    stem = _cache_stem(paths)
+    manifest = {
+        "version": CACHE_VERSION,
+        "sources": {p: _fingerprint(p) for p in paths},
+        "errors": dict(errors or {}),
+        "rows": int(len(df)),
+        **(extra or {}),
+    }
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for name, frame in {None: df, **(tables or {})}.items():
+            suffix = ".feather" if name is None else f".{name}.feather"
+            tmp = stem.with_suffix(f"{suffix}.{os.getpid()}.tmp")
+            write_arrow(frame, tmp)
+            os.replace(tmp, stem.with_suffix(suffix))
+        _write_manifest(stem.with_suffix(".json"), manifest)
+    except (OSError, ValueError, TypeError, ImportError):
+        return False
+    return True
+
+
+def load_table(paths: List[str], name: str) -> Optional[pd.DataFrame]:
+    """Tabela auxiliar gravada por `save_cached(..., tables={name: ...})`, ou None."""
+    try:
+        return read_mapped(_cache_stem(paths).with_suffix(f".{name}.feather"))
+    except (OSError, ValueError, ImportError):
+        return None
+
+
+def clear_cache() -> int:
+    """Remove todos os arquivos de cache. Retorna quantos arquivos foram apagados."""
+    removed = 0
+    if CACHE_DIR.exists():
+        for f in CACHE_DIR.glob("prepared-*"):
+            f.unlink(missing_ok=True)
+            removed += 1
+    return removed
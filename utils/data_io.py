@@ -1,153 +1,321 @@
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-@st.cache_data(show_spinner=False)
+from .adapters import adapter_for
+from .data_cache import load_cached, read_mapped, save_cached
+from .ingest import CHUNK_ROWS, ColumnStore, count_rows
+from .schema import NORMALIZED_COLUMNS
+from .correlation import CorrelationStats
+from .cube import AggregateCube, IncrementalRollup
+from .filters import FilterIndex, selection_key
+from .incremental import INCOMING_DIR, prepared_cube, refresh_dataset
+from .metrics import annotate, cache_event, cache_lookup, cache_miss, span, timed
+from .reloader import DatasetReloader, Snapshot, snapshot_of, source_signature
+from .view import DataView
+
+# Caminhos dos seus datasets
+DEFAULT_PATHS = [
+    "data/dataset_principal.csv",
+    "data/dataset_burnout.csv",
+    "data/dataset_workplace.csv",
+]
+
+# Leitura paralela das fontes: nº de workers (0 = uma por fonte, até o nº de CPUs)
+# e tipo de pool ("thread" para o parse de I/O, "process" para normalização pesada)
+LOAD_WORKERS = int(os.environ.get("MHD_LOAD_WORKERS", "0"))
+LOAD_EXECUTOR = os.environ.get("MHD_LOAD_EXECUTOR", "thread")
+
+# Atualização incremental (utils/incremental.py): lotes novos em MHD_INCOMING_DIR e
+# linhas acrescentadas aos CSVs entram no dataset preparado sem reprocessar o histórico
+INCREMENTAL = os.environ.get("MHD_INCREMENTAL", "1") != "0"
+
+# Extensões tratadas por `load_data(path=...)` como dataset já preparado (Arrow IPC, aberto com memory map)
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+
+# Segundos entre verificações das fontes pela recarga em segundo plano (0 = desativada)
+RELOAD_INTERVAL = float(os.environ.get("MHD_RELOAD_INTERVAL", "30"))
+
+# Frames fora dos snapshots (ex.: `load_data(path=...)`) com índices/correlação em cache
+FALLBACK_ENTRIES = 4
+
+
+@timed()
 def load_data(path: Optional[str] = None) -> pd.DataFrame:
     """Carrega dados a partir de CSV(s).
     - Ajuste o caminho padrão e/ou substitua por leitura de múltiplos arquivos.
     - Garanta que os nomes de colunas usados em utils/charts.py existam.
+    - O frame normalizado é persistido em disco (utils/data_cache.py) e só é
+      reconstruído quando algum CSV de origem muda; com INCREMENTAL as fontes
+      padrão recebem só as linhas/lotes novos (utils/incremental.py).
+    - As fontes padrão são recarregadas em segundo plano (utils/reloader.py):
+      a página recebe sempre a última versão já pronta, sem esperar a recarga.
+    - O frame das fontes padrão é o mesmo objeto para todas as sessões e páginas
+      (sem cópia por rerun): trate-o como somente leitura e copie antes de alterar.
+    - Vem de um arquivo Arrow aberto com memory map, compartilhado entre os
+      processos do host; `path` também pode apontar para um dataset já preparado
+      (.arrow/.feather gravado com `data_cache.write_arrow`), aberto sem parse.
     """
-    if path:
-        df = pd.read_csv(path)
-        return _normalize_columns(df, path)
-    
-    # Caminhos dos seus datasets
-    default_paths = [
-        "data/dataset_principal.csv",
-        "data/dataset_burnout.csv",
-        "data/dataset_workplace.csv",
-    ]
-    
+    with cache_lookup('load_data'):
+        if path and path.endswith(ARROW_SUFFIXES):
+            df, errors = _mapped_dataset(path, os.stat(path).st_mtime_ns), {}
+        elif path:
+            df, errors = _load_path(path)
+        else:
+            snapshot = dataset_reloader().current()
+            df, errors = snapshot.df, snapshot.errors
+
+    for p, err in errors.items():
+        st.warning(f"Não foi possível carregar {p}: {err}")
+
+    if df.empty and not path:
+        st.warning("Nenhum CSV encontrado em /data. Carregando dataframe vazio.")
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _load_path(path: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    cache_miss('load_data')
+    return _prepare_dataset([path], tag_source=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _mapped_dataset(path: str, mtime_ns: int) -> pd.DataFrame:
+    """Dataset preparado em Arrow, mapeado uma vez por processo (reaberto se o arquivo muda)."""
+    cache_miss('load_data')
+    return read_mapped(path)
+
+
+@st.cache_resource(show_spinner=False)
+def dataset_reloader() -> DatasetReloader:
+    """Recarga em segundo plano das fontes padrão, compartilhada por todas as sessões."""
+    return DatasetReloader(
+        build=lambda: _prepare_dataset(DEFAULT_PATHS),
+        signature=lambda: source_signature(DEFAULT_PATHS, INCOMING_DIR if INCREMENTAL else None),
+        interval=RELOAD_INTERVAL,
+        prepare=_prepare_snapshot,
+    ).start()
+
+
+def _prepare_snapshot(snapshot: Snapshot) -> None:
+    """Constrói cubo, índice de filtros e somas de correlação da versão nova antes de publicá-la."""
+    snapshot.derived('indexes', lambda: _build_indexes(snapshot.df))
+    snapshot.derived('correlation', lambda: CorrelationStats(snapshot.df))
+
+
+def _prepare_dataset(paths: List[str], tag_source: bool = True) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Dataset preparado: cache em disco, atualização incremental ou reconstrução completa."""
+    cache_miss('load_data')  # roda na thread da página só na primeira carga (depois, no recarregador)
+    incremental = INCREMENTAL and tag_source
+    cached = None if incremental else load_cached(paths)
+    if cached is not None:
+        return cached
+    if incremental:
+        return refresh_dataset(paths)
+    df, errors = _build_dataset(paths, tag_source=tag_source)
+    if not df.empty and save_cached(paths, df, errors):
+        # Reabre do disco com memory map: mesmas páginas que os outros processos
+        return load_cached(paths) or (df, errors)
+    return df, errors
+
+
+def _build_dataset(paths: List[str], tag_source: bool = True,
+                   typed: bool = True) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Lê e normaliza cada CSV e junta o resultado.
+
+    Com uma única fonte explícita (`tag_source=False`) erros de leitura são propagados,
+    como na chamada `load_data(path=...)`. Com `typed=True` (padrão) os CSVs são lidos
+    em chunks direto para um `ColumnStore` (utils/ingest.py) com as colunas de
+    NORMALIZED_COLUMNS já nos tipos compactos de utils/schema.py, uma fonte por
+    worker (LOAD_WORKERS / LOAD_EXECUTOR), e juntos na ordem de `paths`;
+    `typed=False` lê cada fonte inteira e mantém também as colunas brutas (usado
+    em relatórios).
+
+    Returns:
+        (df, mensagens de erro por caminho)
+    """
+    if not typed:
+        return _build_dataset_eager(paths, tag_source)
+
+    if not tag_source:
+        return _load_source(paths[0]), {}
+
+    sources = [(p, p.split('/')[-1].replace('.csv', '')) for p in paths]  # Adiciona origem
+    frames = []
+    errors = {}
+    for (p, _), (frame, error) in zip(sources, _load_sources(sources)):
+        if error is not None:
+            errors[p] = error
+        else:
+            frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(), errors
+    if len(frames) == 1:
+        return frames[0], errors
+
+    # Junta na ordem de `paths` (categorias unificadas pelo ColumnStore)
+    store = ColumnStore(NORMALIZED_COLUMNS, sum(len(f) for f in frames))
+    for frame in frames:
+        store.append(frame)
+    return store.to_frame(), errors
+
+
+def _load_source(path: str, source: Optional[str] = None) -> pd.DataFrame:
+    """Lê e normaliza uma fonte num ColumnStore próprio (executado nos workers)."""
+    store = ColumnStore(NORMALIZED_COLUMNS, count_rows(path))
+    _ingest_csv(store, path, source)
+    return store.to_frame()
+
+
+def _load_sources(sources: List[Tuple[str, str]]) -> List[Tuple[Optional[pd.DataFrame], Optional[str]]]:
+    """Carrega as fontes em paralelo; resultados na ordem de `sources`.
+
+    Returns:
+        Lista de (frame, None) ou (None, mensagem de erro), uma por fonte.
+    """
+    results = []
+    workers = LOAD_WORKERS or min(len(sources), os.cpu_count() or 1)
+    if workers <= 1 or len(sources) <= 1:
+        for p, source in sources:
+            try:
+                results.append((_load_source(p, source), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        return results
+
+    executor = ProcessPoolExecutor if LOAD_EXECUTOR == 'process' else ThreadPoolExecutor
+    with executor(max_workers=workers) as pool:
+        futures = [pool.submit(_load_source, p, source) for p, source in sources]
+        for future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((None, str(e)))
+    return results
+
+
+def _ingest_csv(store: ColumnStore, path: str, source: Optional[str] = None) -> None:
+    """Lê um CSV em chunks (só as colunas brutas do adaptador da fonte), normaliza e acumula no store."""
+    adapter = adapter_for(path)
+    reader = pd.read_csv(path, chunksize=CHUNK_ROWS, **adapter.read_options())
+    with reader:
+        for chunk in reader:
+            chunk = adapter.normalize(chunk)
+            if source is not None:
+                chunk['source'] = source
+            store.append(chunk)
+
+
+def _build_dataset_eager(paths: List[str], tag_source: bool = True) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Leitura de cada fonte inteira, com todas as colunas brutas e sem schema."""
+    if not tag_source:
+        return _normalize_columns(pd.read_csv(paths[0]), paths[0]), {}
+
     dfs = []
-    for p in default_paths:
+    errors = {}
+    for p in paths:
         try:
             _df = pd.read_csv(p)
             _df = _normalize_columns(_df, p)
             _df['source'] = p.split('/')[-1].replace('.csv', '')  # Adiciona origem
             dfs.append(_df)
         except Exception as e:
-            st.warning(f"Não foi possível carregar {p}: {e}")
+            errors[p] = str(e)
             continue
-    
+
     if not dfs:
-        st.warning("Nenhum CSV encontrado em /data. Carregando dataframe vazio.")
-        return pd.DataFrame()
-    
-    # Concatena todos os dataframes
-    df = pd.concat(dfs, ignore_index=True, sort=False)
-    return df
+        return pd.DataFrame(), errors
+    return pd.concat(dfs, ignore_index=True, sort=False), errors
 
 
 def _normalize_columns(df: pd.DataFrame, filepath: str) -> pd.DataFrame:
-    """Normaliza nomes de colunas para o padrão esperado pelos gráficos."""
-    df = df.copy()
-    
-    # Criar age_group se Age existir
-    if 'Age' in df.columns:
-        df['age_group'] = pd.cut(
-            df['Age'],
-            bins=[0, 30, 40, 50, 100],
-            labels=['18-30', '31-40', '41-50', '50+']
-        ).astype(str)
-    
-    # Normaliza Gender para lowercase para consistência
-    if 'Gender' in df.columns:
-        df['gender'] = df['Gender'].str.lower()
-    
-    # Mapeamento baseado no arquivo de origem
-    if 'dataset_principal' in filepath:
-        # Dataset principal: foco em saúde mental geral
-        df['role'] = df.get('Occupation', 'Unknown')
-        df['work_mode'] = df.get('RemoteWork', df.get('Work_Location', 'unknown')) # Assumir presencial se não especificado
-        df['stress_score'] = df['Growing_Stress'].map({'Yes': 8, 'No': 3}).fillna(5)
-        df['burnout_level'] = df['Mood_Swings'].map({
-            'High': 'high', 'Medium': 'medium', 'Low': 'low'
-        }).fillna('medium')
-        df['hours_per_week'] = 40  # Padrão se não especificado
-        df['policy'] = df['care_options'].fillna('Unknown')
-        
-    elif 'dataset_burnout' in filepath:
-        # Dataset burnout: dados mais completos
-        df['role'] = df.get('Job_Role', 'Unknown')
-        df['work_mode'] = df.get('Work_Location', 'Unknown')
-        df['hours_per_week'] = df.get('Hours_Worked_Per_Week', 40)
-        df['stress_score'] = df['Stress_Level'].map({
-            'High': 8, 'Medium': 5, 'Low': 2
-        }).fillna(5)
-        df['burnout_level'] = df['Stress_Level'].map({
-            'High': 'high', 'Medium': 'medium', 'Low': 'low'
-        }).fillna('medium')
-        df['policy'] = df.get('Access_to_Mental_Health_Resources', 'Unknown')
-        df['segment'] = df.get('Region', 'Unknown')
-        
-    elif 'dataset_workplace' in filepath:
-        # Dataset workplace: burnout e trabalho remoto
-        df['role'] = df.get('JobRole', 'Unknown')
-        df['work_mode'] = df.get('RemoteWork', 'Unknown')
-        df['hours_per_week'] = df.get('WorkHoursPerWeek', 40)
-        df['stress_score'] = df.get('StressLevel', 5)
-        df['burnout_level'] = pd.cut(
-            df.get('BurnoutLevel', 5),
-            bins=[0, 3, 6, 10],
-            labels=['low', 'medium', 'high']
-        ).astype(str)
-        df['policy'] = df.get('HasMentalHealthSupport', 'Unknown').map({
-            'Yes': 'With Support', 'No': 'Without Support'
-        }).fillna('Unknown')
-        df['segment'] = df.get('Department', 'Unknown')
-
-    # ============================================
-    # Padronização geral da coluna work_mode
-    # ============================================
-    if "work_mode" in df.columns:
-        df["work_mode"] = df["work_mode"].astype(str).str.strip().str.lower()
-
-        df["work_mode"] = df["work_mode"].replace({
-            # Remoto
-            "remote": "remote",
-            "remoto": "remote",
-            "work from home": "remote",
-            "home office": "remote",
-            "wfh": "remote",
-            "yes": "remote",     # usado no dataset_workplace
-
-            # Híbrido
-            "hibrido": "hybrid",
-            "híbrido": "hybrid",
-            "hybrid": "hybrid",
-
-            # Presencial / Onsite
-            "office": "onsite",
-            "onsite": "onsite",
-            "on-site": "onsite",
-            "presencial": "onsite",
-            "no": "onsite",      # usado no dataset_workplace
-            "unknown": "onsite"  # melhor assumir que é presencial
-        })
-
-
-    # ============================================
-    # Add derived columns: hours_band and burnout_numeric
-    # ============================================
-    if 'hours_per_week' in df.columns:
-        df['hours_band'] = pd.cut(
-            df['hours_per_week'],
-            bins=[0, 35, 45, 100],
-            labels=['<35h', '35–45h', '>45h']
-        )
-    
-    if 'burnout_level' in df.columns:
-        df['burnout_numeric'] = df['burnout_level'].map({
-            'low': 1,
-            'medium': 2,
-            'high': 3
-        }).fillna(2)
-    
+    """Normaliza nomes de colunas para o padrão esperado pelos gráficos.
+
+    O mapeamento de cada fonte é o adaptador registrado para `filepath`
+    (utils/adapters.py). Acrescenta as colunas normalizadas a `df` no lugar
+    (recebe sempre um frame recém-lido) e o devolve.
+    """
+    normalized = adapter_for(filepath).normalize(df)
+    for col in normalized.columns:
+        df[col] = normalized[col]
     return df
 
 
-def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> pd.DataFrame:
+def load_indexes(df: pd.DataFrame) -> Tuple[AggregateCube, FilterIndex]:
+    """Cubo de agregados + índice de filtros do dataset (construídos uma vez por carga e compartilhados).
+
+    Para o frame compartilhado de `load_data()` os índices vêm do snapshot (busca
+    por identidade, sem hash do frame a cada rerun); outros frames usam `st.cache_resource`,
+    limitado a FALLBACK_ENTRIES frames para não segurar versões antigas.
+    """
+    snapshot = snapshot_of(df)
+    if snapshot is not None:
+        return snapshot.derived('indexes', lambda: _build_indexes(snapshot.df))
+    return _cached_indexes(df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=FALLBACK_ENTRIES)
+def _cached_indexes(df: pd.DataFrame) -> Tuple[AggregateCube, FilterIndex]:
+    return _build_indexes(df)
+
+
+def _build_indexes(df: pd.DataFrame) -> Tuple[AggregateCube, FilterIndex]:
+    # O cubo mantido em disco pela atualização incremental é reaproveitado quando corresponde a `df`
+    cube = prepared_cube(df)
+    if cube is None:
+        cube = AggregateCube.from_frame(df)
+    return cube, FilterIndex(df)
+
+
+def load_cube(df: pd.DataFrame) -> AggregateCube:
+    """Cubo de agregados do dataset (construído uma vez por carga e compartilhado)."""
+    return load_indexes(df)[0]
+
+
+def load_correlation(df: pd.DataFrame) -> CorrelationStats:
+    """Somas de correlação do dataset (construídas uma vez por carga e compartilhadas, como `load_indexes`)."""
+    snapshot = snapshot_of(df)
+    if snapshot is not None:
+        return snapshot.derived('correlation', lambda: CorrelationStats(snapshot.df))
+    return _cached_correlation(df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=FALLBACK_ENTRIES)
+def _cached_correlation(df: pd.DataFrame) -> CorrelationStats:
+    return CorrelationStats(df)
+
+
+def _filtered_view(df: pd.DataFrame, selection: Dict) -> DataView:
+    """DataView da seleção; reaproveita as posições do rerun anterior se nada mudou.
+
+    A sessão guarda só as posições (int32) e as somas dos rollups da última
+    seleção (`IncrementalRollup`, atualizadas por delta quando um filtro muda);
+    o frame filtrado, se algum gráfico o pedir, vive apenas durante o rerun.
+    """
+    cube, index = load_indexes(df)
+    rollups = st.session_state.get('_rollups')
+    if rollups is None or rollups.cube is not cube:
+        rollups = st.session_state['_rollups'] = IncrementalRollup(cube)
+    key = selection_key(selection)
+    cached = st.session_state.get('_filtered_positions')
+    hit = cached is not None and cached[0]() is index and cached[1] == key
+    cache_event('positions', hit)
+    if hit:
+        positions = cached[2]
+    else:
+        positions = index.select(selection)
+        # Referência fraca ao índice: não segura uma versão antiga do dataset na sessão
+        st.session_state['_filtered_positions'] = (weakref.ref(index), key, positions)
+    return DataView(df, selection, cube, positions=positions, rollups=rollups)
+
+
+@timed()
+def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> DataView:
     """Cria filtros globais e retorna df filtrado. Reuse em todas as páginas.
     
     Args:
@@ -155,7 +323,8 @@ def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> pd.Da
         show_segment_filter: Se True, mostra filtro adicional de segmentos (útil para página de Perfis)
     
     Returns:
-        DataFrame filtrado
+        DataView com o DataFrame filtrado (`.frame`), a seleção aplicada e o cubo
+        de agregados; se comporta como o DataFrame filtrado nas páginas.
     """
     st.sidebar.header("🎯 Filtros")
     
@@ -168,9 +337,10 @@ def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> pd.Da
     # =====================================
     st.sidebar.subheader("👥 Quem você quer analisar?")
     
-    # Obtém valores únicos para os filtros
-    roles = sorted(df['role'].dropna().unique()) if 'role' in df.columns else []
-    segments = sorted(df['segment'].dropna().unique()) if 'segment' in df.columns else []
+    # Obtém valores únicos para os filtros (do índice compartilhado, sem varrer o frame)
+    _, index = load_indexes(df)
+    roles = index.options('role')
+    segments = index.options('segment')
     
     # Filtro de cargos - TODOS selecionados por padrão
     sel_roles = st.sidebar.multiselect(
@@ -184,7 +354,7 @@ def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> pd.Da
     # Filtro de segmentos (opcional, apenas na página de Perfis)
     if show_segment_filter and segments:
         # Pega os 4 segmentos mais frequentes como default
-        top_segments = df['segment'].value_counts().nlargest(4).index.tolist()
+        top_segments = index.counts('segment').nlargest(4).index.tolist()
         
         sel_segments = st.sidebar.multiselect(
             "Segmentos (Depto/Região)",
@@ -201,7 +371,7 @@ def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> pd.Da
     # =====================================
     st.sidebar.divider()
     st.sidebar.subheader("💼 Como essas pessoas trabalham?")    
-    work_modes = sorted(df['work_mode'].dropna().unique()) if 'work_mode' in df.columns else []
+    work_modes = index.options('work_mode')
     
     sel_modes = st.sidebar.multiselect(
         "Modalidade de Trabalho",
@@ -218,9 +388,9 @@ def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> pd.Da
     st.sidebar.subheader("⏱️ Qual a carga de trabalho?")
     
     # Slider de horas por semana
-    if 'hours_per_week' in df.columns and df['hours_per_week'].notna().any():
-        min_h = int(df['hours_per_week'].min())
-        max_h = int(df['hours_per_week'].max())
+    bounds = index.range_bounds()
+    if bounds is not None:
+        min_h, max_h = int(bounds[0]), int(bounds[1])
         rng_hours = st.sidebar.slider(
             "Horas trabalhadas/semana",
             min_value=min_h,
@@ -235,19 +405,16 @@ def render_sidebar(df: pd.DataFrame, show_segment_filter: bool = False) -> pd.Da
     # =====================================
     # APLICAR FILTROS
     # =====================================
-    f = df.copy()
-    
-    if sel_roles and 'role' in f.columns:
-        f = f[f['role'].isin(sel_roles)]
-    
-    if sel_modes and 'work_mode' in f.columns:
-        f = f[f['work_mode'].isin(sel_modes)]
-    
-    if sel_segments and 'segment' in f.columns:
-        f = f[f['segment'].isin(sel_segments)]
-    
-    if 'hours_per_week' in f.columns:
-        f = f[(f['hours_per_week'] >= rng_hours[0]) & (f['hours_per_week'] <= rng_hours[1])]
+    # Posições via índice (utils/filters.py): sem cópia do frame nem máscaras encadeadas
+    selection = {
+        'role': sel_roles,
+        'work_mode': sel_modes,
+        'segment': sel_segments,
+        'hours_per_week': tuple(rng_hours) if 'hours_per_week' in df.columns else None,
+    }
+    annotate(selection)
+    with span('filter'):
+        f = _filtered_view(df, selection)
     
     # =====================================
     # RESUMO DOS FILTROS APLICADOS
@@ -0,0 +1,194 @@
+"""
+Resumos de distribuição para histogramas, violinos e box plots.
+
+`px.violin(points='all')` e `px.box(points='all')` enviam todos os valores ao
+navegador, que calcula quartis e densidades no cliente: payload e tempo de
+desenho crescem com o número de respondentes. `distribution_summary` calcula no
+servidor, por grupo, o resumo de cinco números (mínimo, quartis, máximo) com as
+cercas de Tukey do box plot e a densidade por kernel gaussiano numa grade fixa
+de `KDE_POINTS` pontos: os valores são distribuídos nos pontos vizinhos da
+grade (interpolação linear) e as contagens são convoluídas com o kernel via
+FFT. Banda e intervalo seguem os padrões do violino do Plotly (regra de
+Silverman, intervalo "soft"), então o desenho é o mesmo que o navegador faria.
+O tamanho do resumo depende só do número de grupos.
+
+`histogram_summary` faz o mesmo para histogramas: as contagens por faixa saem
+de um único `bincount` sobre os valores discretizados (faixas de largura
+"redonda", como o autobin do Plotly com `nbins`), junto do resumo de cinco
+números do box plot marginal.
+
+Com o DataView da sidebar o resumo fica em cache por (dataset, seleção, grupo,
+variável), compartilhado entre gráficos, reruns e sessões.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .figure_cache import FigureCache
+from .filters import selection_key
+from .metrics import cache_event
+from .view import DataView
+
+# Pontos da grade de cada densidade
+KDE_POINTS = 128
+
+# Resumos por seleção (pequenos: grupos × KDE_POINTS)
+SUMMARY_CACHE = FigureCache(16 * 1024 * 1024, 256)
+
+STAT_COLUMNS = ['n', 'mean', 'min', 'q1', 'median', 'q3', 'max', 'lowerfence', 'upperfence', 'bandwidth']
+
+
+@dataclass(frozen=True)
+class DistributionSummary:
+    """Resumo de `value` por grupo.
+
+    Attributes:
+        stats: Uma linha por grupo com dados (na ordem das categorias) e as colunas STAT_COLUMNS
+        kde: {grupo: (grade, densidade)} dos grupos com variação
+    """
+    stats: pd.DataFrame
+    kde: Dict[Any, Tuple[np.ndarray, np.ndarray]]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.stats.memory_usage(deep=True).sum()) + sum(g.nbytes + d.nbytes for g, d in self.kde.values())
+
+
+@dataclass(frozen=True)
+class HistogramSummary:
+    """Contagens de `value` por faixa + resumo de cinco números.
+
+    Attributes:
+        edges: Limites das faixas (len(counts) + 1), de largura constante
+        counts: Linhas por faixa (a última inclui o limite superior)
+        stats: Colunas STAT_COLUMNS do total
+    """
+    edges: np.ndarray
+    counts: np.ndarray
+    stats: Dict[str, float]
+
+    @property
+    def nbytes(self) -> int:
+        return self.edges.nbytes + self.counts.nbytes + 8 * len(self.stats)
+
+
+def distribution_summary(data, by: str, value: str) -> DistributionSummary:
+    """Resumo de `value` por `by` (DataView da sidebar, em cache por seleção, ou DataFrame)."""
+    return _cached(data, ('groups', by, value), lambda: summarize(data[by], data[value]))
+
+
+def histogram_summary(data, value: str, nbins: int = 20) -> Optional[HistogramSummary]:
+    """Histograma de `value` em até `nbins` faixas (DataView da sidebar, em cache por seleção, ou DataFrame)."""
+    return _cached(data, ('histogram', value, nbins), lambda: histogram(data[value], nbins))
+
+
+def _cached(data, name: Hashable, compute: Callable[[], Any]):
+    """`compute()` em cache por (dataset, seleção, `name`) quando `data` é o DataView da sidebar."""
+    key = None
+    if isinstance(data, DataView) and data.cube is not None and SUMMARY_CACHE.enabled:
+        key = (id(data.cube), selection_key(data.selection), name)
+        found, summary = SUMMARY_CACHE.get(key)
+        cache_event('summaries', found)
+        if found:
+            return summary
+    summary = compute()
+    if key is not None:
+        SUMMARY_CACHE.put(key, summary, owner=data.cube, nbytes=summary.nbytes if summary is not None else 0)
+    return summary
+
+
+def histogram(values: pd.Series, nbins: int = 20) -> Optional[HistogramSummary]:
+    """Contagens de `values` (nulos descartados) em faixas de largura redonda; None sem valores."""
+    x = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    x = x[~np.isnan(x)]
+    if len(x) == 0:
+        return None
+    lo, hi = float(x.min()), float(x.max())
+    width = _bin_width(hi - lo, nbins)
+    start = np.floor(lo / width) * width if hi > lo else lo - width / 2
+    n_bins = int(np.floor((hi - start) / width)) + 1
+    codes = np.clip(np.floor((x - start) / width).astype(np.int64), 0, n_bins - 1)
+    counts = np.bincount(codes, minlength=n_bins)
+    edges = start + width * np.arange(n_bins + 1)
+    return HistogramSummary(edges, counts, _five_numbers(x))
+
+
+def _bin_width(span: float, nbins: int) -> float:
+    """Menor largura 1, 2 ou 5 × 10^k que cobre `span` em até `nbins` faixas (1 se `span` é 0)."""
+    if span <= 0:
+        return 1.0
+    rough = span / nbins
+    magnitude = 10 ** np.floor(np.log10(rough))
+    return float(next(step * magnitude for step in (1, 2, 5, 10) if step * magnitude >= rough))
+
+
+def summarize(groups: pd.Series, values: pd.Series) -> DistributionSummary:
+    """Resumo de cinco números + KDE de `values` por valor de `groups` (nulos descartados)."""
+    if isinstance(groups.dtype, pd.CategoricalDtype):
+        codes, labels = groups.cat.codes.to_numpy(), groups.cat.categories
+    else:
+        codes, labels = pd.factorize(groups, sort=True)
+    x = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = (codes >= 0) & ~np.isnan(x)
+    codes, x = codes[keep], x[keep]
+
+    # Valores agrupados por código (ordenação estável só dos códigos inteiros)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(labels))
+    slices = np.split(x[order], np.cumsum(counts)[:-1])
+
+    rows, kde, index = [], {}, []
+    for label, group in zip(labels, slices):
+        if len(group) == 0:
+            continue
+        stats = _five_numbers(group)
+        if stats['bandwidth'] > 0:
+            kde[label] = _kde(group, stats)
+        rows.append(stats)
+        index.append(label)
+    stats = pd.DataFrame(rows, index=pd.Index(index, name=groups.name), columns=STAT_COLUMNS)
+    return DistributionSummary(stats, kde)
+
+
+def _five_numbers(x: np.ndarray) -> Dict[str, float]:
+    """Quartis (interpolação linear), extremos, cercas de Tukey e banda do KDE, como o Plotly."""
+    n = len(x)
+    lo, hi = float(x.min()), float(x.max())
+    q1, median, q3 = (float(q) for q in np.quantile(x, [0.25, 0.5, 0.75]))
+    iqr = q3 - q1
+    # Cercas: valores mais extremos dentro de 1.5 IQR dos quartis
+    lowerfence = float(x[x >= q1 - 1.5 * iqr].min())
+    upperfence = float(x[x <= q3 + 1.5 * iqr].max())
+    mean = float(x.mean())
+    span = hi - lo
+    if span > 0:
+        std = float(x.std(ddof=1)) if n > 1 else 0.0
+        silverman = 1.059 * min(std, iqr / 1.349) * n ** -0.2
+        bandwidth = max(silverman, span / 100)
+    else:
+        bandwidth = 0.0
+    return {'n': n, 'mean': mean, 'min': lo, 'q1': q1, 'median': median, 'q3': q3, 'max': hi,
+            'lowerfence': lowerfence, 'upperfence': upperfence, 'bandwidth': bandwidth}
+
+
+def _kde(x: np.ndarray, stats: Dict[str, float], points: int = KDE_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """Densidade gaussiana de `x` em `points` pontos de [min − 2h, max + 2h] (binning linear + FFT)."""
+    h = stats['bandwidth']
+    grid = np.linspace(stats['min'] - 2 * h, stats['max'] + 2 * h, points)
+    step = grid[1] - grid[0]
+
+    # Cada valor é dividido entre os dois pontos da grade vizinhos
+    pos = (x - grid[0]) / step
+    left = np.clip(np.floor(pos).astype(np.int64), 0, points - 2)
+    frac = pos - left
+    weights = np.bincount(left, weights=1 - frac, minlength=points) \
+        + np.bincount(left + 1, weights=frac, minlength=points)
+
+    offsets = np.arange(-(points - 1), points) * step
+    kernel = np.exp(-0.5 * (offsets / h) ** 2) / (h * np.sqrt(2 * np.pi))
+    size = len(weights) + len(kernel) - 1
+    conv = np.fft.irfft(np.fft.rfft(weights, size) * np.fft.rfft(kernel, size), size)
+    density = np.maximum(conv[points - 1:2 * points - 1], 0.0) / len(x)
+    return grid, density
@@ -0,0 +1,148 @@
+"""
+Cache LRU de figuras Plotly compartilhado entre reruns e sessões.
+
+As funções `plot_*` de utils/charts.py são decoradas com `cached_figure`. Quando
+recebem o DataView da sidebar, a figura é guardada sob uma chave formada pela
+função, pelo dataset (identidade do cubo compartilhado via `st.cache_resource`),
+pela seleção ativa e pelos demais parâmetros do gráfico. Trocar um controle que
+não afeta o gráfico (ex.: `delta_type` na página de Modalidade) serve as demais
+figuras do cache; usuários com os mesmos filtros compartilham as entradas.
+
+DataFrames comuns (sem seleção associada) não passam pelo cache.
+
+Limites (variáveis de ambiente):
+- MHD_FIGURE_CACHE_MB: memória estimada máxima, em MB (padrão 64; 0 desativa)
+- MHD_FIGURE_CACHE_ENTRIES: número máximo de figuras (padrão 256)
+
+As figuras devolvidas são compartilhadas: não altere uma figura obtida do cache.
+"""
+import functools
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+from .filters import selection_key
+from .metrics import cache_event, figure_built, span
+from .view import DataView
+
+DEFAULT_MAX_MB = float(os.environ.get("MHD_FIGURE_CACHE_MB", "64"))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("MHD_FIGURE_CACHE_ENTRIES", "256"))
+
+# Custo fixo estimado por figura (layout, template, metadados dos traces)
+_BASE_NBYTES = 16 * 1024
+
+
+def _nbytes(value: Any) -> int:
+    """Tamanho aproximado (bytes) de um valor serializável de trace."""
+    if isinstance(value, np.ndarray):
+        return value.size * 64 if value.dtype == object else value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, str):
+        return len(value)
+    return 8
+
+
+def figure_nbytes(fig) -> int:
+    """Estimativa da memória ocupada pelos dados de uma figura."""
+    if fig is None:
+        return 0
+    return _BASE_NBYTES + sum(_nbytes(trace.to_plotly_json()) for trace in fig.data)
+
+
+class FigureCache:
+    """LRU thread-safe limitado por número de entradas e memória estimada."""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> tuple:
+        """(encontrado, figura)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: Hashable, fig, owner: Any = None, nbytes: Optional[int] = None) -> None:
+        """Guarda `fig`; `owner` é mantido vivo junto à entrada (a chave usa sua identidade).
+
+        `nbytes` informa o tamanho de valores que não são figuras (padrão: `figure_nbytes`).
+        """
+        size = figure_nbytes(fig) if nbytes is None else nbytes
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key] = (fig, owner, size)
+            self.nbytes += size
+            while self._entries and (self.nbytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+FIGURE_CACHE = FigureCache(int(DEFAULT_MAX_MB * 1024 * 1024), DEFAULT_MAX_ENTRIES)
+
+
+def _figure_key(func, data, args, kwargs) -> Optional[Hashable]:
+    """Chave da figura, ou None quando o resultado não é cacheável."""
+    if not isinstance(data, DataView) or data.cube is None:
+        return None
+    key = (
+        func.__module__, func.__qualname__, id(data.cube),
+        selection_key(data.selection), args, tuple(sorted(kwargs.items())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def cached_figure(func):
+    """Decorator: serve a figura do FIGURE_CACHE quando dataset, seleção e parâmetros se repetem."""
+    stage = f'chart:{func.__name__}'
+
+    @functools.wraps(func)
+    def wrapper(data, *args, **kwargs):
+        with span(stage):
+            key = _figure_key(func, data, args, kwargs) if FIGURE_CACHE.enabled else None
+            if key is None:
+                fig = func(data, *args, **kwargs)
+            else:
+                found, fig = FIGURE_CACHE.get(key)
+                cache_event('figures', found)
+                if not found:
+                    fig = func(data, *args, **kwargs)
+                    FIGURE_CACHE.put(key, fig, owner=data.cube)
+        figure_built(fig, func.__name__)
+        return fig
+    return wrapper
@@ -0,0 +1,170 @@
+"""
+Motor de filtros da sidebar baseado em índices.
+
+`FilterIndex` é construído uma vez por carga do dataset e guarda, para cada
+dimensão filtrável (`role`, `work_mode`, `segment`), as posições das linhas
+agrupadas por valor (arrays de posições ordenados) e, para `hours_per_week`, um
+índice ordenado. Uma seleção da sidebar vira um único array de posições:
+começa pela restrição mais seletiva e confere as demais só nas linhas
+candidatas, usando os códigos inteiros das categorias. Filtros que não
+restringem nada (ex.: todos os cargos marcados, o padrão) são ignorados, e sem
+nenhuma restrição ativa nenhuma cópia do frame é feita.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+FILTER_DIMENSIONS = ['role', 'work_mode', 'segment']
+RANGE_COLUMN = 'hours_per_week'
+
+
+class FilterIndex:
+    """Posições por valor das dimensões de filtro + índice ordenado de horas.
+
+    Args:
+        df: Frame normalizado (dataset completo)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self._codes: Dict[str, np.ndarray] = {}
+        self._categories: Dict[str, pd.Index] = {}
+        self._order: Dict[str, np.ndarray] = {}
+        self._offsets: Dict[str, np.ndarray] = {}
+
+        for dim in FILTER_DIMENSIONS:
+            if dim not in df.columns:
+                continue
+            col = df[dim]
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                codes = col.cat.codes.to_numpy().astype(np.int32)
+                categories = pd.Index(col.cat.categories)
+            else:
+                codes, categories = pd.factorize(col, sort=True)
+                codes = codes.astype(np.int32)
+                categories = pd.Index(categories)
+            # Posições agrupadas por código (nulos, código -1, ficam no início)
+            order = np.argsort(codes, kind='stable').astype(np.int32)
+            counts = np.bincount(codes + 1, minlength=len(categories) + 1)
+            self._codes[dim] = codes
+            self._categories[dim] = categories
+            self._order[dim] = order
+            self._offsets[dim] = np.concatenate([[0], np.cumsum(counts)])
+
+        self._range_values: Optional[np.ndarray] = None
+        if RANGE_COLUMN in df.columns:
+            values = df[RANGE_COLUMN].to_numpy(dtype=np.float64, na_value=np.nan)
+            self._range_values = values
+            self._range_order = np.argsort(values, kind='stable').astype(np.int32)  # NaN vai para o fim
+            self._range_sorted = values[self._range_order]
+
+    # ------------------------------------------------------------------
+    # Opções da sidebar (sem varrer o frame)
+    # ------------------------------------------------------------------
+    def counts(self, dim: str) -> pd.Series:
+        """Número de linhas por valor não nulo de `dim` (só valores presentes)."""
+        if dim not in self._offsets:
+            return pd.Series(dtype=np.int64)
+        counts = pd.Series(np.diff(self._offsets[dim])[1:], index=self._categories[dim])
+        return counts[counts > 0]
+
+    def options(self, dim: str) -> List:
+        """Valores não nulos de `dim` em ordem alfabética (como `sorted(df[dim].dropna().unique())`)."""
+        return sorted(self.counts(dim).index)
+
+    def range_bounds(self) -> Optional[Tuple[float, float]]:
+        """(mínimo, máximo) de `hours_per_week`, ou None se a coluna não existe ou é toda nula."""
+        if self._range_values is None:
+            return None
+        n_valid = int(np.searchsorted(self._range_sorted, np.nan, side='left'))  # NaN ficam no fim
+        if n_valid == 0:
+            return None
+        return float(self._range_sorted[0]), float(self._range_sorted[n_valid - 1])
+
+    # ------------------------------------------------------------------
+    # Restrições
+    # ------------------------------------------------------------------
+    def _value_constraint(self, dim: str, values) -> Optional[Tuple]:
+        """(contagem, tipo, dim, códigos) ou None se o filtro não restringe nada."""
+        chosen = self._categories[dim].get_indexer(list(values))
+        chosen = np.unique(chosen[chosen >= 0])
+        offsets = self._offsets[dim]
+        sizes = offsets[chosen + 2] - offsets[chosen + 1]
+        count = int(sizes.sum())
+        if count == self.n_rows:
+            return None
+        return count, 'values', dim, chosen
+
+    def _range_constraint(self, bounds) -> Optional[Tuple]:
+        lo, hi = bounds
+        start = int(np.searchsorted(self._range_sorted, lo, side='left'))
+        stop = int(np.searchsorted(self._range_sorted, hi, side='right'))
+        count = stop - start
+        if count == self.n_rows:
+            return None
+        return count, 'range', (lo, hi), (start, stop)
+
+    def _constraints(self, selection: Dict) -> List[Tuple]:
+        constraints = []
+        for dim, allowed in selection.items():
+            if dim == RANGE_COLUMN:
+                if allowed is not None and self._range_values is not None:
+                    constraints.append(self._range_constraint(allowed))
+            elif allowed and dim in self._codes:
+                constraints.append(self._value_constraint(dim, allowed))
+        return [c for c in constraints if c is not None]
+
+    def _positions(self, constraint: Tuple) -> np.ndarray:
+        """Posições (ordenadas) que satisfazem uma restrição."""
+        _, kind, key, payload = constraint
+        if kind == 'range':
+            start, stop = payload
+            return np.sort(self._range_order[start:stop])
+        order, offsets = self._order[key], self._offsets[key]
+        parts = [order[offsets[c + 1]:offsets[c + 2]] for c in payload]
+        positions = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+        return np.sort(positions)
+
+    def _keep(self, constraint: Tuple, positions: np.ndarray) -> np.ndarray:
+        """Filtra posições candidatas por uma restrição (só lê as linhas candidatas)."""
+        _, kind, key, payload = constraint
+        if kind == 'range':
+            lo, hi = key
+            values = self._range_values[positions]
+            return positions[(values >= lo) & (values <= hi)]
+        lookup = np.zeros(len(self._categories[key]) + 1, dtype=bool)
+        lookup[payload + 1] = True
+        return positions[lookup[self._codes[key][positions] + 1]]
+
+    def select(self, selection: Optional[Dict]) -> Optional[np.ndarray]:
+        """Posições das linhas que passam na seleção (semântica de `render_sidebar`).
+
+        Returns:
+            Array ordenado de posições (int32, metade da memória por sessão), ou
+            None quando nenhum filtro restringe o dataset.
+        """
+        constraints = self._constraints(selection or {})
+        if not constraints:
+            return None
+        constraints.sort(key=lambda c: c[0])
+        positions = self._positions(constraints[0])
+        for constraint in constraints[1:]:
+            if len(positions) == 0:
+                break
+            positions = self._keep(constraint, positions)
+        return positions.astype(np.int32, copy=False)
+
+
+def selection_key(selection: Dict) -> Tuple:
+    """Chave estável (hashable) de uma seleção, para caches entre reruns."""
+    items = []
+    for dim in sorted(selection):
+        value = selection[dim]
+        if value is None:
+            items.append((dim, None))
+        elif dim == RANGE_COLUMN:
+            items.append((dim, tuple(value)))
+        else:
+            items.append((dim, tuple(sorted(map(str, value)))))
+    return tuple(items)
@@ -0,0 +1,270 @@
+"""
+Atualização incremental do dataset preparado.
+
+As pesquisas de pulso chegam em lotes semanais; reconstruir tudo a cada lote
+(`_build_dataset`) relê e normaliza o histórico inteiro. `refresh_dataset`
+parte do dataset já preparado em disco (utils/data_cache.py) e só normaliza o
+que é novo:
+- CSVs de lote novos em `INCOMING_DIR` (ex.: data/incoming/dataset_burnout_2026-10-12.csv),
+  associados à fonte pelo adaptador do nome do arquivo (utils/adapters.py); um
+  lote já ingerido que muda ou é removido leva à reconstrução completa;
+- linhas acrescentadas ao fim de um CSV de origem: se o conteúdo antigo é um
+  prefixo exato do arquivo só os bytes novos são lidos (todas as linhas deles,
+  qualquer que seja o ID).
+As linhas novas vão para o fim do frame (categorias unificadas pelo
+`ColumnStore`) e o cubo de agregados é atualizado somando o cubo do delta
+(`AggregateCube.merge`); o cubo fica em disco junto do frame e é reaproveitado
+por `load_indexes`. Qualquer outra mudança num CSV de origem (linhas antigas
+corrigidas ou removidas, arquivo reescrito), assim como fonte nova ou versão do
+cache diferente, cai na reconstrução completa: o dataset nunca fica com
+linhas desatualizadas.
+
+Uso (job semanal, a partir da raiz do projeto):
+    python -m utils.incremental
+"""
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .adapters import GENERIC_ADAPTER, SourceAdapter, adapter_for
+from .cube import CUBE_DIMENSIONS, AggregateCube
+from .data_cache import (
+    CACHE_DIR, _HASH_CHUNK_SIZE, _cache_stem, _fingerprint, load_table, read_mapped, read_prepared, save_cached,
+)
+from .ingest import CHUNK_ROWS, ColumnStore
+from .schema import NORMALIZED_COLUMNS
+
+# Diretório observado com os lotes novos de respondentes
+INCOMING_DIR = Path(os.environ.get("MHD_INCOMING_DIR", "data/incoming"))
+
+# Chave em `df.attrs` que liga o frame ao cubo gravado no disco (ver `prepared_cube`)
+PREPARED_ATTR = 'prepared'
+
+
+def _source_tag(path: str) -> str:
+    return path.split('/')[-1].replace('.csv', '')
+
+
+def _prefix_matches(path: str, record: dict) -> bool:
+    """True se os `record['size']` primeiros bytes do arquivo são o conteúdo já ingerido."""
+    size = record.get('size', 0)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        remaining = size
+        while remaining > 0:
+            block = fh.read(min(_HASH_CHUNK_SIZE, remaining))
+            if not block:
+                return False
+            digest.update(block)
+            remaining -= len(block)
+        if size:
+            fh.seek(size - 1)
+            if fh.read(1) != b'\n':  # a última linha antiga seria continuada
+                return False
+    return digest.hexdigest() == record.get('sha256')
+
+
+def _read_rows(path: str, adapter: SourceAdapter, source: str, offset: int = 0) -> List[pd.DataFrame]:
+    """Lê e normaliza as linhas de `path` a partir do byte `offset`, em blocos."""
+    options = adapter.read_options()
+    chunks = []
+    with open(path, 'rb') as fh:
+        if offset:
+            names = list(pd.read_csv(path, nrows=0).columns)
+            fh.seek(offset)
+            reader = pd.read_csv(fh, header=None, names=names, chunksize=CHUNK_ROWS, **options)
+        else:
+            reader = pd.read_csv(fh, chunksize=CHUNK_ROWS, **options)
+        with reader:
+            for chunk in reader:
+                if chunk.empty:
+                    continue
+                chunk = adapter.normalize(chunk)
+                chunk['source'] = source
+                chunks.append(chunk)
+    return chunks
+
+
+def _source_delta(path: str, record: Optional[dict]) -> Optional[List[pd.DataFrame]]:
+    """Linhas acrescentadas a um CSV de origem desde a última ingestão.
+
+    Só um append de bytes (conteúdo antigo como prefixo exato) é incremental;
+    as linhas depois do prefixo são todas novas, qualquer que seja o ID.
+
+    Returns:
+        Blocos novos, ou None quando é preciso reconstruir tudo (arquivo editado,
+        truncado, removido ou novo).
+    """
+    current = _fingerprint(path, with_hash=False)
+    if record is None or current is None:
+        return [] if record is current else None
+    if current['size'] == record['size'] and current['mtime_ns'] == record['mtime_ns']:
+        return []
+    if current['size'] < record['size'] or not _prefix_matches(path, record):
+        return None
+    if current['size'] == record['size']:
+        return []  # só "tocado"
+    return _read_rows(path, adapter_for(path), _source_tag(path), offset=record['size'])
+
+
+def _pending_batches(paths: List[str], incoming_dir: Path, seen: Dict[str, dict]) -> List[Tuple[str, str]]:
+    """Lotes ainda não ingeridos em `incoming_dir` como (caminho, tag da fonte), em ordem de nome."""
+    if not incoming_dir.is_dir():
+        return []
+    sources = {adapter_for(p).name: _source_tag(p) for p in paths}
+    batches = []
+    for batch in sorted(incoming_dir.glob('*.csv')):
+        name = str(batch)
+        adapter = adapter_for(name)
+        if name in seen or adapter is GENERIC_ADAPTER:
+            continue
+        batches.append((name, sources.get(adapter.name, _source_tag(name))))
+    return batches
+
+
+def _batches_changed(seen: Dict[str, dict]) -> bool:
+    """True se algum lote já ingerido mudou (tamanho/mtime) ou foi removido."""
+    for batch, record in seen.items():
+        current = _fingerprint(batch, with_hash=False)
+        if current is None or current['size'] != record.get('size') or current['mtime_ns'] != record.get('mtime_ns'):
+            return True
+    return False
+
+
+def _ingest_batches(batches: List[Tuple[str, str]], errors: Dict[str, str],
+                    seen: Dict[str, dict]) -> List[pd.DataFrame]:
+    chunks = []
+    for batch, source in batches:
+        try:
+            batch_chunks = _read_rows(batch, adapter_for(batch), source)
+        except Exception as e:
+            errors[batch] = str(e)
+            continue
+        errors.pop(batch, None)  # falhou numa ingestão anterior
+        chunks.extend(batch_chunks)
+        seen[batch] = {**_fingerprint(batch, with_hash=False), 'rows': int(sum(len(c) for c in batch_chunks))}
+    return chunks
+
+
+def _save(paths: List[str], df: pd.DataFrame, errors: Dict[str, str], cube: AggregateCube,
+          batches: Dict[str, dict]) -> pd.DataFrame:
+    generation = uuid.uuid4().hex
+    extra = {'generation': generation, 'batches': batches}
+    if save_cached(paths, df, errors, extra=extra, tables={'cube': cube.cells}):
+        # Reabre do disco com memory map: mesmas páginas que os outros processos
+        prepared = read_prepared(paths)
+        if prepared is not None and prepared[1].get('generation') == generation:
+            df = prepared[0]
+        df.attrs[PREPARED_ATTR] = f"{_cache_stem(paths).name}:{generation}"
+    return df
+
+
+def _rebuild(paths: List[str], incoming_dir: Path) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Reconstrução completa: fontes + todos os lotes de `incoming_dir`."""
+    from .data_io import _build_dataset  # import tardio: data_io importa este módulo
+
+    df, errors = _build_dataset(paths)
+    batches: Dict[str, dict] = {}
+    chunks = _ingest_batches(_pending_batches(paths, incoming_dir, {}), errors, batches)
+    if chunks:
+        df = _append(df, chunks)
+    if df.empty:
+        return df, errors
+    return _save(paths, df, errors, AggregateCube.from_frame(df), batches), errors
+
+
+def _append(df: pd.DataFrame, chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Frame com os blocos novos no fim (categorias unificadas)."""
+    store = ColumnStore(NORMALIZED_COLUMNS, len(df) + sum(len(c) for c in chunks))
+    for frame in [df, *chunks]:
+        store.append(frame)
+    return store.to_frame()
+
+
+def refresh_dataset(paths: List[str], incoming_dir: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Dataset preparado atualizado com as linhas e os lotes novos desde a última ingestão.
+
+    Sem novidades devolve o frame do disco como está; sem cache utilizável
+    reconstrói tudo (`_build_dataset` + lotes). Grava o resultado e o cubo
+    atualizado no cache em disco.
+
+    Returns:
+        (df, mensagens de erro por caminho)
+    """
+    incoming = Path(incoming_dir) if incoming_dir else INCOMING_DIR
+    prepared = read_prepared(paths)
+    if prepared is None or 'generation' not in prepared[1]:
+        return _rebuild(paths, incoming)
+    df, manifest = prepared
+
+    errors = dict(manifest.get('errors', {}))
+    batches = dict(manifest.get('batches', {}))
+    if _batches_changed(batches):
+        return _rebuild(paths, incoming)
+    chunks: List[pd.DataFrame] = []
+    changed = False
+    for p in paths:
+        record = manifest.get('sources', {}).get(p)
+        try:
+            delta = _source_delta(p, record)
+        except (OSError, ValueError, KeyError):
+            delta = None
+        if delta is None:
+            return _rebuild(paths, incoming)
+        current = _fingerprint(p, with_hash=False)
+        changed |= record is not None and current is not None and current['mtime_ns'] != record['mtime_ns']
+        chunks.extend(delta)
+    chunks.extend(_ingest_batches(_pending_batches(paths, incoming, batches), errors, batches))
+
+    if not chunks and not changed and len(batches) == len(manifest.get('batches', {})):
+        df.attrs[PREPARED_ATTR] = f"{_cache_stem(paths).name}:{manifest['generation']}"
+        return df, errors
+
+    cube = _cube_from_cells(load_table(paths, 'cube'), len(df))
+    if cube is None:
+        cube = AggregateCube.from_frame(df)
+    if chunks:
+        delta = pd.concat(chunks, ignore_index=True)
+        df = _append(df, chunks)
+        cube = cube.merge(AggregateCube.from_frame(delta), df.dtypes)
+    return _save(paths, df, errors, cube, batches), errors
+
+
+def _cube_from_cells(cells: Optional[pd.DataFrame], rows: int) -> Optional[AggregateCube]:
+    """Cubo das células gravadas, se elas cobrem exatamente `rows` linhas."""
+    if cells is None or 'n' not in cells.columns or int(cells['n'].sum()) != rows:
+        return None
+    return AggregateCube(cells, [d for d in CUBE_DIMENSIONS if d in cells.columns])
+
+
+def prepared_cube(df: pd.DataFrame) -> Optional[AggregateCube]:
+    """Cubo gravado por `refresh_dataset` para este frame, ou None (o cubo deve ser construído)."""
+    token = df.attrs.get(PREPARED_ATTR)
+    if not token:
+        return None
+    name, generation = token.split(':', 1)
+    stem = CACHE_DIR / name
+    try:
+        manifest = json.loads(stem.with_suffix('.json').read_text(encoding='utf-8'))
+        if manifest.get('generation') != generation:
+            return None
+        cells = read_mapped(stem.with_suffix('.cube.feather'))
+    except (OSError, ValueError, ImportError):
+        return None
+    return _cube_from_cells(cells, len(df))
+
+
+if __name__ == '__main__':
+    from .data_io import DEFAULT_PATHS
+
+    previous = read_prepared(DEFAULT_PATHS)
+    before = len(previous[0]) if previous is not None else 0
+    df, errors = refresh_dataset(DEFAULT_PATHS)
+    print(f"{len(df):,} linhas no dataset preparado ({len(df) - before:+,} nesta atualização)")
+    for p, err in errors.items():
+        print(f"  erro em {p}: {err}")
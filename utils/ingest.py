@@ -0,0 +1,132 @@
+"""
+Ingestão em chunks para CSVs grandes.
+
+Em vez de ler cada fonte inteira, normalizar uma cópia e concatenar tudo no
+final, `load_data` lê os CSVs em blocos de `CHUNK_ROWS` linhas (só as colunas
+brutas usadas na normalização, com tipos explícitos), normaliza cada bloco e
+copia as colunas do dataset normalizado para um `ColumnStore`: arrays
+pré-alocados já no tipo final (categorias como códigos inteiros, `float32`,
+`bool`). O pico de memória fica em ~um bloco bruto + o dataset compacto final.
+"""
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .schema import BOOL_COLUMNS, CATEGORICAL_COLUMNS, CATEGORY_ORDER, INTEGER_COLUMNS, _to_integer
+
+CHUNK_ROWS = int(os.environ.get("MHD_CHUNK_ROWS", "100000"))
+
+_COUNT_BLOCK_SIZE = 1024 * 1024
+
+
+def count_rows(path: str) -> int:
+    """Limite superior do número de linhas de dados de um CSV (contagem de quebras de linha)."""
+    newlines = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_COUNT_BLOCK_SIZE), b""):
+            newlines += block.count(b"\n")
+    return newlines + 1
+
+
+class _CategoricalBuffer:
+    """Códigos inteiros + dicionário de valores crescente (categorias finais só no `finish`)."""
+
+    def __init__(self, capacity: int, order: Optional[List[str]]):
+        self.codes = np.full(capacity, -1, dtype=np.int32)
+        self.values: Dict = {}
+        self.order = order
+        self.ordered = False  # herdado de blocos que já chegam como categoria ordenada (pd.cut)
+
+    def write(self, start: int, column: pd.Series) -> None:
+        if isinstance(column.dtype, pd.CategoricalDtype) and column.cat.ordered:
+            self.ordered = True
+        codes, uniques = pd.factorize(column)
+        lookup = np.array([self.values.setdefault(u, len(self.values)) for u in uniques], dtype=np.int32)
+        if len(lookup):
+            self.codes[start:start + len(column)] = np.where(codes >= 0, lookup[np.maximum(codes, 0)], -1)
+
+    def grow(self, capacity: int) -> None:
+        self.codes = np.concatenate([self.codes, np.full(capacity - len(self.codes), -1, dtype=np.int32)])
+
+    def finish(self, size: int) -> pd.Categorical:
+        codes = self.codes[:size]
+        # Só valores presentes nas linhas mantidas, na mesma ordem de schema._to_category
+        used = np.bincount(codes[codes >= 0], minlength=len(self.values)) > 0
+        present = {v for v, code in self.values.items() if used[code]}
+        head = [v for v in (self.order or []) if v in present]
+        tail = sorted((v for v in present if v not in head), key=str)
+        categories = head + tail
+        remap = np.full(len(self.values) + 1, -1, dtype=np.int32)  # última posição: nulo
+        for new_code, value in enumerate(categories):
+            remap[self.values[value]] = new_code
+        return pd.Categorical.from_codes(remap[codes], categories=categories, ordered=self.ordered)
+
+
+class ColumnStore:
+    """Colunas do dataset normalizado pré-alocadas e preenchidas bloco a bloco.
+
+    Args:
+        columns: Colunas a guardar (as demais colunas dos blocos são descartadas)
+        capacity: Número de linhas pré-alocado (cresce se for ultrapassado)
+    """
+
+    def __init__(self, columns: Iterable[str], capacity: int):
+        self.columns = list(columns)
+        self.capacity = max(int(capacity), 0)
+        self.size = 0
+        self._present: set = set()
+        self._buffers: Dict[str, object] = {}
+        for col in self.columns:
+            if col in CATEGORICAL_COLUMNS:
+                self._buffers[col] = _CategoricalBuffer(self.capacity, CATEGORY_ORDER.get(col))
+            elif col in BOOL_COLUMNS:
+                self._buffers[col] = np.zeros(self.capacity, dtype=bool)
+            else:
+                # Scores e inteiros pequenos: float32 (inteiros são reduzidos no final)
+                self._buffers[col] = np.full(self.capacity, np.nan, dtype=np.float32)
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, self.capacity * 2)
+        for col, buf in self._buffers.items():
+            if isinstance(buf, _CategoricalBuffer):
+                buf.grow(capacity)
+            else:
+                fill = False if buf.dtype == bool else np.nan
+                self._buffers[col] = np.concatenate([buf, np.full(capacity - len(buf), fill, dtype=buf.dtype)])
+        self.capacity = capacity
+
+    def append(self, chunk: pd.DataFrame) -> None:
+        """Copia as colunas conhecidas de um bloco normalizado para o fim do store."""
+        n = len(chunk)
+        if self.size + n > self.capacity:
+            self._grow(self.size + n)
+        start = self.size
+        for col, buf in self._buffers.items():
+            if col not in chunk.columns:
+                continue
+            self._present.add(col)
+            if isinstance(buf, _CategoricalBuffer):
+                buf.write(start, chunk[col])
+            elif buf.dtype == bool:
+                buf[start:start + n] = chunk[col].to_numpy(dtype=bool, na_value=False)
+            else:
+                values = pd.to_numeric(chunk[col], errors='coerce')
+                buf[start:start + n] = values.to_numpy(dtype=np.float32, na_value=np.nan)
+        self.size += n
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame final (só com as colunas que apareceram em algum bloco)."""
+        out = {}
+        for col in self.columns:
+            if col not in self._present:
+                continue
+            buf = self._buffers[col]
+            if isinstance(buf, _CategoricalBuffer):
+                out[col] = buf.finish(self.size)
+            elif col in INTEGER_COLUMNS:
+                out[col] = _to_integer(pd.Series(buf[:self.size]), INTEGER_COLUMNS[col]).to_numpy()
+            else:
+                out[col] = buf[:self.size].copy()
+        return pd.DataFrame(out, index=pd.RangeIndex(self.size))
@@ -0,0 +1,44 @@
+"""
+Import preguiçoso de bibliotecas pesadas.
+
+`lazy_module("plotly.express")` devolve um substituto que só importa o módulo no
+primeiro acesso a um atributo (`px.scatter(...)`). Assim importar utils/charts.py
+não carrega Plotly; a biblioteca entra quando o primeiro gráfico é desenhado.
+"""
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """Substituto de módulo que importa `name` no primeiro acesso a atributo."""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'carregado' if self.__dict__['_module'] is not None else 'não carregado'
+        return f"<LazyModule {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Módulo `name` importado só no primeiro uso."""
+    return LazyModule(name)
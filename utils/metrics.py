@@ -0,0 +1,373 @@
+"""
+Métricas de desempenho por rerun das páginas.
+
+Cada página roda o corpo dentro de `with page_rerun(__file__):`, logo depois
+do tema: o registro é aberto na entrada e sempre fechado na saída, com status
+'erro' se a página levanta uma exceção e 'interrompido' se o Streamlit
+interrompe o script (novo rerun pedido pelo usuário ou `st.stop()` sem
+`end_rerun()` antes). Dentro do bloco, o código do dashboard anota no registro
+do rerun atual:
+- etapas cronometradas (`span` / `timed`): `load_data`, `render_sidebar`,
+  `filter` (seleção das linhas), cada gráfico de utils/charts.py (`chart:<função>`)
+  e o envio de cada figura ao navegador (`plotly_chart:<função>`);
+- tamanho do payload de cada figura (JSON do Plotly);
+- acertos/erros dos caches (`load_data`, figuras, resumos de distribuição,
+  posições filtradas da sessão).
+
+A coleta só acontece quando alguma saída está ativa; sem ela `begin_rerun` não
+cria registro e as demais funções não fazem nada além de olhar uma variável
+thread-local (cada rerun do Streamlit roda numa thread própria). Saídas:
+- painel de depuração na sidebar: `?debug=1` na URL ou MHD_DEBUG_PANEL=1;
+- arquivo local em MHD_METRICS_FILE (`{pid}` no nome vira o id do processo):
+  terminado em `.prom`, texto do Prometheus com os agregados do processo
+  (histograma da duração dos reruns por página para SLOs, tempo por etapa,
+  payload e contadores de cache), reescrito a cada rerun; qualquer outro nome
+  recebe uma linha JSON por rerun;
+- perfil do rerun com o cProfile: `?profile=1` na URL ou MHD_PROFILE=1
+  (utils/profiling.py).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import streamlit as st
+
+METRICS_FILE = os.environ.get("MHD_METRICS_FILE", "")
+DEBUG_PANEL = os.environ.get("MHD_DEBUG_PANEL", "") not in ("", "0")
+PROFILE = os.environ.get("MHD_PROFILE", "") not in ("", "0")
+
+# Limites (s) do histograma de duração dos reruns no arquivo do Prometheus
+RERUN_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+_lock = threading.Lock()
+
+
+@dataclass
+class RerunMetrics:
+    """Medições de um rerun de uma página."""
+    page: str
+    started: float
+    spans: List[Tuple[str, float]] = field(default_factory=list)
+    payloads: Dict[str, int] = field(default_factory=dict)
+    caches: Dict[str, List[int]] = field(default_factory=dict)  # cache -> [acertos, erros]
+    selection: Dict[str, Any] = field(default_factory=dict)
+    controls: Dict[str, Any] = field(default_factory=dict)
+    seconds: Optional[float] = None
+    status: str = 'running'
+    # Figura (id) -> função que a construiu, para nomear o envio em `plotly_chart`
+    figures: Dict[int, str] = field(default_factory=dict, repr=False)
+    # cProfile.Profile do rerun com `?profile=1` / MHD_PROFILE (utils/profiling.py)
+    profile: Any = field(default=None, repr=False)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'page': self.page,
+            'status': self.status,
+            'seconds': self.seconds,
+            'spans': [{'stage': name, 'seconds': round(s, 6)} for name, s in self.spans],
+            'payloads': self.payloads,
+            'caches': self.caches,
+            'selection': _plain(self.selection),
+            'controls': _plain(self.controls),
+        }
+
+
+def _plain(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: list(v) if isinstance(v, (tuple, set, frozenset)) else v for k, v in values.items()}
+
+
+def current() -> Optional[RerunMetrics]:
+    """Registro do rerun em andamento nesta thread (None com a coleta desligada)."""
+    return getattr(_local, 'rerun', None)
+
+
+def _requested(param: str, env: bool) -> bool:
+    """Saída ligada pela variável de ambiente ou por `?<param>=1` na URL."""
+    if env:
+        return True
+    try:
+        return st.query_params.get(param, '') not in ('', '0')
+    except Exception:  # fora do runtime do Streamlit
+        return False
+
+
+def _panel_requested() -> bool:
+    return _requested('debug', DEBUG_PANEL)
+
+
+@contextmanager
+def page_rerun(page: str) -> Iterator[Optional[RerunMetrics]]:
+    """Registro do rerun de `page` em volta do corpo da página, fechado em qualquer saída.
+
+    Saída normal chama `end_rerun()` (painel e perfil na sidebar). Se o corpo
+    levanta, o registro é fechado sem desenhar nada: 'erro' para exceções da
+    página, 'interrompido' para o controle do Streamlit (`st.stop()`, novo
+    rerun), que não herda de `Exception`. Um registro já fechado por
+    `end_rerun()` antes de `st.stop()` não é fechado de novo.
+    """
+    rerun = begin_rerun(page)
+    try:
+        yield rerun
+    except BaseException as exc:
+        if rerun is not None and rerun.seconds is None:
+            _finish(rerun, 'erro' if isinstance(exc, Exception) else 'interrompido')
+        raise
+    else:
+        end_rerun()
+
+
+def begin_rerun(page: str) -> Optional[RerunMetrics]:
+    """Abre o registro do rerun de `page` (caminho do script ou nome) se alguma saída está ativa.
+
+    Prefira `page_rerun`, que garante o fechamento. Com `?profile=1` / MHD_PROFILE
+    o rerun também roda sob o profiler (utils/profiling.py) até o fechamento; o
+    parâmetro sai da URL, então só este rerun é perfilado.
+    """
+    profile = _requested('profile', PROFILE)
+    if profile and not PROFILE:
+        del st.query_params['profile']
+    if not (METRICS_FILE or profile or _panel_requested()):
+        _local.rerun = None
+        return None
+    rerun = _local.rerun = RerunMetrics(Path(page).stem, time.perf_counter())
+    if profile:
+        from . import profiling  # só importado quando pedido
+        rerun.profile = profiling.start()
+        if rerun.profile is None:
+            st.sidebar.warning("🔬 Não foi possível capturar o perfil: outro profiler já está ativo "
+                               "neste processo. Tente de novo em instantes.")
+    return rerun
+
+
+def end_rerun(show_panel: bool = True) -> Optional[RerunMetrics]:
+    """Fecha o registro do rerun, grava o arquivo de métricas e mostra o painel (se pedido)."""
+    rerun = current()
+    if rerun is None:
+        return None
+    profile = rerun.profile
+    _finish(rerun, 'ok')
+    if show_panel and _panel_requested():
+        debug_panel(rerun)
+    if profile is not None:
+        from . import profiling
+        profiling.offer(profile, rerun)
+    return rerun
+
+
+def _finish(rerun: RerunMetrics, status: str) -> None:
+    _local.rerun = None
+    if rerun.profile is not None:
+        rerun.profile.disable()
+        # Reruns perfilados ficam fora do histograma usado para SLOs
+        status = 'perfilado' if status == 'ok' else status
+    rerun.seconds = time.perf_counter() - rerun.started
+    rerun.status = status
+    _AGGREGATE.add(rerun)
+    if METRICS_FILE:
+        try:
+            export(rerun, METRICS_FILE.replace('{pid}', str(os.getpid())))
+        except OSError:
+            pass  # métricas nunca derrubam a página
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Cronometra o bloco como a etapa `name` do rerun atual."""
+    rerun = current()
+    if rerun is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        rerun.spans.append((name, time.perf_counter() - start))
+
+
+def timed(name: Optional[str] = None):
+    """Decorator: cada chamada vira a etapa `name` (padrão: nome da função) do rerun atual."""
+    def decorator(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is None:
+                return func(*args, **kwargs)
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_event(cache: str, hit: bool) -> None:
+    """Conta um acerto ou erro do cache `cache` no rerun atual."""
+    rerun = current()
+    if rerun is not None:
+        rerun.caches.setdefault(cache, [0, 0])[0 if hit else 1] += 1
+
+
+@contextmanager
+def cache_lookup(cache: str) -> Iterator[None]:
+    """Consulta a um cache cujo corpo só roda no erro (ex.: `st.cache_data`).
+
+    O corpo cacheado chama `cache_miss(cache)`; se não chamar durante o bloco, a
+    consulta conta como acerto.
+    """
+    rerun = current()
+    if rerun is None:
+        yield
+        return
+    pending = _local.__dict__.setdefault('lookups', {})
+    pending[cache] = False
+    try:
+        yield
+    finally:
+        cache_event(cache, hit=not pending.pop(cache, False))
+
+
+def cache_miss(cache: str) -> None:
+    """Marca a consulta aberta de `cache` nesta thread como erro (ver `cache_lookup`)."""
+    pending = getattr(_local, 'lookups', None)
+    if pending and cache in pending:
+        pending[cache] = True
+
+
+def annotate(selection: Optional[Dict[str, Any]]) -> None:
+    """Anota no rerun atual os filtros da sidebar."""
+    rerun = current()
+    if rerun is not None:
+        rerun.selection = dict(selection or {})
+
+
+def annotate_controls(**controls: Any) -> None:
+    """Anota no rerun atual controles da página que mudam o resultado (ex.: `segmentation=`)."""
+    rerun = current()
+    if rerun is not None:
+        rerun.controls.update(controls)
+
+
+def figure_built(fig, name: str) -> None:
+    """Associa a figura à função que a construiu (nome usado em `plotly_chart`)."""
+    rerun = current()
+    if rerun is not None and fig is not None:
+        rerun.figures[id(fig)] = name
+
+
+def plotly_chart(fig, **kwargs):
+    """`st.plotly_chart` com o tempo de envio e o tamanho do payload da figura anotados no rerun."""
+    rerun = current()
+    if rerun is None:
+        return st.plotly_chart(fig, **kwargs)
+    name = rerun.figures.get(id(fig), 'figura')
+    with span(f'plotly_chart:{name}'):
+        out = st.plotly_chart(fig, **kwargs)
+    rerun.payloads[name] = len(fig.to_json()) if fig is not None else 0
+    return out
+
+
+# ============================================================================
+# Agregados do processo e exportação
+# ============================================================================
+class _Aggregate:
+    """Somas por página/etapa/cache desde o início do processo (para o arquivo do Prometheus)."""
+
+    def __init__(self):
+        self.reruns: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0] * (len(RERUN_BUCKETS) + 2))
+        self.stages: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+        self.payloads: Dict[Tuple[str, str], int] = {}
+        self.caches: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def add(self, rerun: RerunMetrics) -> None:
+        with _lock:
+            # [contagem por bucket..., +Inf, soma]
+            buckets = self.reruns[(rerun.page, rerun.status)]
+            for i, limit in enumerate(RERUN_BUCKETS):
+                if rerun.seconds <= limit:
+                    buckets[i] += 1
+            buckets[len(RERUN_BUCKETS)] += 1
+            buckets[-1] += rerun.seconds
+            for name, seconds in rerun.spans:
+                stage = self.stages[(rerun.page, name)]
+                stage[0] += 1
+                stage[1] += seconds
+            for name, size in rerun.payloads.items():
+                self.payloads[(rerun.page, name)] = size
+            for cache, (hits, misses) in rerun.caches.items():
+                self.caches[(cache, 'hit')] += hits
+                self.caches[(cache, 'miss')] += misses
+
+    def prometheus(self) -> str:
+        """Texto no formato de exposição do Prometheus."""
+        lines = ["# HELP mhd_rerun_seconds Duração dos reruns por página",
+                 "# TYPE mhd_rerun_seconds histogram"]
+        with _lock:
+            for (page, status), buckets in sorted(self.reruns.items()):
+                labels = f'page="{page}",status="{status}"'
+                # Contagens já acumuladas em `add` (cada rerun entra em todos os limites >= duração)
+                for limit, count in zip(RERUN_BUCKETS, buckets):
+                    lines.append(f'mhd_rerun_seconds_bucket{{{labels},le="{limit}"}} {count}')
+                lines.append(f'mhd_rerun_seconds_bucket{{{labels},le="+Inf"}} {buckets[len(RERUN_BUCKETS)]}')
+                lines.append(f'mhd_rerun_seconds_sum{{{labels}}} {buckets[-1]:.6f}')
+                lines.append(f'mhd_rerun_seconds_count{{{labels}}} {buckets[len(RERUN_BUCKETS)]}')
+            lines += ["# HELP mhd_stage_seconds Tempo por etapa do rerun",
+                      "# TYPE mhd_stage_seconds summary"]
+            for (page, stage), (count, total) in sorted(self.stages.items()):
+                labels = f'page="{page}",stage="{stage}"'
+                lines.append(f'mhd_stage_seconds_sum{{{labels}}} {total:.6f}')
+                lines.append(f'mhd_stage_seconds_count{{{labels}}} {count}')
+            lines += ["# HELP mhd_figure_payload_bytes Tamanho do JSON da última figura enviada",
+                      "# TYPE mhd_figure_payload_bytes gauge"]
+            for (page, chart), size in sorted(self.payloads.items()):
+                lines.append(f'mhd_figure_payload_bytes{{page="{page}",chart="{chart}"}} {size}')
+            lines += ["# HELP mhd_cache_requests_total Consultas aos caches por resultado",
+                      "# TYPE mhd_cache_requests_total counter"]
+            for (cache, result), count in sorted(self.caches.items()):
+                lines.append(f'mhd_cache_requests_total{{cache="{cache}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+_AGGREGATE = _Aggregate()
+
+
+def export(rerun: RerunMetrics, path: str) -> None:
+    """Grava as métricas: `.prom` reescreve os agregados do processo; outro sufixo anexa o rerun em JSON."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.suffix == '.prom':
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp.write_text(_AGGREGATE.prometheus(), encoding='utf-8')
+        os.replace(tmp, target)  # leitor nunca vê um arquivo pela metade
+        return
+    line = json.dumps({'ts': time.time(), **rerun.to_json()}, ensure_ascii=False)
+    with _lock, open(target, 'a', encoding='utf-8') as fh:
+        fh.write(line + "\n")
+
+
+def debug_panel(rerun: RerunMetrics) -> None:
+    """Expander na sidebar com etapas, payloads e caches do rerun."""
+    import pandas as pd
+
+    with st.sidebar.expander(f"⏱️ Desempenho — {rerun.seconds * 1000:.0f} ms", expanded=False):
+        if rerun.spans:
+            stages = pd.DataFrame(rerun.spans, columns=['etapa', 'ms'])
+            stages['ms'] = (stages['ms'] * 1000).round(1)
+            st.dataframe(stages, hide_index=True, use_container_width=True)
+        if rerun.payloads:
+            payloads = pd.DataFrame(
+                [(name, round(size / 1024, 1)) for name, size in rerun.payloads.items()],
+                columns=['figura', 'KB'])
+            st.dataframe(payloads, hide_index=True, use_container_width=True)
+        if rerun.caches:
+            caches = pd.DataFrame(
+                [(cache, hits, misses) for cache, (hits, misses) in rerun.caches.items()],
+                columns=['cache', 'acertos', 'erros'])
+            st.dataframe(caches, hide_index=True, use_container_width=True)
+        st.caption("Etapas aninhadas se sobrepõem (ex.: `filter` dentro de `render_sidebar`).")
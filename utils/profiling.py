@@ -0,0 +1,96 @@
+"""
+Perfil de um rerun de página sob demanda.
+
+Com `?profile=1` na URL (ou MHD_PROFILE=1 para todos os reruns do processo), o
+rerun é executado sob o `cProfile` dentro de `page_rerun` (utils/metrics.py), e
+a sidebar oferece o resultado para download. O parâmetro é retirado da URL no
+início do rerun: as interações seguintes não são perfiladas. Arquivos:
+- `.prof`: arquivo do `pstats`, aberto com `python -m pstats`, snakeviz ou
+  convertido em flame graph (ex.: `flameprof perfil.prof > perfil.svg`);
+- `.txt`: página, duração, filtros da sidebar e controles da página, seguidos
+  das funções com maior tempo acumulado.
+
+Com MHD_PROFILE os dois arquivos também são gravados em MHD_PROFILE_DIR
+(padrão `.cache/profiles`), para perfis sem navegador. Sem nenhum dos dois o
+módulo nem é importado: as páginas só consultam os parâmetros da URL, que
+`begin_rerun` já lê para o painel de depuração.
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import time
+from pathlib import Path
+from typing import Optional
+
+import streamlit as st
+
+PROFILE_ENV = os.environ.get("MHD_PROFILE", "") not in ("", "0")
+PROFILE_DIR = Path(os.environ.get("MHD_PROFILE_DIR", ".cache/profiles"))
+
+# Funções listadas no relatório em texto
+REPORT_FUNCTIONS = 40
+
+
+def start() -> Optional[cProfile.Profile]:
+    """Liga o profiler na thread do rerun (None se outro profiler já está ativo no processo)."""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:  # Python 3.12+: um único profiler por processo
+        return None
+    return profile
+
+
+def pstats_bytes(profile: cProfile.Profile) -> bytes:
+    """Conteúdo do arquivo `.prof` (o mesmo de `Profile.dump_stats`)."""
+    return marshal.dumps(pstats.Stats(profile).stats)
+
+
+def report(profile: cProfile.Profile, rerun, limit: int = REPORT_FUNCTIONS) -> str:
+    """Relatório em texto: contexto do rerun + funções por tempo acumulado."""
+    out = io.StringIO()
+    out.write(f"Página: {rerun.page}\n")
+    out.write(f"Data: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    out.write(f"Duração: {rerun.seconds * 1000:.0f} ms\n")
+    out.write("Filtros da sidebar:\n")
+    for name, value in rerun.selection.items():
+        out.write(f"  {name}: {_describe(value)}\n")
+    if rerun.controls:
+        out.write("Controles da página:\n")
+        for name, value in rerun.controls.items():
+            out.write(f"  {name}: {_describe(value)}\n")
+    out.write("\n")
+    stats = pstats.Stats(profile, stream=out)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+def _describe(value) -> str:
+    if value is None:
+        return "—"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return ", ".join(str(v) for v in value) or "(vazio)"
+    return str(value)
+
+
+def offer(profile: cProfile.Profile, rerun) -> None:
+    """Botões de download do perfil na sidebar (e arquivos em PROFILE_DIR com MHD_PROFILE)."""
+    stem = f"perfil-{rerun.page}-{time.strftime('%Y%m%d-%H%M%S')}"
+    data, text = pstats_bytes(profile), report(profile, rerun)
+    if PROFILE_ENV:
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            (PROFILE_DIR / f"{stem}.prof").write_bytes(data)
+            (PROFILE_DIR / f"{stem}.txt").write_text(text, encoding='utf-8')
+        except OSError:
+            pass
+
+    with st.sidebar.expander(f"🔬 Perfil do rerun — {rerun.seconds * 1000:.0f} ms", expanded=True):
+        st.caption("Tempos com o profiler ligado (maiores que os de um rerun normal).")
+        # on_click='ignore': baixar não dispara outro rerun (que seria perfilado de novo)
+        st.download_button("Baixar .prof (pstats)", data, file_name=f"{stem}.prof",
+                           mime="application/octet-stream", on_click='ignore', key="profile_prof")
+        st.download_button("Baixar relatório .txt", text, file_name=f"{stem}.txt",
+                           mime="text/plain", on_click='ignore', key="profile_txt")
@@ -0,0 +1,173 @@
+"""
+Recarga do dataset em segundo plano.
+
+Com `load_data` em `st.cache_data` sem TTL, dados novos exigiam limpar o cache
+e o próximo usuário pagava a carga inteira dentro do seu rerun. O
+`DatasetReloader` mantém o dataset atual como um `Snapshot` imutável e uma
+thread daemon verifica a cada `interval` segundos a assinatura das fontes
+(tamanho/mtime dos CSVs e dos lotes em `INCOMING_DIR`). Quando ela muda, o
+novo dataset é preparado fora do caminho das requisições e trocado de uma vez
+(atribuição de referência sob lock) para todas as sessões. O snapshot anterior
+continua disponível (`previous`) e vivo enquanto algum rerun em andamento
+ainda referencia o frame (o frame guarda uma referência ao seu snapshot, então
+cubo e índices continuam achados mesmo depois de várias trocas); só a primeira
+carga do processo é síncrona.
+
+O frame de um snapshot é compartilhado por todas as sessões e páginas (sem
+cópia por chamada) e deve ser tratado como somente leitura; objetos derivados
+dele (cubo, índice de filtros) são construídos uma vez por versão com
+`Snapshot.derived`, antes da troca.
+"""
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+# Atributo do frame publicado que aponta para o seu snapshot (ver `snapshot_of`)
+_SNAPSHOT_ATTR = '_mhd_snapshot'
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Versão imutável do dataset servida às sessões."""
+    version: int
+    df: pd.DataFrame
+    errors: Dict[str, str]
+    loaded_at: float
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def derived(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Objeto derivado do frame (ex.: índices), construído uma única vez por versão."""
+        value = self._derived.get(name)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = self._derived[name] = factory()
+        return value
+
+
+def snapshot_of(df: pd.DataFrame) -> Optional[Snapshot]:
+    """Snapshot publicado cujo frame é o próprio objeto `df`, se houver.
+
+    A referência fica no próprio frame (não em `df.attrs`, copiado pelas operações
+    do pandas): enquanto um rerun segura o frame, o snapshot e seus derivados
+    seguem vivos, por mais versões que tenham sido publicadas depois.
+    """
+    snapshot = df.__dict__.get(_SNAPSHOT_ATTR)
+    return snapshot if snapshot is not None and snapshot.df is df else None
+
+
+def source_signature(paths: Iterable[str], incoming_dir: Optional[Path] = None) -> Tuple:
+    """(caminho, tamanho, mtime) das fontes e dos lotes pendentes: muda quando há dado novo."""
+    files: List[str] = list(paths)
+    if incoming_dir is not None and Path(incoming_dir).is_dir():
+        files += sorted(str(p) for p in Path(incoming_dir).glob('*.csv'))
+    signature = []
+    for p in files:
+        try:
+            stat = Path(p).stat()
+            signature.append((p, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((p, None, None))
+    return tuple(signature)
+
+
+class DatasetReloader:
+    """Dataset atual + thread que o reconstrói e troca quando as fontes mudam.
+
+    Args:
+        build: Prepara o dataset e devolve (df, erros por caminho)
+        signature: Assinatura barata das fontes (ver `source_signature`)
+        interval: Segundos entre verificações (0 = sem thread; só `reload` manual)
+        prepare: Chamado com o snapshot novo antes da troca (ex.: construir índices)
+    """
+
+    def __init__(self, build: Callable[[], Tuple[pd.DataFrame, Dict[str, str]]],
+                 signature: Callable[[], Tuple], interval: float = 30,
+                 prepare: Optional[Callable[[Snapshot], None]] = None):
+        self._build = build
+        self._signature = signature
+        self._prepare = prepare
+        self.interval = interval
+        self._versions = itertools.count(1)
+        self._swap_lock = threading.Lock()
+        self._reload_lock = threading.Lock()  # uma reconstrução por vez
+        self._current: Optional[Snapshot] = None
+        self._previous: Optional[Snapshot] = None
+        self._seen_signature: Optional[Tuple] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._force = False
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def previous(self) -> Optional[Snapshot]:
+        return self._previous
+
+    def current(self) -> Snapshot:
+        """Snapshot atual (a primeira chamada do processo carrega de forma síncrona)."""
+        snapshot = self._current
+        if snapshot is None:
+            self.reload()
+            snapshot = self._current
+        return snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """Reconstrói e troca o snapshot se as fontes mudaram (ou se `force`).
+
+        Returns:
+            True se uma nova versão foi publicada.
+        """
+        with self._reload_lock:
+            # Assinatura antes do build: mudanças durante a carga disparam outra recarga
+            signature = self._signature()
+            if not force and self._current is not None and signature == self._seen_signature:
+                return False
+            df, errors = self._build()
+            snapshot = Snapshot(next(self._versions), df, dict(errors), time.time())
+            if self._prepare is not None:
+                self._prepare(snapshot)
+            object.__setattr__(df, _SNAPSHOT_ATTR, snapshot)  # ciclo frame ↔ snapshot, coletado pelo gc
+            with self._swap_lock:
+                self._previous, self._current = self._current, snapshot
+                self._seen_signature = signature
+            self.last_error = None
+            return True
+
+    def request_reload(self) -> None:
+        """Pede uma recarga forçada à thread (sem bloquear quem chamou)."""
+        self._force = True
+        self._wake.set()
+
+    def start(self) -> 'DatasetReloader':
+        """Inicia a thread de verificação (no-op com `interval` 0 ou se já iniciada)."""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='dataset-reloader', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            force, self._force = self._force, False
+            try:
+                self.reload(force=force)
+            except Exception as e:  # mantém servindo a versão atual
+                self.last_error = str(e)
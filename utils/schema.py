@@ -0,0 +1,149 @@
+"""
+Schema de tipos compactos para o dataset normalizado.
+
+Depois de `_normalize_columns` as dimensões do dashboard chegam como colunas de
+texto (object/str) e os scores como float64. `apply_schema` converte:
+- dimensões de baixa cardinalidade → `pd.Categorical` (filtros e groupby em códigos inteiros);
+- `hours_per_week` / `burnout_numeric` → inteiros pequenos;
+- scores (inclusive os que só algumas fontes informam) → float32.
+As demais colunas brutas das fontes também são compactadas (texto repetitivo vira
+categoria, numéricos são reduzidos). `memory_report` mostra o ganho por coluna.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Dimensões categóricas usadas nos filtros e gráficos
+CATEGORICAL_COLUMNS = [
+    'role', 'work_mode', 'policy', 'segment', 'burnout_level',
+    'gender', 'age_group', 'source', 'hours_band',
+]
+
+# Ordem preferencial das categorias (valores extras vão para o final)
+CATEGORY_ORDER: Dict[str, List[str]] = {
+    'burnout_level': ['low', 'medium', 'high'],
+    'work_mode': ['onsite', 'hybrid', 'remote'],
+    'age_group': ['18-30', '31-40', '41-50', '50+'],
+    'hours_band': ['<35h', '35–45h', '>45h'],
+}
+
+INTEGER_COLUMNS = {
+    'hours_per_week': np.int16,
+    'burnout_numeric': np.int8,
+}
+
+# Variáveis numéricas informadas só por algumas fontes (nulas nas linhas das demais)
+SOURCE_SCORE_COLUMNS = ['sleep_hours', 'virtual_meetings', 'job_satisfaction', 'productivity_score']
+
+FLOAT32_COLUMNS = ['stress_score'] + SOURCE_SCORE_COLUMNS
+
+BOOL_COLUMNS = ['is_high_burnout']
+
+# Colunas do dataset normalizado que o dashboard usa (as colunas brutas das fontes ficam de fora)
+NORMALIZED_COLUMNS = [
+    'role', 'work_mode', 'segment', 'policy', 'stress_score', 'burnout_level',
+    'hours_per_week', 'hours_band', 'burnout_numeric', 'is_high_burnout',
+    'gender', 'age_group', 'source',
+] + SOURCE_SCORE_COLUMNS
+
+# Colunas de texto com até essa fração de valores distintos viram categoria
+_CATEGORY_RATIO = 0.5
+
+
+def _to_category(s: pd.Series, order: Optional[List[str]] = None) -> pd.Series:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        values = list(s.cat.categories)
+    else:
+        values = list(pd.unique(s.dropna()))
+    if order:
+        head = [v for v in order if v in values]
+        tail = sorted((v for v in values if v not in head), key=str)
+        categories = head + tail
+    else:
+        categories = sorted(values, key=str)
+    return pd.Categorical(s, categories=categories)
+
+
+def _to_integer(s: pd.Series, dtype) -> pd.Series:
+    """Converte para inteiro pequeno; com nulos ou fora do intervalo usa float32."""
+    numeric = pd.to_numeric(s, errors='coerce')
+    info = np.iinfo(dtype)
+    if numeric.isna().any() or numeric.min() < info.min or numeric.max() > info.max \
+            or not (numeric % 1 == 0).all():
+        return numeric.astype(np.float32)
+    return numeric.astype(dtype)
+
+
+def _compact_other(s: pd.Series) -> pd.Series:
+    """Compactação genérica para colunas brutas das fontes."""
+    if pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if pd.api.types.is_float_dtype(s):
+        return s.astype(np.float32)
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast='integer')
+    if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+        n = len(s)
+        if n and s.nunique(dropna=True) <= n * _CATEGORY_RATIO:
+            return _to_category(s)
+    return s
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica o schema de tipos compactos ao frame normalizado (retorna novo frame)."""
+    if df is None or df.empty:
+        return df
+
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in CATEGORICAL_COLUMNS:
+            out[col] = _to_category(s, CATEGORY_ORDER.get(col))
+        elif col in INTEGER_COLUMNS:
+            out[col] = _to_integer(s, INTEGER_COLUMNS[col])
+        elif col in FLOAT32_COLUMNS:
+            out[col] = pd.to_numeric(s, errors='coerce').astype(np.float32)
+        else:
+            out[col] = _compact_other(s)
+    return pd.DataFrame(out, index=df.index)
+
+
+def memory_report(df: pd.DataFrame, baseline: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Relatório de memória por coluna (bytes, com `deep=True`).
+
+    Args:
+        df: Frame a medir
+        baseline: Frame de referência (ex.: antes de `apply_schema`) para comparação
+
+    Returns:
+        DataFrame [column, dtype, bytes] (+ [baseline_dtype, baseline_bytes, ratio]),
+        com uma linha final "TOTAL".
+    """
+    report = pd.DataFrame({
+        'column': df.columns,
+        'dtype': [str(t) for t in df.dtypes],
+        'bytes': df.memory_usage(deep=True, index=False).values,
+    })
+    if baseline is not None:
+        base_bytes = baseline.memory_usage(deep=True, index=False)
+        report['baseline_dtype'] = [str(baseline[c].dtype) if c in baseline else '' for c in df.columns]
+        report['baseline_bytes'] = [base_bytes.get(c, 0) for c in df.columns]
+
+    total = {'column': 'TOTAL', 'dtype': '', 'bytes': report['bytes'].sum()}
+    if baseline is not None:
+        total.update(baseline_dtype='', baseline_bytes=report['baseline_bytes'].sum())
+    report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+
+    if baseline is not None:
+        report['ratio'] = (report['baseline_bytes'] / report['bytes'].replace(0, np.nan)).round(2)
+    return report
+
+
+if __name__ == '__main__':
+    # Uso: python -m utils.schema  → relatório de memória antes/depois do schema
+    from .data_io import DEFAULT_PATHS, _build_dataset
+
+    raw, _ = _build_dataset(DEFAULT_PATHS, typed=False)
+    typed = apply_schema(raw)
+    print(memory_report(typed, baseline=raw).to_string(index=False))
@@ -0,0 +1,100 @@
+"""
+Perfil de tempo de import na inicialização de uma página.
+
+Executa os imports de topo de uma página (ex.: `1_Visao_Geral.py`) num
+processo Python novo com `-X importtime` e resume o resultado: tempo total,
+tempo próprio somado por pacote de topo e os módulos mais lentos (tempo
+acumulado). Serve para acompanhar o time-to-first-render de pods novos.
+
+Uso:
+    python -m utils.startup_profile [pagina.py] [--top N]   (a partir da raiz do projeto)
+"""
+import argparse
+import ast
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+DEFAULT_ENTRY = "1_Visao_Geral.py"
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def entry_imports(path: str) -> List[str]:
+    """Instruções de import do nível de topo de um script (na ordem do arquivo)."""
+    source = Path(path).read_text(encoding="utf-8")
+    return [
+        ast.get_source_segment(source, node)
+        for node in ast.parse(source).body if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def import_times(statements: List[str], cwd: str = ".") -> pd.DataFrame:
+    """Tempos de import (µs) de `statements` num interpretador novo.
+
+    Returns:
+        DataFrame [module, package, depth, self_us, cumulative_us], um registro por módulo.
+    """
+    code = "\n".join(statements)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "falha no import")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                'module': module,
+                'package': module.split('.')[0],
+                'depth': len(indent) // 2,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+            })
+    return pd.DataFrame(rows, columns=['module', 'package', 'depth', 'self_us', 'cumulative_us'])
+
+
+def startup_report(path: str = DEFAULT_ENTRY, top: int = 15) -> str:
+    """Relatório em texto: total, tempo próprio por pacote e módulos mais lentos."""
+    times = import_times(entry_imports(path))
+    total_ms = times['self_us'].sum() / 1000
+
+    by_package = (
+        times.groupby('package', sort=False)['self_us'].sum()
+        .sort_values(ascending=False).head(top).div(1000).round(1)
+        .rename('self_ms').reset_index()
+    )
+    by_package['share'] = (by_package['self_ms'] / total_ms * 100).round(1).astype(str) + '%'
+    slowest = (
+        times.sort_values('cumulative_us', ascending=False)
+        .drop_duplicates('module').head(top)
+        .assign(cumulative_ms=lambda t: (t['cumulative_us'] / 1000).round(1),
+                self_ms=lambda t: (t['self_us'] / 1000).round(1))
+        [['module', 'cumulative_ms', 'self_ms']]
+    )
+
+    return "\n".join([
+        f"Imports de {path}: {total_ms:,.0f} ms em {len(times)} módulos",
+        "",
+        "Tempo próprio por pacote:",
+        by_package.to_string(index=False),
+        "",
+        "Módulos mais lentos (tempo acumulado):",
+        slowest.to_string(index=False),
+    ])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Perfil de tempo de import de uma página do dashboard")
+    parser.add_argument("entry", nargs="?", default=DEFAULT_ENTRY, help="Script da página (padrão: %(default)s)")
+    parser.add_argument("--top", type=int, default=15, help="Linhas por tabela (padrão: %(default)s)")
+    args = parser.parse_args()
+    print(startup_report(args.entry, args.top))
@@ -0,0 +1,96 @@
+"""
+Resultado dos filtros da sidebar.
+
+`render_sidebar` devolve um `DataView`: o dataset, as posições das linhas que
+passam nos filtros (`.positions`, vindas de utils/filters.py), a seleção
+aplicada (`.selection`) e o cubo de agregados do dataset (`.cube`). O frame
+filtrado (`.frame`) só é materializado no primeiro acesso; `len`, `empty`,
+`columns` e `filtered[col]` respondem sem copiar o frame inteiro. Demais
+atributos são repassados ao frame, então as páginas continuam usando o
+DataView como um DataFrame; os gráficos usam `rollup` para responder KPIs e
+rankings direto do cubo.
+"""
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .cube import AggregateCube, IncrementalRollup
+
+
+class DataView:
+    """Frame filtrado (preguiçoso) + seleção da sidebar + cubo de agregados.
+
+    Args:
+        frame: DataFrame de origem (já filtrado quando `positions` é None)
+        selection: Filtros aplicados ({dimensão: valores} e `hours_per_week`: (min, max))
+        cube: Cubo do dataset completo (opcional)
+        positions: Posições das linhas selecionadas em `frame` (None = todas)
+        rollups: Rollups da sessão atualizados por delta (opcional; ver `IncrementalRollup`)
+    """
+
+    def __init__(self, frame: pd.DataFrame, selection: Optional[Dict] = None,
+                 cube: Optional['AggregateCube'] = None,
+                 positions: Optional[np.ndarray] = None,
+                 rollups: Optional['IncrementalRollup'] = None):
+        self.source = frame
+        self.positions = positions
+        self.selection = dict(selection or {})
+        self.cube = cube
+        self.rollups = rollups
+        self._frame: Optional[pd.DataFrame] = frame if positions is None else None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Frame filtrado, materializado (uma única vez) no primeiro acesso."""
+        if self._frame is None:
+            self._frame = self.source.take(self.positions)
+        return self._frame
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.source.columns
+
+    def rollup(self, by: Sequence[str] = ()) -> Optional[pd.DataFrame]:
+        """Agregados da seleção por `by` vindos do cubo, ou None se o cubo não cobre `by`."""
+        if self.cube is None or not self.cube.supports(by):
+            return None
+        if self.rollups is not None and self.rollups.cube is self.cube:
+            return self.rollups.rollup(by, self.selection)
+        return self.cube.rollup(by, self.selection)
+
+    def __len__(self) -> int:
+        if self._frame is None:
+            return len(self.positions)
+        return len(self._frame)
+
+    def __getitem__(self, key):
+        # Uma coluna só: recorta apenas ela, sem materializar o frame
+        if self._frame is None and isinstance(key, str) and key in self.source.columns:
+            return self.source[key].take(self.positions)
+        return self.frame[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.source
+
+    def __iter__(self):
+        return iter(self.source)
+
+    def __getattr__(self, name):
+        # Só é chamado quando o atributo não existe no próprio DataView
+        if name.startswith('__') or name in ('source', 'positions', '_frame'):
+            raise AttributeError(name)
+        return getattr(self.frame, name)
+
+    def __repr__(self) -> str:
+        return f"DataView({len(self):,} linhas, seleção={self.selection})"
+
+
+def as_frame(data) -> pd.DataFrame:
+    """DataFrame linha-a-linha por trás de um DataView (ou o próprio DataFrame)."""
+    return data.frame if isinstance(data, DataView) else data